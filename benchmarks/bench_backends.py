@@ -0,0 +1,118 @@
+"""
+HTTP 后端基准：本地 HTTP/1.1 keep-alive 替身服务，每个请求固定延迟，
+在高并发下比较 httpx 与 aiohttp 两种共享连接池的吞吐与延迟。
+两种后端都经解析器使用的 httpx 客户端接口发请求，与线上调用路径一致
+
+运行：
+    python benchmarks/bench_backends.py --requests 5000 --concurrency 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from parse_video_py.transport import SharedTransport, build_transport
+
+BODY = json.dumps(
+    {"code": 200, "data": [{"video_url": "https://example.com/v.mp4"}] * 20}
+).encode()
+
+
+class StandIn:
+    """HTTP/1.1 keep-alive 替身，记录接受的连接数"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections = 0
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/api"
+
+    async def start(self):
+        self.server = await asyncio.start_server(
+            self._accept, "127.0.0.1", 0, backlog=1024
+        )
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _accept(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    return
+                await asyncio.sleep(self.delay)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\nConnection: keep-alive\r\n\r\n" % len(BODY)
+                    + BODY
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def run(url: str, requests: int, concurrency: int, shared) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            # 与解析器一致：每次解析新建短生命周期客户端，连接池共享
+            async with httpx.AsyncClient(transport=shared) as client:
+                response = await client.get(url, headers={"User-Agent": "bench"})
+                response.raise_for_status()
+                response.json()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(name: str, server: StandIn, latencies: list[float], elapsed: float):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:<10} 连接数 {server.connections:>4}  "
+        f"吞吐 {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f}ms  "
+        f"p95 {p95 * 1000:7.1f}ms  总耗时 {elapsed:6.2f}s"
+    )
+
+
+async def main(requests: int, concurrency: int, delay: float):
+    for backend in ("httpx", "aiohttp"):
+        server = StandIn(delay)
+        await server.start()
+        pooled = build_transport(http2=False, backend=backend)
+        shared = SharedTransport(pooled)
+        # 预热一轮，排除建连和导入开销
+        await run(server.url, concurrency, concurrency, shared)
+        server.connections = 0
+        start = time.perf_counter()
+        latencies = await run(server.url, requests, concurrency, shared)
+        report(backend, server, latencies, time.perf_counter() - start)
+        await pooled.aclose()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--delay", type=float, default=0.005)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
@@ -0,0 +1,79 @@
+"""
+分享链接规范化基准：生成覆盖各平台、带追踪参数的合成链接，测量 canonicalize 与
+canonical_key 的吞吐，以及去重后剩余的键数（同一视频的不同写法应合并）
+
+运行：
+    python benchmarks/bench_canonical.py --items 1000000
+"""
+
+import argparse
+import base64
+import random
+import time
+
+from parse_video_py.canonical import canonical_key, canonicalize
+
+_SOHU_PATH = base64.b64encode(b"us/9999/12345.shtml").decode()
+
+# 各平台链接模板，{id} 为视频ID
+TEMPLATES = [
+    "https://www.douyin.com/video/{id}?previous_page=app_code_link",
+    "https://www.iesdouyin.com/share/video/{id}/?region=CN&mid=1&u_code=0",
+    "https://www.douyin.com/jingxuan?modal_id={id}",
+    "https://v.douyin.com/i{id}/",
+    "https://www.bilibili.com/video/BV1xx4{id}/?spm_id_from=333.1007&vd_source=ab",
+    "https://b23.tv/{id}",
+    "https://v.qq.com/x/cover/mzc00200abc/x{id}.html?ptag=share",
+    f"https://tv.sohu.com/v/{_SOHU_PATH}.html",
+    "https://x.com/someone/status/{id}?s=20",
+    "https://v.huya.com/play/{id}.html",
+    "https://www.acfun.cn/v/ac{id}",
+    "https://haokan.baidu.com/v?vid={id}&pd=share",
+    "https://www.pearvideo.com/detail_{id}",
+    "https://h5.pipix.com/item/{id}?app_id=1319",
+    "https://kg.qq.com/node/play?s={id}&shareuid=1",
+    "https://video.weibo.com/show?fid=1034:{id}",
+    "https://www.ixigua.com/{id}?logTag=abc",
+    "https://www.xiaohongshu.com/explore/64b7a1e2000000001f{id:06x}?xsec_token=t",
+    "https://v.kuaishou.com/{id}",
+    "https://share.xiaochuankeji.cn/hybrid/share/post?pid={id}&utm_source=wx",
+]
+
+
+def make_urls(items: int, videos: int) -> list[str]:
+    rng = random.Random(0)
+    return [
+        rng.choice(TEMPLATES).format(id=rng.randrange(videos) % 0xFFFFFF)
+        for _ in range(items)
+    ]
+
+
+def bench(name: str, func, urls: list[str]) -> list:
+    start = time.perf_counter()
+    results = [func(url) for url in urls]
+    elapsed = time.perf_counter() - start
+    print(
+        f"{name:<14} 条数 {len(urls)}  吞吐 {len(urls) / elapsed:10.0f} 条/s  "
+        f"每条 {elapsed / len(urls) * 1e6:5.2f}µs"
+    )
+    return results
+
+
+def main(items: int, videos: int):
+    urls = make_urls(items, videos)
+    canonicals = bench("canonicalize", canonicalize, urls)
+    keys = bench("canonical_key", canonical_key, urls)
+    resolved = sum(1 for c in canonicals if c.video_id is not None)
+    short = sum(1 for c in canonicals if c.needs_resolution)
+    print(
+        f"离线得到视频ID {resolved}  需要跟随短链 {short}  "
+        f"去重前链接 {len(set(urls))}  去重后键 {len(set(keys))}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000000)
+    parser.add_argument("--videos", type=int, default=50000)
+    args = parser.parse_args()
+    main(args.items, args.videos)
@@ -0,0 +1,92 @@
+"""
+提取执行器基准：并发解析大页面（parsel HTML、yaml、json），
+比较在事件循环中直接解析与移到线程池 / 进程池时的事件循环延迟
+
+运行：
+    python benchmarks/bench_extract.py --pages 40 --size 400000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import yaml
+from parsel import Selector
+
+from parse_video_py.extract import ExtractionExecutor, LoopLagMonitor
+
+
+def make_html(size: int) -> str:
+    item = (
+        '<div class="item"><a href="/u/1">作者</a>'
+        '<img src="https://a.test/1.jpg"></div>'
+    )
+    return "<html><body>" + item * (size // len(item)) + "</body></html>"
+
+
+def make_state(size: int) -> str:
+    item = {"id": "abc", "title": "标题", "urls": ["https://a.test/1.mp4"] * 3}
+    items = [item] * (size // len(json.dumps(item, ensure_ascii=False)))
+    return json.dumps({"note": {"items": items}}, ensure_ascii=False)
+
+
+def parse_html(html: str) -> int:
+    return len(Selector(html).css("div.item a::attr(href)").getall())
+
+
+def parse_yaml(text: str) -> int:
+    return len(yaml.safe_load(text)["note"]["items"])
+
+
+def parse_json(text: str) -> int:
+    return len(json.loads(text)["note"]["items"])
+
+
+async def run_case(executor: ExtractionExecutor, func, payload: str, pages: int):
+    monitor = LoopLagMonitor(interval=0.005)
+    monitor.start()
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await asyncio.gather(*(executor.run(func, payload) for _ in range(pages)))
+    elapsed = time.perf_counter() - start
+    await asyncio.sleep(0.01)
+    await monitor.aclose()
+    return elapsed, monitor.max_lag
+
+
+async def main(pages: int, size: int):
+    html = make_html(size)
+    state = make_state(size)
+    cases = [
+        ("parsel HTML", parse_html, html),
+        ("yaml", parse_yaml, state),
+        ("json", parse_json, state),
+    ]
+    modes = [
+        ("事件循环内", ExtractionExecutor(threshold=len(html) * 10)),
+        ("线程池", ExtractionExecutor(threshold=0)),
+        ("进程池", ExtractionExecutor(threshold=0, kind="process")),
+    ]
+    for name, func, payload in cases:
+        if func is parse_yaml:
+            # yaml 纯 Python 解析很慢，减少页数
+            count = max(pages // 10, 1)
+        else:
+            count = pages
+        for mode, executor in modes:
+            elapsed, max_lag = await run_case(executor, func, payload, count)
+            print(
+                f"{name:<12} {mode:<6} 页数 {count:>3}  "
+                f"总耗时 {elapsed * 1000:8.1f}ms  最大事件循环延迟 {max_lag * 1000:8.1f}ms"
+            )
+    for _, executor in modes:
+        executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--size", type=int, default=400000)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.size))
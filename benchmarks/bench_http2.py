@@ -0,0 +1,156 @@
+"""
+HTTP/2 多路复用基准：本地 HTTP/1.1 与 HTTP/2（h2c）替身服务，每个请求固定延迟，
+比较并发请求下的连接数与延迟
+
+运行（需安装 parse-video-py[http2]）：
+    python benchmarks/bench_http2.py --requests 200 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+import httpx
+
+from parse_video_py.transport import SharedTransport
+
+
+class StandIn:
+    """替身服务基类：记录接受的连接数"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.connections = 0
+        self.server = None
+
+    @property
+    def url(self) -> str:
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/api"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._accept, "127.0.0.1", 0)
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _accept(self, reader, writer):
+        self.connections += 1
+        try:
+            await self.handle(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+class Http1StandIn(StandIn):
+    """HTTP/1.1 keep-alive 替身，同一连接上的请求依次处理"""
+
+    async def handle(self, reader, writer):
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head:
+                return
+            await asyncio.sleep(self.delay)
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n"
+                b"Connection: keep-alive\r\n\r\nok"
+            )
+            await writer.drain()
+
+
+class Http2StandIn(StandIn):
+    """HTTP/2 prior knowledge 替身，同一连接上的请求并发处理"""
+
+    async def handle(self, reader, writer):
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        async def respond(stream_id):
+            await asyncio.sleep(self.delay)
+            conn.send_headers(stream_id, [(":status", "200"), ("content-length", "2")])
+            conn.send_data(stream_id, b"ok", end_stream=True)
+            writer.write(conn.data_to_send())
+
+        tasks = set()
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                return
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    task = asyncio.create_task(respond(event.stream_id))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            writer.write(conn.data_to_send())
+
+
+async def run(url: str, requests: int, concurrency: int, make_client) -> list[float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one():
+        async with sem:
+            start = time.perf_counter()
+            async with make_client() as client:
+                response = await client.get(url)
+                response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return latencies
+
+
+def report(name: str, server: StandIn, latencies: list[float], elapsed: float):
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:<28} 连接数 {server.connections:>4}  "
+        f"p50 {statistics.median(latencies) * 1000:7.1f}ms  "
+        f"p95 {p95 * 1000:7.1f}ms  总耗时 {elapsed:6.2f}s"
+    )
+
+
+async def main(requests: int, concurrency: int, delay: float):
+    cases = [
+        # 现状：每次解析新建客户端，连接不复用
+        ("每次新建客户端 HTTP/1.1", Http1StandIn, lambda: httpx.AsyncClient()),
+        # 共享 HTTP/1.1 连接池
+        ("共享连接池 HTTP/1.1", Http1StandIn, None),
+        # 共享 HTTP/2 连接池（替身为明文 h2c，使用 prior knowledge）
+        ("共享连接池 HTTP/2", Http2StandIn, None),
+    ]
+    for name, server_cls, make_client in cases:
+        server = server_cls(delay)
+        await server.start()
+        pooled = None
+        if make_client is None:
+            http2 = server_cls is Http2StandIn
+            pooled = httpx.AsyncHTTPTransport(http2=http2, http1=not http2)
+            shared = SharedTransport(pooled)
+
+            def make_client():
+                return httpx.AsyncClient(transport=shared)
+
+        start = time.perf_counter()
+        latencies = await run(server.url, requests, concurrency, make_client)
+        report(name, server, latencies, time.perf_counter() - start)
+        if pooled is not None:
+            await pooled.aclose()
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.delay))
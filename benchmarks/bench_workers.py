@@ -0,0 +1,123 @@
+"""
+CLI 多进程基准：本地替身服务返回较大的 JSON 页面，每条链接请求一次并做 JSON / 正则提取，
+比较单进程与 --workers N 分片时的吞吐。提取是 CPU 密集的，单个事件循环先于网络跑满一个核，
+多进程吞吐随 N 增长，直到占满 CPU 核数
+
+运行：
+    python benchmarks/bench_workers.py --items 2000 --workers 1,2,4
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import time
+
+from parse_video_py.cli import _parse
+from parse_video_py.cli._shard import iter_sharded
+from parse_video_py.parser.base import VideoInfo
+from parse_video_py.utils import create_async_client
+
+VIDEO_URL = re.compile(r'"play_addr":\s*"([^"]+)"')
+
+
+def make_body(size: int) -> bytes:
+    item = {"aweme_id": "7", "desc": "标题", "play_addr": "https://v.test/1.mp4"}
+    items = [item] * (size // len(json.dumps(item, ensure_ascii=False)))
+    return json.dumps({"items": items}, ensure_ascii=False).encode()
+
+
+async def serve(port_queue, size: int):
+    body = make_body(size)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n" % len(body) + body
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=1024)
+    port_queue.put(server.sockets[0].getsockname()[1])
+    await server.serve_forever()
+
+
+def run_server(port_queue, size: int):
+    asyncio.run(serve(port_queue, size))
+
+
+async def fetch_and_extract(url, timeout=None):
+    """替代真实解析：请求替身页面，按解析器的方式做 JSON 与正则提取"""
+    async with create_async_client() as client:
+        response = await client.get(os.environ["BENCH_STANDIN_URL"])
+    data = json.loads(response.text)
+    videos = VIDEO_URL.findall(response.text)
+    return (
+        VideoInfo(video_url=videos[0], cover_url="", title=data["items"][0]["desc"]),
+        None,
+    )
+
+
+def install():
+    _parse._parse_single = fetch_and_extract
+
+
+async def run_case(items: int, workers: int, concurrency: int) -> float:
+    urls = [f"https://t.test/{i}" for i in range(items)]
+    if workers == 0:
+        install()
+        results = _parse._iter_batch(urls, concurrency=concurrency)
+    else:
+        results = iter_sharded(
+            urls, workers, concurrency=concurrency, initializer=install
+        )
+    start = time.perf_counter()
+    count = 0
+    async for _, _, _, err in results:
+        if err:
+            raise err
+        count += 1
+    assert count == items
+    return time.perf_counter() - start
+
+
+def main(items: int, workers_list: list[int], concurrency: int, size: int):
+    ctx = multiprocessing.get_context("spawn")
+    port_queue = ctx.Queue()
+    server = ctx.Process(target=run_server, args=(port_queue, size), daemon=True)
+    server.start()
+    os.environ["BENCH_STANDIN_URL"] = f"http://127.0.0.1:{port_queue.get()}/api"
+    print(f"CPU 核数 {os.cpu_count()}  页面 {size // 1024}KB  总并发 {concurrency}")
+    for workers in [0, *workers_list]:
+        # 工作进程启动耗时计入总耗时，条数足够多时可以忽略
+        elapsed = asyncio.run(run_case(items, workers, concurrency))
+        name = "进程内" if workers == 0 else f"workers={workers}"
+        print(
+            f"{name:<10} 条数 {items}  "
+            f"吞吐 {items / elapsed:8.1f} 条/s  总耗时 {elapsed:6.2f}s"
+        )
+    server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--size", type=int, default=200000)
+    args = parser.parse_args()
+    main(
+        args.items,
+        [int(n) for n in args.workers.split(",")],
+        args.concurrency,
+        args.size,
+    )
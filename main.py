@@ -1,6 +1,15 @@
+import os
+
 import uvicorn
 
-from parse_video_py.web import app
+from parse_video_py.web import app  # noqa: F401  保留 uvicorn main:app 用法
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # 多进程模式下 uvicorn 需要以导入字符串的形式加载 app
+    uvicorn.run(
+        "parse_video_py.web:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=int(os.getenv("PARSE_VIDEO_WORKERS", "1")),
+        timeout_graceful_shutdown=int(os.getenv("PARSE_VIDEO_GRACEFUL_TIMEOUT", "30")),
+    )
@@ -0,0 +1,159 @@
+"""aiohttp 连接池后端：以 httpx 传输层的形式接入，解析器仍然只使用 httpx 客户端接口"""
+
+import socket
+from typing import AsyncIterator
+
+import aiohttp
+import httpx
+from aiohttp.abc import AbstractResolver, ResolveResult
+
+from .resolver import DNSCache
+
+# aiohttp >= 3.10 才有 ConnectionTimeoutError
+_CONNECT_TIMEOUT_ERRORS = (getattr(aiohttp, "ConnectionTimeoutError", ()),)
+
+
+class CachedResolver(AbstractResolver):
+    """让 aiohttp 通过进程内 DNS 缓存解析域名（见 resolver.py）"""
+
+    def __init__(self, cache: DNSCache):
+        self._cache = cache
+
+    async def resolve(
+        self, host: str, port: int = 0, family: int = socket.AF_INET
+    ) -> list[ResolveResult]:
+        try:
+            addresses = await self._cache.resolve(host)
+        except OSError as err:
+            raise OSError(f"DNS 解析失败: {host}: {err}") from err
+        return [
+            {
+                "hostname": host,
+                "host": address,
+                "port": port,
+                "family": socket.AF_INET6 if ":" in address else socket.AF_INET,
+                "proto": 0,
+                "flags": socket.AI_NUMERICHOST,
+            }
+            for address in addresses
+        ]
+
+    async def close(self) -> None:
+        pass
+
+
+class _AiohttpStream(httpx.AsyncByteStream):
+    def __init__(self, response: aiohttp.ClientResponse, request: httpx.Request):
+        self._response = response
+        self._request = request
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._response.content.iter_chunked(65536):
+                yield chunk
+        except aiohttp.ClientError as err:
+            raise _map_error(err, self._request) from err
+
+    async def aclose(self) -> None:
+        # 已读完的连接放回连接池，未读完的直接关闭
+        self._response.release()
+
+
+def _map_error(err: Exception, request: httpx.Request) -> httpx.TransportError:
+    """把 aiohttp 的异常转换为 httpx 的对应异常，重试、熔断等逻辑按 httpx 异常判断"""
+    msg = str(err) or type(err).__name__
+    if isinstance(err, _CONNECT_TIMEOUT_ERRORS):
+        return httpx.ConnectTimeout(msg, request=request)
+    if isinstance(err, (aiohttp.ServerTimeoutError, TimeoutError)):
+        return httpx.ReadTimeout(msg, request=request)
+    if isinstance(
+        err, (aiohttp.ClientProxyConnectionError, aiohttp.ClientHttpProxyError)
+    ):
+        return httpx.ProxyError(msg, request=request)
+    if isinstance(err, aiohttp.ClientConnectorError):
+        return httpx.ConnectError(msg, request=request)
+    if isinstance(err, aiohttp.ServerDisconnectedError):
+        return httpx.RemoteProtocolError(msg, request=request)
+    if isinstance(err, aiohttp.ClientPayloadError):
+        return httpx.ReadError(msg, request=request)
+    return httpx.NetworkError(msg, request=request)
+
+
+class AiohttpTransport(httpx.AsyncBaseTransport):
+    """
+    基于 aiohttp.ClientSession 的传输层
+
+    - 重定向、Cookie、内容解码仍由 httpx 客户端处理，aiohttp 只负责收发
+    - 会话在第一次请求时创建，需在同一个事件循环内使用
+    """
+
+    def __init__(
+        self,
+        proxy: str | None = None,
+        limit: int = 100,
+        keepalive_expiry: float = 60,
+        dns_cache: DNSCache | None = None,
+    ):
+        self._proxy = proxy
+        self._limit = limit
+        self._keepalive_expiry = keepalive_expiry
+        self._dns_cache = dns_cache
+        self._session: aiohttp.ClientSession | None = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            resolver = None
+            if self._dns_cache is not None and self._dns_cache.enabled:
+                resolver = CachedResolver(self._dns_cache)
+            connector = aiohttp.TCPConnector(
+                limit=self._limit,
+                keepalive_timeout=self._keepalive_expiry,
+                resolver=resolver,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                cookie_jar=aiohttp.DummyCookieJar(),
+                auto_decompress=False,
+                skip_auto_headers=("User-Agent", "Accept-Encoding"),
+            )
+        return self._session
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        timeout = request.extensions.get("timeout", {})
+        client_timeout = aiohttp.ClientTimeout(
+            total=None,
+            connect=timeout.get("pool"),
+            sock_connect=timeout.get("connect"),
+            sock_read=timeout.get("read"),
+        )
+        try:
+            response = await self._get_session().request(
+                request.method,
+                str(request.url),
+                headers=[
+                    (k.decode("latin-1"), v.decode("latin-1"))
+                    for k, v in request.headers.raw
+                ],
+                data=await request.aread() or None,
+                allow_redirects=False,
+                proxy=self._proxy,
+                timeout=client_timeout,
+            )
+        except (aiohttp.ClientError, TimeoutError) as err:
+            raise _map_error(err, request) from err
+
+        version = response.version
+        return httpx.Response(
+            status_code=response.status,
+            headers=response.raw_headers,
+            stream=_AiohttpStream(response, request),
+            extensions={
+                "http_version": f"HTTP/{version.major}.{version.minor}".encode(),
+                "reason_phrase": (response.reason or "").encode(),
+            },
+        )
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
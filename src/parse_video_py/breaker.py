@@ -0,0 +1,223 @@
+"""按平台的熔断器：平台故障或封禁时快速失败，避免请求堆积等待超时"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from enum import Enum
+from typing import Iterator
+
+import httpx
+
+from .deadline import DeadlineExceeded, remaining_budget
+from .metrics import metrics
+
+# 视为平台被封禁/限流的状态码，计入失败
+_BLOCKING_STATUSES = frozenset({403, 429})
+
+
+class CircuitState(str, Enum):
+    """
+    熔断器状态
+    """
+
+    Closed = "closed"  # 正常放行
+    Open = "open"  # 熔断中，直接失败
+    HalfOpen = "half_open"  # 冷却结束，放行少量探测请求
+
+
+# 状态在 /metrics 中的数值表示
+_STATE_GAUGE = {
+    CircuitState.Closed: 0,
+    CircuitState.HalfOpen: 1,
+    CircuitState.Open: 2,
+}
+
+
+class CircuitOpenError(Exception):
+    """平台处于熔断状态，请求未发出即失败"""
+
+    def __init__(self, name: str, retry_after: float):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(
+            f"平台 {name} 暂时不可用（熔断中），请 {retry_after:.0f} 秒后重试"
+        )
+
+
+def is_caller_deadline(err: BaseException) -> bool:
+    """判断超时是否由调用方的截止时间耗尽导致，而非上游响应慢"""
+    if isinstance(err, DeadlineExceeded):
+        return True
+    if isinstance(err, (httpx.TimeoutException, TimeoutError)):
+        budget = remaining_budget()
+        return budget is not None and budget <= 0
+    return False
+
+
+def is_upstream_failure(err: BaseException) -> bool:
+    """判断异常是否代表上游故障（连接失败、超时、5xx、封禁），而非链接或内容问题"""
+    if is_caller_deadline(err):
+        return False
+    if isinstance(err, httpx.HTTPStatusError):
+        status = err.response.status_code
+        return status >= 500 or status in _BLOCKING_STATUSES
+    return isinstance(err, (httpx.HTTPError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    基于最近 window 次调用失败率的熔断器
+
+    - Closed：最近调用数达到 min_calls 且失败率 >= failure_rate_threshold 时熔断
+    - Open：open_seconds 内直接抛出 CircuitOpenError
+    - HalfOpen：冷却结束后最多放行 half_open_max_calls 个探测请求，
+      探测成功则恢复，失败则重新熔断
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float = 0.5,
+        window: int = 20,
+        min_calls: int = 10,
+        open_seconds: float = 30,
+        half_open_max_calls: int = 1,
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._results: deque[bool] = deque(maxlen=window)
+        self._state = CircuitState.Closed
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+        self._publish()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def snapshot(self) -> dict:
+        """导出当前状态，供管理接口展示"""
+        state = self.state
+        with self._lock:
+            retry_after = 0.0
+            if state == CircuitState.Open:
+                retry_after = self._opened_at + self.open_seconds - time.monotonic()
+            return {
+                "state": state.value,
+                "calls": len(self._results),
+                "failures": self._results.count(False),
+                "retry_after": max(retry_after, 0.0),
+            }
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """包裹一次平台调用：熔断时直接失败，否则按调用结果更新状态"""
+        self._before_call()
+        try:
+            yield
+        except Exception as err:
+            if is_caller_deadline(err):
+                # 调用方给的预算太短，无法说明上游是否健康，不计入结果
+                self._release_probe()
+            elif is_upstream_failure(err):
+                self._on_result(False)
+            else:
+                # 上游有正常响应，只是内容解析失败或链接无效
+                self._on_result(True)
+            raise
+        except BaseException:
+            # 调用被取消，不计入结果，只释放探测名额
+            self._release_probe()
+            raise
+        else:
+            self._on_result(True)
+
+    def _before_call(self) -> None:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CircuitState.Open:
+                retry_after = self._opened_at + self.open_seconds - time.monotonic()
+                metrics.inc("circuit_rejected_total", self.name)
+                raise CircuitOpenError(self.name, retry_after)
+            if self._state == CircuitState.HalfOpen:
+                if self._probes >= self.half_open_max_calls:
+                    metrics.inc("circuit_rejected_total", self.name)
+                    raise CircuitOpenError(self.name, 0)
+                self._probes += 1
+
+    def _on_result(self, success: bool) -> None:
+        with self._lock:
+            if self._state == CircuitState.HalfOpen:
+                self._probes = max(self._probes - 1, 0)
+                if success:
+                    self._transition(CircuitState.Closed)
+                else:
+                    self._transition(CircuitState.Open)
+                return
+
+            self._results.append(success)
+            if (
+                self._state == CircuitState.Closed
+                and len(self._results) >= self.min_calls
+                and self._results.count(False) / len(self._results)
+                >= self.failure_rate_threshold
+            ):
+                self._transition(CircuitState.Open)
+
+    def _release_probe(self) -> None:
+        with self._lock:
+            if self._state == CircuitState.HalfOpen:
+                self._probes = max(self._probes - 1, 0)
+
+    def _maybe_half_open(self) -> None:
+        if (
+            self._state == CircuitState.Open
+            and time.monotonic() - self._opened_at >= self.open_seconds
+        ):
+            self._transition(CircuitState.HalfOpen)
+
+    def _transition(self, state: CircuitState) -> None:
+        self._state = state
+        self._probes = 0
+        if state == CircuitState.Open:
+            self._opened_at = time.monotonic()
+        if state == CircuitState.Closed:
+            self._results.clear()
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.set_gauge("circuit_state", self.name, _STATE_GAUGE[self._state])
+
+
+class CircuitBreakerRegistry:
+    """
+    按名称（平台取值，如 douyin）懒创建熔断器
+    """
+
+    def __init__(self, **breaker_kwargs):
+        self._breaker_kwargs = breaker_kwargs
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, **self._breaker_kwargs)
+                self._breakers[name] = breaker
+            return breaker
+
+    def snapshot(self) -> dict[str, dict]:
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,295 @@
+"""
+分享链接规范化：不访问网络，把分享链接映射到 (平台, 视频ID, 是否需要请求才能确定)
+
+- 各平台从链接中提取视频ID的规则集中在这里，解析器与去重、合并请求共用同一套规则
+- canonical_key 去掉追踪参数后生成稳定的键，同一视频的不同链接得到相同的键，
+  用于批量解析去重和 Web 服务合并相同解析（SingleFlight）
+- extract_urls 一次扫描整段文本，按同一份域名索引筛出所有支持平台的分享链接
+"""
+
+import base64
+import binascii
+import re
+from typing import Callable, NamedTuple
+from urllib.parse import SplitResult, parse_qsl, unquote, urlencode, urlsplit
+
+from .parser.base import VideoSource
+from .utils import URL_REG, extract_url
+
+
+class Canonical(NamedTuple):
+    """
+    规范化结果
+
+    - video_id：链接中能稳定标识视频的部分，多数平台可直接用于 parse_video_id，
+      链接中没有时为 None
+    - needs_resolution：短链等需要请求一次（跟随重定向）才能拿到视频ID
+    """
+
+    source: VideoSource
+    video_id: str | None
+    needs_resolution: bool
+
+
+def _query_re(key: str) -> re.Pattern:
+    return re.compile(rf"(?:^|&){key}=([^&]+)")
+
+
+_q_id = _query_re("id")
+_q_vid = _query_re("vid")
+_q_fid = _query_re("fid")
+_q_pid = _query_re("pid")
+_q_sid = _query_re("sid")
+_q_s = _query_re("s")
+_q_modal_id = _query_re("modal_id")
+
+_acfun_path_re = re.compile(r"^/v/(ac\d+)")
+_bilibili_path_re = re.compile(r"^/video/(BV[0-9A-Za-z]+)")
+_cctv_path_re = re.compile(r"/(VIDE[0-9A-Za-z]+)\.shtml")
+# www.douyin.com/video/{id}、www.iesdouyin.com/share/video/{id}、图集 note / slides
+_douyin_path_re = re.compile(r"^/(?:share/)?(?:video|note|slides)/(\d+)")
+_huya_path_re = re.compile(r"/(\d+)\.html")
+_lishipin_path_re = re.compile(r"^/detail_(\d+)")
+_meipai_path_re = re.compile(r"^/(?:video|media)/(\d+)")
+_pipigaoxiao_path_re = re.compile(r"^/pp/post/(\d+)")
+_pipixia_path_re = re.compile(r"^/item/(\d+)")
+_qq_vid_path_re = re.compile(r"/x/(?:page|cover)/(?:[^/]+/)?(\w+)\.html")
+_redbook_path_re = re.compile(r"^/(?:explore|discovery/item)/([0-9a-f]{24})")
+_sohu_base64_vid_re = re.compile(r"/v/([A-Za-z0-9+/=]+)\.html")
+_sohu_user_vid_re = re.compile(r"/?us/\d+/(\d+)\.shtml")
+_twitter_status_re = re.compile(r"^/[^/]+/status(?:es)?/(\d+)")
+_weibo_tv_re = re.compile(r"^/tv/show/([^/]+)")
+_xigua_path_re = re.compile(r"^/(?:video/)?(\d+)")
+_xinpianchang_path_re = re.compile(r"^/(a\d+)")
+
+# 需要跟随一次重定向才能拿到视频ID的短链域名
+_short_link_hosts = {
+    "v.douyin.com",
+    "b23.tv",
+    "v.kuaishou.com",
+    "h5.pipix.com",
+    "v.ixigua.com",
+    "xhslink.com",
+    "xhslink.cn",
+    "t.co",
+}
+
+# 生成键时去掉的追踪参数，不影响链接指向的视频
+_tracking_params = {
+    "from",
+    "from_source",
+    "from_spmid",
+    "vd_source",
+    "is_story_h5",
+    "timestamp",
+    "ptag",
+    "region",
+    "mid",
+    "u_code",
+    "did",
+    "iid",
+    "with_sec_did",
+    "sec_uid",
+    "app_platform",
+    "apptime",
+    "xsec_token",
+    "xsec_source",
+    "previous_page",
+    "enter_from",
+}
+_tracking_prefixes = ("utm_", "spm", "share_")
+
+
+def _search(pattern: re.Pattern, text: str) -> str | None:
+    match = pattern.search(text)
+    if match is None:
+        return None
+    value = match.group(1)
+    return unquote(value) if "%" in value else value
+
+
+def _douyin_id(parts: SplitResult) -> str | None:
+    return _search(_q_modal_id, parts.query) or _search(_douyin_path_re, parts.path)
+
+
+def _qqvideo_id(parts: SplitResult) -> str | None:
+    if parts.hostname == "m.v.qq.com":
+        return _search(_q_vid, parts.query)
+    return _search(_qq_vid_path_re, parts.path)
+
+
+def sohu_id_from_path(path: str) -> str | None:
+    """从 us/{uid}/{vid}.shtml 格式的路径中提取搜狐视频ID"""
+    return _search(_sohu_user_vid_re, path)
+
+
+def _sohu_id(parts: SplitResult) -> str | None:
+    path = parts.path
+    match = _sohu_base64_vid_re.search(path)
+    if match:
+        try:
+            path = base64.b64decode(match.group(1)).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            return None
+    return sohu_id_from_path(path)
+
+
+def _sixroom_id(parts: SplitResult) -> str | None:
+    if parts.path.endswith("watchMini.php"):
+        return _search(_q_vid, parts.query)
+    return parts.path.strip("/").rpartition("/")[2] or None
+
+
+def _weibo_id(parts: SplitResult) -> str | None:
+    if parts.path.endswith("/show"):
+        return _search(_q_fid, parts.query)
+    # 普通微博（可能是图集）的 /{uid}/{post_id} 不是视频ID，按链接区分
+    return _search(_weibo_tv_re, parts.path)
+
+
+def _path(pattern: re.Pattern) -> Callable[[SplitResult], str | None]:
+    return lambda parts: _search(pattern, parts.path)
+
+
+def _query(pattern: re.Pattern) -> Callable[[SplitResult], str | None]:
+    return lambda parts: _search(pattern, parts.query)
+
+
+# 各平台从链接中提取视频ID的规则，提取不到时返回 None
+_id_extractors: dict[VideoSource, Callable[[SplitResult], str | None]] = {
+    VideoSource.AcFun: _path(_acfun_path_re),
+    VideoSource.BiliBili: _path(_bilibili_path_re),
+    VideoSource.CCTV: _path(_cctv_path_re),
+    VideoSource.DouPai: _query(_q_id),
+    VideoSource.DouYin: _douyin_id,
+    VideoSource.HaoKan: _query(_q_vid),
+    VideoSource.HuYa: _path(_huya_path_re),
+    VideoSource.KuaiShou: lambda parts: None,
+    VideoSource.LiShiPin: _path(_lishipin_path_re),
+    VideoSource.LvZhou: _query(_q_sid),
+    VideoSource.MeiPai: _path(_meipai_path_re),
+    VideoSource.PiPiGaoXiao: _path(_pipigaoxiao_path_re),
+    VideoSource.PiPiXia: _path(_pipixia_path_re),
+    VideoSource.QQVideo: _qqvideo_id,
+    VideoSource.QuanMin: _query(_q_vid),
+    VideoSource.QuanMinKGe: _query(_q_s),
+    VideoSource.RedBook: _path(_redbook_path_re),
+    VideoSource.SixRoom: _sixroom_id,
+    VideoSource.Sohu: _sohu_id,
+    VideoSource.Twitter: _path(_twitter_status_re),
+    VideoSource.WeiBo: _weibo_id,
+    VideoSource.WeiShi: _query(_q_id),
+    VideoSource.XiGua: _path(_xigua_path_re),
+    VideoSource.XinPianChang: _path(_xinpianchang_path_re),
+    VideoSource.ZuiYou: _query(_q_pid),
+}
+
+# 域名 -> 平台，首次使用时由 video_source_info_mapping 构建
+_host_index: dict[str, VideoSource] = {}
+
+
+def _source_for(parts: SplitResult) -> VideoSource | None:
+    """按域名找到平台：只匹配完全相同的域名或其子域名，其他网址返回 None"""
+    if not _host_index:
+        from .parser import video_source_info_mapping
+
+        for source, info in video_source_info_mapping.items():
+            for domain in info["domain_list"]:
+                _host_index.setdefault(domain, source)
+
+    host = parts.hostname or ""
+    # 逐级去掉子域名查找，m.oasis.weibo.cn -> oasis.weibo.cn -> weibo.cn
+    while host:
+        source = _host_index.get(host)
+        if source is not None:
+            return source
+        host = host.partition(".")[2]
+    return None
+
+
+def extract_video_id(source: VideoSource, url: str) -> str | None:
+    """按平台规则从链接中提取视频ID，不访问网络，提取不到时返回 None"""
+    try:
+        return _id_extractors[source](urlsplit(url))
+    except ValueError:
+        return None
+
+
+def require_video_id(source: VideoSource, url: str) -> str:
+    """同 extract_video_id，提取不到时抛出 ValueError，供解析器的 parse_share_url 使用"""
+    video_id = extract_video_id(source, url)
+    if not video_id:
+        raise ValueError(f"无法从链接 {url} 中提取视频ID")
+    return video_id
+
+
+def canonicalize(url: str) -> Canonical:
+    """规范化分享链接，不支持的平台抛出 ValueError"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        raise ValueError(f"share url [{url}] is not a valid url")
+    source = _source_for(parts)
+    if source is None:
+        raise ValueError(f"share url [{url}] does not have source config")
+    video_id = _id_extractors[source](parts)
+    needs_resolution = video_id is None and parts.hostname in _short_link_hosts
+    return Canonical(source, video_id, needs_resolution)
+
+
+def strip_tracking_params(url: str) -> str:
+    """
+    去掉链接中的追踪参数和锚点，域名转小写，剩余参数按名称排序，
+    省略协议和路径末尾的 /，得到同一链接各种写法共用的形式
+    """
+    parts = urlsplit(url)
+    query = ""
+    if parts.query:
+        params = sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key not in _tracking_params and not key.startswith(_tracking_prefixes)
+        )
+        query = urlencode(params)
+    host = (parts.hostname or "") + (f":{parts.port}" if parts.port else "")
+    path = parts.path.rstrip("/")
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def canonical_key(url: str) -> str:
+    """
+    同一视频的不同链接共用的键：能确定视频ID时为 平台:视频ID，
+    否则为 平台:去掉追踪参数后的链接；不支持的平台为去掉追踪参数后的链接
+    """
+    try:
+        canonical = canonicalize(url)
+    except ValueError:
+        return strip_tracking_params(url)
+    if canonical.video_id is not None:
+        return f"{canonical.source.value}:{canonical.video_id}"
+    return f"{canonical.source.value}:{strip_tracking_params(url)}"
+
+
+def dedup_key(text: str) -> str:
+    """批量解析的去重键：先从输入中提取分享链接，没有链接时为原始输入"""
+    share_url = extract_url(text)
+    if share_url is None:
+        return text
+    return canonical_key(share_url)
+
+
+def extract_urls(text: str) -> list[str]:
+    """
+    一次扫描提取文本中所有支持平台的分享链接，按出现顺序返回；
+    不支持的平台的链接（如文本中夹带的其他网址）被忽略，不做去重
+    """
+    urls = []
+    for match in URL_REG.finditer(text):
+        url = match.group()
+        try:
+            parts = urlsplit(url)
+        except ValueError:
+            continue
+        if _source_for(parts) is not None:
+            urls.append(url)
+    return urls
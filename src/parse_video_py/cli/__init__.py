@@ -1,5 +1,7 @@
 """parse-video-py CLI 工具"""
 
+import os
+
 import typer
 
 app = typer.Typer(
@@ -23,19 +25,96 @@ def version():
 @app.command()
 def parse(
     urls: list[str] = typer.Argument(None, help="视频分享链接"),
-    fmt: str = typer.Option("text", "--format", help="输出格式: json, text"),
+    fmt: str = typer.Option("text", "--format", help="输出格式: json, text, jsonl"),
     file: str = typer.Option(None, "--file", "-f", help="从文件读取链接（每行一个，- 代表 stdin）"),
+    timeout: float = typer.Option(
+        None, "--timeout", "-t", min=0.1, help="单条链接的解析超时（秒），默认不限"
+    ),
+    ordered: bool = typer.Option(
+        False, "--ordered", help="多条链接按输入顺序输出，默认按完成顺序输出"
+    ),
+    follow: bool = typer.Option(
+        False, "--follow", help="配合 --file 使用，读到文件末尾后继续等待新写入的链接"
+    ),
+    concurrency: int = typer.Option(
+        10, "--concurrency", "-c", min=1, help="多条链接的总并发数"
+    ),
+    platform_concurrency: list[str] = typer.Option(
+        None,
+        "--per-platform-concurrency",
+        help="单个平台的并发上限，如 douyin=3，可重复指定",
+    ),
+    rates: list[str] = typer.Option(
+        None, "--rate", help="单个平台的上游请求速率，如 sohu=5/s，可重复指定"
+    ),
+    checkpoint: str = typer.Option(
+        None,
+        "--checkpoint",
+        help="配合 --file 使用，记录已完成的条目，中断后重新运行时跳过",
+    ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        help="多条链接分片到多个进程解析，并发与速率上限由各进程分摊",
+    ),
+    dedup: bool = typer.Option(
+        True,
+        "--dedup/--no-dedup",
+        help="多条链接中同一视频的不同链接只解析一次，结果分别输出",
+    ),
+    all_links: bool = typer.Option(
+        False,
+        "--all-links",
+        help="从每条输入（整段文本）中提取全部支持平台的分享链接，逐条解析",
+    ),
 ):
     """解析视频分享链接，支持单条和多条"""
     from parse_video_py.cli._parse import run_parse
 
-    run_parse(urls, fmt, file)
+    run_parse(
+        urls,
+        fmt,
+        file,
+        timeout,
+        ordered,
+        follow,
+        concurrency,
+        platform_concurrency,
+        rates,
+        checkpoint,
+        workers,
+        dedup,
+        all_links,
+    )
 
 
 @app.command()
 def serve(
     host: str = typer.Option("0.0.0.0", "--host", help="服务监听地址"),
     port: int = typer.Option(8000, "--port", "-p", help="服务监听端口"),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        envvar="PARSE_VIDEO_WORKERS",
+        help="工作进程数，多进程时由 uvicorn 管理",
+    ),
+    graceful_timeout: int = typer.Option(
+        30,
+        "--graceful-timeout",
+        min=0,
+        envvar="PARSE_VIDEO_GRACEFUL_TIMEOUT",
+        help="收到 SIGTERM 后等待进行中请求完成的最长秒数",
+    ),
+    warmup: bool = typer.Option(
+        False,
+        "--warmup",
+        envvar="PARSE_VIDEO_WARMUP",
+        help="启动后在后台预热到各平台接口的长连接",
+    ),
 ):
     """启动 HTTP 解析服务"""
     # 延迟导入 uvicorn，避免只安装 .[cli] 时因缺少 uvicorn 导致整个 CLI 崩溃
@@ -47,9 +126,16 @@ def serve(
             err=True,
         )
         raise typer.Exit(code=1)
+    # 通过环境变量传给各工作进程，由 Web 服务启动时读取
+    os.environ["PARSE_VIDEO_WORKERS"] = str(workers)
+    if warmup:
+        os.environ["PARSE_VIDEO_WARMUP"] = "1"
     uvicorn.run(
         "parse_video_py.web:app",
         host=host,
         port=port,
         reload=False,
+        workers=workers,
+        # SIGTERM 时先停止接收新连接，进行中的解析在超时前可以正常完成
+        timeout_graceful_shutdown=graceful_timeout,
     )
@@ -2,100 +2,624 @@
 
 import asyncio
 import sys
-from pathlib import Path
+import threading
+import time
+from collections import OrderedDict
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    TextIO,
+    TypeVar,
+)
 
 import typer
 
 from parse_video_py import parse_video_share_url
-from parse_video_py.cli.output import output_batch_error, output_result
-from parse_video_py.parser.base import VideoInfo
+from parse_video_py.canonical import dedup_key, extract_urls
+from parse_video_py.cli.checkpoint import Checkpoint
+from parse_video_py.cli.output import JsonlWriter, output_batch_error, output_result
+from parse_video_py.limiter import AIMDLimiter, parse_rate, rate_limiters
+from parse_video_py.parser import find_source, parser_registry
+from parse_video_py.parser.base import VideoInfo, VideoSource
+from parse_video_py.transport import shared_transports
 from parse_video_py.utils import extract_url
 
+# --concurrency 的默认值
 _CONCURRENCY_LIMIT = 10
-_sem = asyncio.Semaphore(_CONCURRENCY_LIMIT)
 
+# 设置了单平台并发时，最多同时排队的任务数（总并发数的倍数），
+# 让等待受限平台名额的任务不至于占满所有位置、拖慢其他平台
+_PLATFORM_QUEUE_FACTOR = 4
 
-def _read_inputs_from_file(file_path: str) -> list[str]:
-    """从文件读取 URL 列表，每行一个"""
+# --ordered 时最多领先尚未输出的最早一条多少条开始解析（并发数的倍数），
+# 已完成但需等待前面结果的条目暂存在重排缓冲区中，内存占用与并发数成正比
+_REORDER_WINDOW_FACTOR = 4
+
+# 读取输入时最多预读多少行（并发数的倍数），解析跟不上时读取线程暂停
+_INPUT_BUFFER_FACTOR = 2
+
+# --follow 读到文件末尾后等待新内容的轮询间隔（秒）
+_FOLLOW_POLL_INTERVAL = 0.5
+
+# 去重时保留最近多少个已完成视频的结果，之后再出现的重复链接直接复用；
+# 超出后最早的结果被淘汰，内存占用与输入大小无关
+_DEDUP_CACHE_SIZE = 20000
+
+BatchResult = tuple[int, str, VideoInfo | None, Exception | None]
+
+T = TypeVar("T")
+
+_EOF = object()
+
+
+def _open_input(file_path: str) -> TextIO:
+    """打开输入文件，- 代表 stdin"""
     if file_path == "-":
-        lines = sys.stdin.read().splitlines()
-    else:
+        return sys.stdin
+    try:
+        return open(file_path, encoding="utf-8")
+    except (FileNotFoundError, IsADirectoryError, PermissionError):
+        typer.echo(f"无法读取文件: {file_path}", err=True)
+        raise typer.Exit(code=1)
+
+
+def _input_buffer_size(concurrency: int, workers: int = 1) -> int:
+    """预读行数：并发数的 _INPUT_BUFFER_FACTOR 倍，多进程时按各进程分到的并发数合计"""
+    if workers > 1:
+        from parse_video_py.cli._shard import split_limits
+
+        concurrency = split_limits(workers, concurrency, {}, [])[0] * workers
+    return concurrency * _INPUT_BUFFER_FACTOR
+
+
+async def _read_lines(
+    stream: TextIO,
+    follow: bool = False,
+    buffer_size: int = _CONCURRENCY_LIMIT * _INPUT_BUFFER_FACTOR,
+    poll_interval: float = _FOLLOW_POLL_INTERVAL,
+) -> AsyncIterator[str]:
+    """
+    逐行读取输入，跳过空行
+
+    在后台线程中读取，避免管道读取阻塞事件循环；最多预读 buffer_size 行，
+    下游处理不过来时读取线程暂停，内存占用与输入大小无关。
+    follow=True 时读到末尾后继续等待新写入的行（类似 tail -f），直到被中断
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    slots = threading.Semaphore(buffer_size)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        while not slots.acquire(timeout=poll_interval):
+            if stop.is_set():
+                return False
+        loop.call_soon_threadsafe(queue.put_nowait, item)
+        return True
+
+    def read() -> None:
+        partial = ""
         try:
-            lines = Path(file_path).read_text(encoding="utf-8").splitlines()
-        except FileNotFoundError:
-            typer.echo(f"无法读取文件: {file_path}", err=True)
-            raise typer.Exit(code=1)
-    return [line.strip() for line in lines if line.strip()]
+            while not stop.is_set():
+                line = stream.readline()
+                if not line:
+                    if not follow:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                if follow and not line.endswith("\n"):
+                    # 写入方还没写完这一行，等换行符出现后再处理
+                    partial += line
+                    continue
+                line, partial = (partial + line).strip(), ""
+                if line and not put(line):
+                    return
+            if partial.strip():
+                put(partial.strip())
+            put(_EOF)
+        except RuntimeError:
+            # 事件循环已关闭，消费方已经退出
+            pass
+        except Exception as err:
+            put(err)
+
+    threading.Thread(target=read, name="parse-video-input", daemon=True).start()
+    try:
+        while True:
+            item = await queue.get()
+            slots.release()
+            if item is _EOF:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+
+async def _aiter(items: Iterable[str]) -> AsyncIterator[str]:
+    for item in items:
+        yield item
+
+
+async def _split_links(inputs: AsyncIterator[str]) -> AsyncIterator[str]:
+    """把每条输入（整段文本）拆成其中的全部分享链接，没有链接的输入被忽略"""
+    try:
+        async for text in inputs:
+            for url in extract_urls(text):
+                yield url
+    finally:
+        if hasattr(inputs, "aclose"):
+            await inputs.aclose()
+
+
+async def _enumerate(
+    inputs: AsyncIterator[str], skip: Callable[[int, str], bool] | None = None
+) -> AsyncIterator[tuple[int, str]]:
+    """为输入编号（从 0 开始），跳过 skip 返回 True 的条目，编号不受跳过影响"""
+    index = 0
+    async for url in inputs:
+        if skip is None or not skip(index, url):
+            yield index, url
+        index += 1
+
+
+async def _next_input(inputs: AsyncIterator):
+    try:
+        return await inputs.__anext__()
+    except StopAsyncIteration:
+        return _EOF
+
+
+async def _closing_parsers(aw: Awaitable[T]) -> T:
+    """
+    运行 aw，结束后关闭本次事件循环中创建的解析器实例和共享连接池，
+    与 Web 服务退出时的顺序一致：解析器可能持有连接，先于连接池关闭
+    """
+    try:
+        return await aw
+    finally:
+        await parser_registry.aclose_all()
+        await shared_transports.aclose_all()
 
 
 async def _parse_single(
     url: str,
-) -> tuple[VideoInfo | None, str | None]:
-    """解析单条 URL，返回 (VideoInfo, error_msg)"""
+    timeout: float | None = None,
+) -> tuple[VideoInfo | None, Exception | None]:
+    """解析单条 URL，返回 (VideoInfo, 异常)"""
     try:
         extracted = extract_url(url)
         if not extracted:
-            return None, f"未检测到有效的分享链接: {url}"
-        info = await parse_video_share_url(extracted)
+            return None, ValueError(f"未检测到有效的分享链接: {url}")
+        info = await parse_video_share_url(extracted, timeout=timeout)
         return info, None
     except Exception as e:
-        return None, str(e)
+        return None, e
+
+
+async def _parse_indexed(index: int, url: str, timeout: float | None) -> BatchResult:
+    info, err = await _parse_single(url, timeout)
+    return index, url, info, err
+
+
+def _parse_platform_limits(specs: list[str] | None) -> dict[str, int]:
+    """解析 --per-platform-concurrency 的 source=N 配置"""
+    sources = {source.value for source in VideoSource}
+    limits = {}
+    for spec in specs or []:
+        source, sep, value = spec.partition("=")
+        source = source.strip().lower()
+        if not sep or source not in sources:
+            raise ValueError(
+                f"无效的平台并发配置: {spec}，格式为 平台=并发数，如 douyin=3"
+            )
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = 0
+        if limit < 1:
+            raise ValueError(f"无效的平台并发配置: {spec}，并发数必须为正整数")
+        limits[source] = limit
+    return limits
+
 
+def _parse_rates(specs: list[str] | None) -> list[tuple[str, float]]:
+    """
+    解析 --rate 的 source=R/s 配置，返回 (平台或域名, 每秒请求数)。
+    速率写入与 Web 服务的 PARSE_VIDEO_RATE_LIMITS 同一套令牌桶，
+    作用于解析过程中发往上游的每个请求
+    """
+    rates = []
+    for spec in specs or []:
+        key, sep, rate = spec.rpartition("=")
+        if not sep or not key.strip():
+            raise ValueError(f"无效的速率配置: {spec}，格式为 平台=速率，如 douyin=5/s")
+        rates.append((key.strip().lower(), parse_rate(rate)))
+    return rates
 
-async def _limited_parse_single(url: str) -> tuple[VideoInfo | None, str | None]:
-    """带并发限制的单条解析"""
-    async with _sem:
-        return await _parse_single(url)
 
+class _BatchScheduler:
+    """
+    批量解析调度器，必须在事件循环内创建
 
-async def _parse_batch(
-    urls: list[str],
-) -> list[tuple[str, VideoInfo | None, str | None]]:
-    """批量解析 URL（带并发限制）"""
-    tasks = [_limited_parse_single(url) for url in urls]
-    results = await asyncio.gather(*tasks)
-    return [(url, info, err) for url, (info, err) in zip(urls, results)]
+    复用 Web 服务的并发限制器：总并发由一个固定上限的限制器控制，
+    设置了单平台并发的平台各有一个限制器，任务先获取平台名额再获取总名额，
+    受限平台排队时不占用总名额
+    """
 
+    def __init__(self, concurrency: int, platform_limits: dict[str, int] | None = None):
+        self.concurrency = concurrency
+        self._global = AIMDLimiter("cli", concurrency, concurrency, concurrency)
+        self._platforms = {
+            source: AIMDLimiter(f"cli:{source}", limit, limit, limit)
+            for source, limit in (platform_limits or {}).items()
+        }
+        if self._platforms:
+            self.max_tasks = concurrency * _PLATFORM_QUEUE_FACTOR
+        else:
+            self.max_tasks = concurrency
 
-def run_parse(urls: list[str] | None, fmt: str, file: str | None) -> None:
+    def _platform_limiter(self, url: str) -> AIMDLimiter | None:
+        if not self._platforms:
+            return None
+        extracted = extract_url(url)
+        source = find_source(extracted) if extracted else None
+        return self._platforms.get(source.value) if source else None
+
+    async def run(self, index: int, url: str, timeout: float | None) -> BatchResult:
+        platform = self._platform_limiter(url)
+        if platform is not None:
+            await platform.acquire()
+        try:
+            await self._global.acquire()
+            try:
+                return await _parse_indexed(index, url, timeout)
+            finally:
+                self._global.release()
+        finally:
+            if platform is not None:
+                platform.release()
+
+
+async def _iter_batch(
+    urls: Iterable[str] | AsyncIterable[str],
+    timeout: float | None = None,
+    concurrency: int = _CONCURRENCY_LIMIT,
+    ordered: bool = False,
+    platform_limits: dict[str, int] | None = None,
+    skip: Callable[[int, str], bool] | None = None,
+    dedup: bool = True,
+) -> AsyncIterator[BatchResult]:
+    """
+    批量解析 URL，逐条产出 (序号, URL, VideoInfo, 异常)
+
+    输入按需读取：同时最多有 concurrency 条在解析，有空位时才读取下一条，
+    等待输入期间已完成的结果照常产出。
+    platform_limits 为各平台（VideoSource 取值）的并发上限，
+    此时最多有 concurrency * _PLATFORM_QUEUE_FACTOR 条在排队或解析。
+    默认按完成顺序产出；ordered=True 时按输入顺序产出，
+    并且只在领先最早未产出条目不超过排队上限 * _REORDER_WINDOW_FACTOR 时开始新的解析。
+    skip(序号, URL) 返回 True 的条目不解析也不产出（如检查点中已完成的条目），
+    产出的序号始终是该条在输入中的位置。
+    dedup=True 时按 dedup_key 识别同一视频的不同链接，每个视频只解析一次，
+    结果按各自的序号和原始输入分别产出；等待中的重复条目同样受
+    排队上限 * _REORDER_WINDOW_FACTOR 限制，达到后暂停读取
+    """
+    if not isinstance(urls, AsyncIterable):
+        urls = _aiter(urls)
+    inputs = urls.__aiter__()
+    items = _enumerate(inputs, skip)
+    # 在事件循环内创建调度器，限制器的等待队列绑定当前循环
+    scheduler = _BatchScheduler(concurrency, platform_limits)
+    window = scheduler.max_tasks * _REORDER_WINDOW_FACTOR
+    pending: set[asyncio.Task] = set()
+    reading: asyncio.Task | None = None
+    # 任务 -> 开始顺序，重排按开始顺序进行，跳过的条目不会留下空位
+    sequence: dict[asyncio.Task, int] = {}
+    reorder: dict[int, BatchResult] = {}
+    # 去重：解析中的视频 -> 任务，任务 -> 等待同一结果的重复条目 (顺序号, 序号, URL)，
+    # 以及最近完成的视频结果
+    flights: dict[str, asyncio.Task] = {}
+    task_keys: dict[asyncio.Task, str] = {}
+    followers: dict[asyncio.Task, list[tuple[int, int, str]]] = {}
+    resolved: OrderedDict[str, tuple[VideoInfo | None, Exception | None]] = (
+        OrderedDict()
+    )
+    ready: list[tuple[int, BatchResult]] = []
+    # 等待解析中视频结果的重复条目数，达到 window 时暂停读取，内存占用与输入大小无关
+    held = 0
+    next_index = 0
+    started = 0
+    exhausted = False
+    try:
+        while True:
+            if (
+                reading is None
+                and not exhausted
+                and len(pending) < scheduler.max_tasks
+                and held < window
+                and (not ordered or started - next_index < window)
+            ):
+                reading = asyncio.create_task(_next_input(items))
+            waiting = pending | {reading} if reading is not None else pending
+            if not waiting:
+                return
+
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if reading in done:
+                done.discard(reading)
+                item = reading.result()
+                reading = None
+                if item is _EOF:
+                    exhausted = True
+                else:
+                    index, url = item
+                    key = dedup_key(url) if dedup else None
+                    if key in resolved:
+                        resolved.move_to_end(key)
+                        ready.append((started, (index, url, *resolved[key])))
+                    elif key in flights:
+                        followers[flights[key]].append((started, index, url))
+                        held += 1
+                    else:
+                        task = asyncio.create_task(scheduler.run(index, url, timeout))
+                        pending.add(task)
+                        sequence[task] = started
+                        if key is not None:
+                            flights[key] = task
+                            task_keys[task] = key
+                            followers[task] = []
+                    started += 1
+
+            pending -= done
+            for task in done:
+                result = task.result()
+                ready.append((sequence.pop(task), result))
+                key = task_keys.pop(task, None)
+                if key is None:
+                    continue
+                _, _, info, err = result
+                del flights[key]
+                resolved[key] = (info, err)
+                if len(resolved) > _DEDUP_CACHE_SIZE:
+                    resolved.popitem(last=False)
+                waiters = followers.pop(task)
+                held -= len(waiters)
+                for seq, index, url in waiters:
+                    ready.append((seq, (index, url, info, err)))
+
+            for seq, result in ready:
+                if ordered:
+                    reorder[seq] = result
+                else:
+                    yield result
+            ready.clear()
+            while next_index in reorder:
+                yield reorder.pop(next_index)
+                next_index += 1
+    finally:
+        # 提前退出（如下游管道关闭、Ctrl+C）时取消仍在进行的解析和读取
+        for task in pending:
+            task.cancel()
+        if reading is not None:
+            reading.cancel()
+            await asyncio.gather(reading, return_exceptions=True)
+        await items.aclose()
+        if hasattr(inputs, "aclose"):
+            await inputs.aclose()
+
+
+async def _run_batch(
+    urls: Iterable[str] | AsyncIterable[str],
+    fmt: str,
+    timeout: float | None = None,
+    ordered: bool = False,
+    concurrency: int = _CONCURRENCY_LIMIT,
+    platform_limits: dict[str, int] | None = None,
+    checkpoint: Checkpoint | None = None,
+    workers: int = 1,
+    rates: list[tuple[str, float]] | None = None,
+    dedup: bool = True,
+) -> tuple[int, int]:
+    """
+    批量解析并在每条完成时立即输出，返回 (本次解析的条数, 失败条数)
+
+    指定 checkpoint 时跳过其中已完成的条目，每条结果输出后追加到检查点；
+    workers > 1 时分片到多个进程解析，rates 由各进程分摊
+    """
+    total = 0
+    fail_count = 0
+    writer = JsonlWriter() if fmt == "jsonl" else None
+    skip = checkpoint.is_done if checkpoint is not None else None
+    if workers > 1:
+        from parse_video_py.cli._shard import iter_sharded
+
+        results = iter_sharded(
+            urls,
+            workers,
+            timeout,
+            concurrency,
+            ordered,
+            platform_limits,
+            rates,
+            skip,
+            dedup,
+        )
+    else:
+        results = _iter_batch(
+            urls, timeout, concurrency, ordered, platform_limits, skip, dedup
+        )
+    try:
+        async for index, url, info, err in results:
+            total += 1
+            if err:
+                fail_count += 1
+            if writer is not None:
+                # 失败也作为一条记录写入 stdout，便于下游统一处理
+                writer.write(index, url, info, err)
+            else:
+                if total > 1 and fmt == "text":
+                    print()
+                if err:
+                    output_batch_error(url, str(err))
+                else:
+                    output_result(info, fmt)
+                # 输出到管道时 stdout 为块缓冲，逐条刷新让下游立即收到结果
+                sys.stdout.flush()
+            if checkpoint is not None:
+                checkpoint.record(index, url, info, err)
+    finally:
+        if writer is not None:
+            writer.flush()
+        if checkpoint is not None:
+            checkpoint.flush()
+    return total, fail_count
+
+
+def run_parse(
+    urls: list[str] | None,
+    fmt: str,
+    file: str | None,
+    timeout: float | None = None,
+    ordered: bool = False,
+    follow: bool = False,
+    concurrency: int = _CONCURRENCY_LIMIT,
+    platform_concurrency: list[str] | None = None,
+    rates: list[str] | None = None,
+    checkpoint_path: str | None = None,
+    workers: int = 1,
+    dedup: bool = True,
+    all_links: bool = False,
+) -> None:
     """parse 命令入口，由 cli/__init__.py 延迟调用"""
-    if fmt not in ("json", "text"):
-        typer.echo(f"不支持的输出格式: {fmt}，可选值: json, text", err=True)
+    if fmt not in ("json", "text", "jsonl"):
+        typer.echo(f"不支持的输出格式: {fmt}，可选值: json, text, jsonl", err=True)
         raise typer.Exit(code=1)
 
+    try:
+        platform_limits = _parse_platform_limits(platform_concurrency)
+        rate_limits = _parse_rates(rates)
+    except ValueError as e:
+        typer.echo(str(e), err=True)
+        raise typer.Exit(code=1)
+    if workers == 1:
+        for key, rate in rate_limits:
+            rate_limiters.configure(key, rate)
+
     if urls and file:
         typer.echo("不能同时指定链接和文件输入", err=True)
         raise typer.Exit(code=1)
 
-    inputs: list[str] = []
-    if file:
-        inputs = _read_inputs_from_file(file)
-    elif urls:
-        inputs = list(urls)
-    else:
-        typer.echo("请提供要解析的链接或指定 --file", err=True)
+    if follow and not file:
+        typer.echo("--follow 需要配合 --file 使用", err=True)
+        raise typer.Exit(code=1)
+
+    if checkpoint_path and not file:
+        typer.echo("--checkpoint 需要配合 --file 使用", err=True)
         raise typer.Exit(code=1)
 
-    if not inputs:
+    if file:
+        checkpoint = None
+        if checkpoint_path:
+            checkpoint = Checkpoint(checkpoint_path)
+            try:
+                if checkpoint.load():
+                    typer.echo(
+                        f"从检查点恢复: 已完成 {checkpoint.completed} 条，将跳过",
+                        err=True,
+                    )
+                checkpoint.open()
+            except OSError as e:
+                typer.echo(f"无法使用检查点文件: {e}", err=True)
+                raise typer.Exit(code=1)
+        # 文件和 stdin 逐行读取，不预先载入全部内容
+        stream = _open_input(file)
+        try:
+            lines = _read_lines(
+                stream,
+                follow=follow and file != "-",
+                buffer_size=_input_buffer_size(concurrency, workers),
+            )
+            if all_links:
+                lines = _split_links(lines)
+            total, fail_count = asyncio.run(
+                _closing_parsers(
+                    _run_batch(
+                        lines,
+                        fmt,
+                        timeout,
+                        ordered,
+                        concurrency,
+                        platform_limits,
+                        checkpoint,
+                        workers,
+                        rate_limits,
+                        dedup,
+                    )
+                )
+            )
+        except KeyboardInterrupt:
+            # asyncio.run 已取消进行中的解析，已完成的结果都已写出
+            if checkpoint is not None:
+                typer.echo(
+                    f"已中断，进度已保存到 {checkpoint_path}，"
+                    "使用相同参数重新运行即可继续",
+                    err=True,
+                )
+            else:
+                typer.echo("已中断", err=True)
+            raise typer.Exit(code=130)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+            if checkpoint is not None:
+                checkpoint.close()
+        if total and fail_count == total:
+            typer.echo(f"所有 {total} 条解析均失败", err=True)
+            raise typer.Exit(code=1)
         return
 
+    if not urls:
+        typer.echo("请提供要解析的链接或指定 --file", err=True)
+        raise typer.Exit(code=1)
+    inputs = list(urls)
+    if all_links:
+        inputs = [url for text in inputs for url in extract_urls(text)]
+        if not inputs:
+            typer.echo("未检测到有效的分享链接", err=True)
+            raise typer.Exit(code=1)
+
     if len(inputs) == 1:
-        info, err = asyncio.run(_parse_single(inputs[0]))
+        info, err = asyncio.run(_closing_parsers(_parse_single(inputs[0], timeout)))
+        if fmt == "jsonl":
+            JsonlWriter().write(0, inputs[0], info, err)
+            if err:
+                raise typer.Exit(code=1)
+            return
         if err:
             typer.echo(f"解析失败: {err}", err=True)
             raise typer.Exit(code=1)
         output_result(info, fmt)
     else:
-        results = asyncio.run(_parse_batch(inputs))
-        fail_count = 0
-        for i, (url, info, err) in enumerate(results):
-            if i > 0 and fmt == "text":
-                print()
-            if err:
-                output_batch_error(url, err)
-                fail_count += 1
-            else:
-                output_result(info, fmt)
+        _, fail_count = asyncio.run(
+            _closing_parsers(
+                _run_batch(
+                    inputs,
+                    fmt,
+                    timeout,
+                    ordered,
+                    concurrency,
+                    platform_limits,
+                    workers=workers,
+                    rates=rate_limits,
+                    dedup=dedup,
+                )
+            )
+        )
         if fail_count == len(inputs):
             typer.echo(f"所有 {len(inputs)} 条解析均失败", err=True)
             raise typer.Exit(code=1)
@@ -0,0 +1,294 @@
+"""CLI 多进程批量解析：按链接哈希把输入分给多个工作进程，结果合并为一个输出流"""
+
+import asyncio
+import multiprocessing
+import queue
+import signal
+import threading
+import zlib
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable
+
+from parse_video_py.canonical import dedup_key
+from parse_video_py.cli._parse import (
+    _CONCURRENCY_LIMIT,
+    _EOF,
+    _PLATFORM_QUEUE_FACTOR,
+    _REORDER_WINDOW_FACTOR,
+    BatchResult,
+    _aiter,
+    _enumerate,
+    _iter_batch,
+    _next_input,
+)
+from parse_video_py.cli.output import WorkerError, classify_error
+from parse_video_py.limiter import rate_limiters
+from parse_video_py.parser import parser_registry
+from parse_video_py.transport import shared_transports
+
+# 每个工作进程的输入队列长度（该进程并发数的倍数），队列满时主进程暂停分发
+_WORKER_QUEUE_FACTOR = 4
+
+# 主进程等待结果时检查工作进程是否异常退出的间隔（秒）
+_WORKER_CHECK_INTERVAL = 0.5
+
+# 工作进程输入队列已满时重试分发的间隔（秒）
+_FEED_RETRY_INTERVAL = 0.005
+
+_DONE = None
+
+
+def shard_of(url: str, workers: int) -> int:
+    """按去重键分片，同一视频的不同链接落到同一个工作进程，由该进程去重"""
+    # 不用内置 hash()，其结果在不同进程间随机化
+    return zlib.crc32(dedup_key(url).encode()) % workers
+
+
+def split_limits(
+    workers: int,
+    concurrency: int,
+    platform_limits: dict[str, int],
+    rates: list[tuple[str, float]],
+) -> tuple[int, dict[str, int], list[tuple[str, float]]]:
+    """
+    把总并发、单平台并发、速率平均分给各工作进程，保持整体上限不变；
+    并发数每个进程至少为 1，因此进程数多于上限时整体并发会略高于设置
+    """
+    return (
+        max(1, concurrency // workers),
+        {source: max(1, limit // workers) for source, limit in platform_limits.items()},
+        [(key, rate / workers) for key, rate in rates],
+    )
+
+
+def _error_fields(err: Exception | None) -> tuple[int, str, str] | None:
+    """
+    在工作进程内把异常分类为 (状态码, 消息, 错误类型) 后再跨进程传递，
+    原异常（如 CircuitOpenError、HTTPStatusError）不一定能 pickle
+    """
+    if err is None:
+        return None
+    return classify_error(err)
+
+
+async def _put(inbox: multiprocessing.Queue, item) -> None:
+    """
+    放入工作进程的输入队列，队列满时在事件循环中等待空位，输入读取随之暂停；
+    不在线程中阻塞等待，取消时不会留下卡住的线程
+    """
+    while True:
+        try:
+            inbox.put_nowait(item)
+            return
+        except queue.Full:
+            await asyncio.sleep(_FEED_RETRY_INTERVAL)
+
+
+async def _worker_inputs(
+    inbox: multiprocessing.Queue, positions: dict[int, tuple[int, int]]
+) -> AsyncIterator[str]:
+    """从输入队列读取 (顺序号, 序号, URL)，记录本进程内序号到全局顺序号和序号的映射"""
+    loop = asyncio.get_running_loop()
+    local = 0
+    while True:
+        try:
+            item = inbox.get_nowait()
+        except queue.Empty:
+            item = await loop.run_in_executor(None, inbox.get)
+        if item is _DONE:
+            return
+        seq, index, url = item
+        positions[local] = (seq, index)
+        local += 1
+        yield url
+
+
+async def _worker_loop(
+    inbox: multiprocessing.Queue,
+    outbox: multiprocessing.Queue,
+    timeout: float | None,
+    concurrency: int,
+    platform_limits: dict[str, int],
+    dedup: bool,
+) -> None:
+    positions: dict[int, tuple[int, int]] = {}
+    results = _iter_batch(
+        _worker_inputs(inbox, positions),
+        timeout,
+        concurrency,
+        platform_limits=platform_limits,
+        dedup=dedup,
+    )
+    try:
+        async for local, url, info, err in results:
+            seq, index = positions.pop(local)
+            outbox.put((seq, index, url, info, _error_fields(err)))
+    finally:
+        await parser_registry.aclose_all()
+        await shared_transports.aclose_all()
+
+
+def _worker_main(
+    inbox: multiprocessing.Queue,
+    outbox: multiprocessing.Queue,
+    timeout: float | None,
+    concurrency: int,
+    platform_limits: dict[str, int],
+    rates: list[tuple[str, float]],
+    dedup: bool,
+    initializer: Callable[[], None] | None,
+) -> None:
+    """工作进程入口：独立的事件循环和连接池，Ctrl+C 由主进程统一处理"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if initializer is not None:
+        initializer()
+    for key, rate in rates:
+        rate_limiters.configure(key, rate)
+    asyncio.run(
+        _worker_loop(inbox, outbox, timeout, concurrency, platform_limits, dedup)
+    )
+
+
+async def iter_sharded(
+    urls: Iterable[str] | AsyncIterable[str],
+    workers: int,
+    timeout: float | None = None,
+    concurrency: int = _CONCURRENCY_LIMIT,
+    ordered: bool = False,
+    platform_limits: dict[str, int] | None = None,
+    rates: list[tuple[str, float]] | None = None,
+    skip: Callable[[int, str], bool] | None = None,
+    dedup: bool = True,
+    initializer: Callable[[], None] | None = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    多进程批量解析，产出格式与 _iter_batch 相同
+
+    主进程读取输入、按 shard_of 分发到各工作进程的有界队列，并合并各进程的结果；
+    每个工作进程用 _iter_batch 并发解析自己的分片，并发与速率上限按 split_limits 分摊。
+    ordered=True 时主进程按输入顺序重排后产出，并且只在领先最早未产出条目
+    不超过各进程排队上限之和 * _REORDER_WINDOW_FACTOR 时分发新的条目。
+    initializer 在每个工作进程启动时调用（工作进程以 spawn 方式启动，须可 pickle）
+    """
+    if not isinstance(urls, AsyncIterable):
+        urls = _aiter(urls)
+    per_worker, worker_limits, worker_rates = split_limits(
+        workers, concurrency, platform_limits or {}, rates or []
+    )
+    ctx = multiprocessing.get_context("spawn")
+    outbox = ctx.Queue()
+    inboxes = [ctx.Queue(per_worker * _WORKER_QUEUE_FACTOR) for _ in range(workers)]
+    processes = [
+        ctx.Process(
+            target=_worker_main,
+            args=(
+                inbox,
+                outbox,
+                timeout,
+                per_worker,
+                worker_limits,
+                worker_rates,
+                dedup,
+                initializer,
+            ),
+            name=f"parse-video-worker-{i}",
+            daemon=True,
+        )
+        for i, inbox in enumerate(inboxes)
+    ]
+    for process in processes:
+        process.start()
+
+    # 与 _BatchScheduler.max_tasks 一致，按所有工作进程合计
+    max_tasks = per_worker * workers
+    if worker_limits:
+        max_tasks *= _PLATFORM_QUEUE_FACTOR
+    window = max_tasks * _REORDER_WINDOW_FACTOR
+
+    loop = asyncio.get_running_loop()
+    received: asyncio.Queue = asyncio.Queue()
+    # 重排缓冲区输出了新条目时通知 feed 继续分发
+    advanced = asyncio.Event()
+    stop = threading.Event()
+    sent = 0
+    next_seq = 0
+    feeding_done = False
+
+    def collect() -> None:
+        """后台线程接收结果，工作进程异常退出时通知主循环"""
+        try:
+            while not stop.is_set():
+                try:
+                    item = outbox.get(timeout=_WORKER_CHECK_INTERVAL)
+                except queue.Empty:
+                    crashed = [p.name for p in processes if p.exitcode not in (None, 0)]
+                    if crashed:
+                        error = RuntimeError(f"工作进程异常退出: {', '.join(crashed)}")
+                        loop.call_soon_threadsafe(received.put_nowait, error)
+                        return
+                    continue
+                loop.call_soon_threadsafe(received.put_nowait, item)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    async def feed() -> None:
+        nonlocal sent, feeding_done
+        items = _enumerate(urls, skip)
+        while True:
+            while ordered and sent - next_seq >= window:
+                advanced.clear()
+                await advanced.wait()
+            item = await _next_input(items)
+            if item is _EOF:
+                break
+            index, url = item
+            await _put(inboxes[shard_of(url, workers)], (sent, index, url))
+            sent += 1
+        for inbox in inboxes:
+            await _put(inbox, _DONE)
+        feeding_done = True
+
+    collector = threading.Thread(
+        target=collect, name="parse-video-collect", daemon=True
+    )
+    collector.start()
+    feeder = asyncio.create_task(feed())
+    # 分发结束（或读取输入出错）时唤醒等待结果的主循环
+    feeder.add_done_callback(lambda _: received.put_nowait(_DONE))
+    reorder: dict[int, BatchResult] = {}
+    finished = 0
+    try:
+        while not (feeding_done and finished == sent):
+            item = await received.get()
+            if item is _DONE:
+                if not feeder.cancelled():
+                    feeder.result()
+                continue
+            if isinstance(item, Exception):
+                raise item
+            seq, index, url, info, fields = item
+            result = (index, url, info, WorkerError(*fields) if fields else None)
+            finished += 1
+            if not ordered:
+                yield result
+                continue
+            reorder[seq] = result
+            while next_seq in reorder:
+                yield reorder.pop(next_seq)
+                next_seq += 1
+                advanced.set()
+    finally:
+        stop.set()
+        feeder.cancel()
+        await asyncio.gather(feeder, return_exceptions=True)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            await loop.run_in_executor(None, process.join)
+        # 队列中可能还有未取走的数据，不等待其后台写线程，避免退出时卡住
+        for q in (outbox, *inboxes):
+            q.cancel_join_thread()
+            q.close()
+        if hasattr(urls, "aclose"):
+            await urls.aclose()
@@ -0,0 +1,95 @@
+"""批量解析检查点：记录已完成的条目，中断后重新运行时跳过"""
+
+import json
+import os
+import zlib
+from typing import BinaryIO
+
+from parse_video_py.cli.output import JsonlWriter
+from parse_video_py.parser.base import VideoInfo
+
+# 视为已完成的结果：解析成功，或输入中没有链接（重试也不会成功）；
+# 超时、限流等其他失败在恢复时重新解析
+_DONE_CODES = (200, 400)
+
+
+class Checkpoint:
+    """
+    检查点文件为只追加的 JSONL，每条完成的结果一行，字段与 --format jsonl 的输出相同，
+    index 为输入中第几条非空行（从 0 开始）。
+
+    - 恢复时 index 与链接都对上的成功记录才跳过，输入文件改动过的条目会重新解析
+    - 写入经 JsonlWriter 缓冲，最多延迟 flush_interval 秒，每条的额外开销只是一次序列化；
+      进程被强制终止时最多丢失最后一批记录，这些条目下次会重新解析
+    - 末尾被截断的半行在加载时忽略，追加前先补上换行符
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.1):
+        self.path = path
+        self.flush_interval = flush_interval
+        # index -> 链接的 CRC32，只保存摘要，百万级条目也不会占用太多内存
+        self._done: dict[int, int] = {}
+        self._file: BinaryIO | None = None
+        self._writer: JsonlWriter | None = None
+
+    @property
+    def completed(self) -> int:
+        return len(self._done)
+
+    def load(self) -> int:
+        """读取已有的检查点文件，返回已完成的条数，文件不存在时为 0"""
+        try:
+            stream = open(self.path, "rb")
+        except FileNotFoundError:
+            return 0
+        with stream:
+            for line in stream:
+                try:
+                    record = json.loads(line)
+                    index, url, code = record["index"], record["url"], record["code"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if code in _DONE_CODES:
+                    self._done[index] = _digest(url)
+        return self.completed
+
+    def is_done(self, index: int, url: str) -> bool:
+        return self._done.get(index) == _digest(url)
+
+    def open(self) -> None:
+        """以追加方式打开检查点文件"""
+        self._file = open(self.path, "ab")
+        if self._file.tell() > 0 and not _ends_with_newline(self.path):
+            self._file.write(b"\n")
+        self._writer = JsonlWriter(self._file, flush_interval=self.flush_interval)
+
+    def record(
+        self,
+        index: int,
+        url: str,
+        info: VideoInfo | None,
+        err: Exception | None = None,
+    ) -> None:
+        self._writer.write(index, url, info, err)
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self.flush()
+        self._file.close()
+        self._file = None
+        self._writer = None
+
+
+def _digest(url: str) -> int:
+    return zlib.crc32(url.encode())
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as stream:
+        stream.seek(-1, os.SEEK_END)
+        return stream.read(1) == b"\n"
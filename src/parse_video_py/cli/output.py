@@ -1,11 +1,20 @@
 """CLI 输出格式化模块，对齐 Go 版 parse-video 的输出格式"""
 
+import asyncio
 import dataclasses
 import json
 import sys
+from typing import BinaryIO
 
+from parse_video_py.breaker import CircuitOpenError
+from parse_video_py.deadline import DeadlineExceeded
 from parse_video_py.parser.base import VideoInfo
 
+try:
+    import orjson
+except ImportError:  # 未安装 orjson 时使用标准库 json，输出内容相同
+    orjson = None
+
 
 def format_text_output(info: VideoInfo) -> str:
     """文本格式输出（对齐 Go 版 formatTextOutput）"""
@@ -48,3 +57,115 @@ def output_batch_error(input_url: str, error_msg: str) -> None:
     """输出批量解析中的错误"""
     print(f"[失败] {input_url}", file=sys.stderr)
     print(f"错误: {error_msg}", file=sys.stderr)
+
+
+class WorkerError(Exception):
+    """
+    工作进程中已分类的失败：保留原异常对应的状态码、消息和类型名，
+    原异常不一定能跨进程传递（无法 pickle），输出时与单进程解析的记录一致
+    """
+
+    def __init__(self, code: int, msg: str, error_type: str):
+        super().__init__(code, msg, error_type)
+        self.code = code
+        self.msg = msg
+        self.error_type = error_type
+
+    def __str__(self) -> str:
+        return self.msg
+
+
+def classify_error(err: Exception) -> tuple[int, str, str]:
+    """失败记录的 (状态码, 消息, 错误类型)"""
+    if isinstance(err, WorkerError):
+        return err.code, err.msg, err.error_type
+    return _error_code(err), str(err), type(err).__name__
+
+
+def _error_code(err: Exception) -> int:
+    """失败记录的状态码，与 Web 接口和批量任务结果一致"""
+    if isinstance(err, DeadlineExceeded):
+        return 504
+    if isinstance(err, CircuitOpenError):
+        return 503
+    if isinstance(err, ValueError) and str(err).startswith("未检测到有效的分享链接"):
+        return 400
+    return 500
+
+
+def build_jsonl_record(
+    index: int, input_url: str, info: VideoInfo | None, err: Exception | None
+) -> dict:
+    """构建一条 JSONL 记录，字段与批量任务的 results.jsonl 一致，失败时附带错误类型"""
+    if err is not None:
+        code, msg, error_type = classify_error(err)
+        return {
+            "index": index,
+            "url": input_url,
+            "code": code,
+            "msg": msg,
+            "error_type": error_type,
+        }
+    return {
+        "index": index,
+        "url": input_url,
+        "code": 200,
+        "msg": "解析成功",
+        "data": dataclasses.asdict(info),
+    }
+
+
+def dumps_compact(data: dict) -> bytes:
+    """序列化为单行紧凑 JSON（不含换行符）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class JsonlWriter:
+    """
+    JSONL 输出：每条结果一行紧凑 JSON，写入缓冲区后批量写出。
+
+    缓冲区超过 buffer_size 字节时立即写出；否则最多延迟 flush_interval 秒，
+    结果稀疏时下游也能及时收到
+    """
+
+    def __init__(
+        self,
+        stream: BinaryIO | None = None,
+        buffer_size: int = 65536,
+        flush_interval: float = 0.1,
+    ):
+        self.stream = stream if stream is not None else sys.stdout.buffer
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = bytearray()
+        self._timer: asyncio.TimerHandle | None = None
+
+    def write(
+        self,
+        index: int,
+        input_url: str,
+        info: VideoInfo | None,
+        err: Exception | None = None,
+    ) -> None:
+        self._buffer += dumps_compact(build_jsonl_record(index, input_url, info, err))
+        self._buffer += b"\n"
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+        elif self._timer is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                self.flush()
+                return
+            self._timer = loop.call_later(self.flush_interval, self.flush)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._buffer:
+            self.stream.write(self._buffer)
+            self._buffer.clear()
+        self.stream.flush()
@@ -0,0 +1,33 @@
+"""单次解析的上下文：记录当前解析的平台，供共享 HTTP 层按平台套用策略"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from .parser.base import VideoSource
+
+_current_source: ContextVar["VideoSource | None"] = ContextVar(
+    "parse_video_source", default=None
+)
+
+
+@contextmanager
+def source_scope(source: "VideoSource") -> Iterator[None]:
+    """在当前上下文中标记正在解析的平台"""
+    token = _current_source.set(source)
+    try:
+        yield
+    finally:
+        _current_source.reset(token)
+
+
+def current_source() -> "VideoSource | None":
+    """返回当前解析的平台，不在解析流程中时返回 None"""
+    return _current_source.get()
+
+
+def current_source_label() -> str:
+    """返回当前平台的取值（如 douyin），用于指标标签；未知时为 unknown"""
+    source = _current_source.get()
+    return source.value if source is not None else "unknown"
@@ -0,0 +1,73 @@
+"""单次解析的截止时间：通过 contextvar 在解析器的多次上游请求之间传递剩余预算"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# 截止时间，time.monotonic() 时间戳；None 表示不限时
+_deadline: ContextVar[float | None] = ContextVar("parse_video_deadline", default=None)
+
+
+class DeadlineExceeded(TimeoutError):
+    """解析总耗时超过截止时间"""
+
+    def __init__(self, msg: str = "解析超时：已超过截止时间"):
+        super().__init__(msg)
+
+
+@contextmanager
+def deadline_scope(timeout: float | None) -> Iterator[None]:
+    """在当前上下文中设置截止时间（秒）。
+
+    嵌套使用时取更早的截止时间，外层预算不会被内层放大。
+    timeout 为 None 时不做任何改变。
+    """
+    if timeout is None:
+        yield
+        return
+
+    deadline = time.monotonic() + timeout
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> float | None:
+    """返回剩余预算（秒），未设置截止时间时返回 None"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline() -> float | None:
+    """返回剩余预算，预算已耗尽时抛出 DeadlineExceeded"""
+    budget = remaining_budget()
+    if budget is not None and budget <= 0:
+        raise DeadlineExceeded()
+    return budget
+
+
+async def run_with_deadline(aw: Awaitable[T]) -> T:
+    """在剩余预算内等待 aw 完成，超时则取消并抛出 DeadlineExceeded"""
+    budget = remaining_budget()
+    if budget is None:
+        return await aw
+    if budget <= 0:
+        if asyncio.iscoroutine(aw):
+            aw.close()
+        raise DeadlineExceeded()
+    try:
+        return await asyncio.wait_for(aw, budget)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded() from None
@@ -0,0 +1,137 @@
+"""页面数据提取执行器：把大页面的 HTML / YAML / JSON 解析移出事件循环，并监控事件循环延迟"""
+
+import asyncio
+import concurrent.futures
+import functools
+import os
+import time
+from typing import Any, Callable
+
+from .context import current_source_label
+from .metrics import metrics
+
+
+class ExtractionExecutor:
+    """
+    提取执行器
+
+    - 长度小于 threshold（字符）的内容直接在事件循环中解析，省去线程切换的开销
+    - 超过阈值的内容交给有界线程池解析，事件循环可以继续处理其他请求；
+      kind="process" 时改用进程池，适合纯 Python、受 GIL 限制的解析（如 yaml），
+      此时 func 及其参数、返回值都必须可以 pickle（使用模块级函数）
+    - 线程池 / 进程池在第一次使用时创建
+    """
+
+    def __init__(
+        self, threshold: int = 65536, max_workers: int = 4, kind: str = "thread"
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"不支持的提取执行器类型: {kind}，可选 thread / process")
+        self.threshold = threshold
+        self.max_workers = max_workers
+        self.kind = kind
+        self._pool: concurrent.futures.Executor | None = None
+
+    @classmethod
+    def from_env(cls) -> "ExtractionExecutor":
+        """
+        从环境变量加载配置：
+        - PARSE_VIDEO_EXTRACT_THRESHOLD：移出事件循环的内容长度阈值，默认 65536
+        - PARSE_VIDEO_EXTRACT_WORKERS：线程 / 进程数，默认 4
+        - PARSE_VIDEO_EXTRACT_EXECUTOR：thread（默认）或 process
+        """
+        return cls(
+            threshold=int(os.getenv("PARSE_VIDEO_EXTRACT_THRESHOLD", "65536")),
+            max_workers=int(os.getenv("PARSE_VIDEO_EXTRACT_WORKERS", "4")),
+            kind=os.getenv("PARSE_VIDEO_EXTRACT_EXECUTOR", "thread").strip().lower(),
+        )
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        payload: str | bytes,
+        *args,
+        threshold: int | None = None,
+    ) -> Any:
+        """执行 func(payload, *args)，threshold 未指定时使用执行器的默认阈值"""
+        threshold = self.threshold if threshold is None else threshold
+        source = current_source_label()
+        if len(payload) < threshold:
+            metrics.inc("extraction_inline_total", source)
+            return func(payload, *args)
+
+        metrics.inc("extraction_offloaded_total", source)
+        loop = asyncio.get_running_loop()
+        start = time.monotonic()
+        try:
+            return await loop.run_in_executor(
+                self._get_pool(), functools.partial(func, payload, *args)
+            )
+        finally:
+            metrics.inc(
+                "extraction_offloaded_seconds_total", source, time.monotonic() - start
+            )
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> concurrent.futures.Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = concurrent.futures.ProcessPoolExecutor(self.max_workers)
+            else:
+                self._pool = concurrent.futures.ThreadPoolExecutor(
+                    self.max_workers, thread_name_prefix="parse-video-extract"
+                )
+        return self._pool
+
+
+class LoopLagMonitor:
+    """
+    事件循环延迟监控：每隔 interval 秒醒来一次，实际醒来时间比预期晚的部分即为延迟，
+    说明这段时间事件循环被同步代码占用。输出指标：
+    - event_loop_lag_seconds：最近一次采样的延迟
+    - event_loop_lag_max_seconds：启动以来的最大延迟
+    - event_loop_lag_seconds_total / event_loop_lag_samples_total：用于计算平均延迟
+    - event_loop_lag_slow_total：延迟超过 slow_threshold 的次数
+    """
+
+    def __init__(self, interval: float = 0.5, slow_threshold: float = 0.1):
+        self.interval = interval
+        self.slow_threshold = slow_threshold
+        self.max_lag = 0.0
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def record(self, lag: float) -> None:
+        lag = max(lag, 0.0)
+        self.max_lag = max(self.max_lag, lag)
+        metrics.set_gauge("event_loop_lag_seconds", "", lag)
+        metrics.set_gauge("event_loop_lag_max_seconds", "", self.max_lag)
+        metrics.inc("event_loop_lag_seconds_total", "", lag)
+        metrics.inc("event_loop_lag_samples_total")
+        if lag >= self.slow_threshold:
+            metrics.inc("event_loop_lag_slow_total")
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(time.monotonic() - expected)
+
+
+extraction_executor = ExtractionExecutor.from_env()
@@ -0,0 +1,363 @@
+"""异步批量解析任务：提交后在后台并发执行，进度与结果持久化到本地磁盘"""
+
+import asyncio
+import dataclasses
+import json
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from enum import Enum
+from pathlib import Path
+
+import httpx
+
+from .breaker import CircuitOpenError
+from .canonical import dedup_key
+from .deadline import DeadlineExceeded
+from .parser import parse_video_share_url
+from .utils import extract_url
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，此时不做跨进程互斥
+    fcntl = None
+
+# 进度元数据最短落盘间隔（秒），结果文件本身逐条追加
+_META_FLUSH_INTERVAL = 1.0
+
+# 去重时保留最近多少个已完成视频的结果，超出后最早的被淘汰，内存占用与任务大小无关
+_DEDUP_CACHE_SIZE = 20000
+
+# 最多记录多少个等待解析中视频结果的重复下标，超出后由 worker 自己等待该结果，
+# 取下一条输入随之暂停
+_DEDUP_WAITING_SIZE = 20000
+
+_job_id_re = re.compile(r"[0-9a-f]{32}")
+
+
+class JobStatus(str, Enum):
+    """
+    任务状态
+    """
+
+    Pending = "pending"
+    Running = "running"
+    Done = "done"
+
+
+@dataclasses.dataclass
+class Job:
+    """
+    批量解析任务
+    """
+
+    # 任务ID
+    job_id: str
+
+    # 输入链接总数
+    total: int
+
+    # 后台并发解析数
+    concurrency: int
+
+    # 任务完成后回调的地址，为空则不回调
+    webhook_url: str = ""
+
+    # 单条解析的超时时间（秒），None 为不限
+    timeout: float | None = None
+
+    # 任务状态
+    status: JobStatus = JobStatus.Pending
+
+    # 已完成 / 成功 / 失败数量
+    completed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+
+    # 创建与完成时间（unix 时间戳）
+    created_at: float = 0.0
+    finished_at: float = 0.0
+
+    # 回调是否已成功送达
+    webhook_delivered: bool = False
+
+
+async def _parse_item(url: str, timeout: float | None = None) -> dict:
+    """解析单条输入，返回可直接写入结果文件的记录（不含 index）"""
+    share_url = extract_url(url)
+    if share_url is None:
+        return {"url": url, "code": 400, "msg": "未检测到有效的分享链接"}
+    try:
+        video_info = await parse_video_share_url(share_url, timeout=timeout)
+    except DeadlineExceeded as err:
+        return {"url": url, "code": 504, "msg": str(err)}
+    except CircuitOpenError as err:
+        return {"url": url, "code": 503, "msg": str(err)}
+    except Exception as err:
+        return {"url": url, "code": 500, "msg": str(err)}
+    return {
+        "url": url,
+        "code": 200,
+        "msg": "解析成功",
+        "data": dataclasses.asdict(video_info),
+    }
+
+
+class JobManager:
+    """
+    任务管理器：负责任务提交、后台执行、断点恢复和完成回调
+
+    每个任务在 store_dir 下占用一个目录：
+    - meta.json      任务元数据与进度
+    - inputs.json    原始输入列表
+    - results.jsonl  按完成顺序追加的结果，每行带输入下标 index
+    - lock           执行中的进程持有的文件锁，保证多进程下同一任务只执行一次
+    """
+
+    def __init__(self, store_dir: str | os.PathLike, webhook_timeout: float = 10):
+        self.store_dir = Path(store_dir)
+        self.webhook_timeout = webhook_timeout
+        self._jobs: dict[str, Job] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._claims: dict[str, object] = {}
+
+    async def submit(
+        self,
+        urls: list[str],
+        concurrency: int = 10,
+        webhook_url: str | None = None,
+        timeout: float | None = None,
+    ) -> Job:
+        """创建任务并立即在后台开始执行"""
+        job = Job(
+            job_id=uuid.uuid4().hex,
+            total=len(urls),
+            concurrency=concurrency,
+            webhook_url=webhook_url or "",
+            timeout=timeout,
+            created_at=time.time(),
+        )
+        job_dir = self._job_dir(job.job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "inputs.json").write_text(
+            json.dumps(urls, ensure_ascii=False), encoding="utf-8"
+        )
+        self._save_meta(job)
+        self._claim(job.job_id)
+        self._start(job, urls)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        """查询任务，本进程执行中的任务取内存状态，否则读取磁盘"""
+        if not _job_id_re.fullmatch(job_id):
+            return None
+        if job_id in self._jobs:
+            return self._jobs[job_id]
+        return self._load_meta(job_id)
+
+    def read_results(self, job_id: str, offset: int = 0, limit: int = 100) -> list:
+        """按完成顺序分页读取结果"""
+        results_path = self._job_dir(job_id) / "results.jsonl"
+        if not _job_id_re.fullmatch(job_id) or not results_path.exists():
+            return []
+        results = []
+        with results_path.open(encoding="utf-8") as fp:
+            for line_no, line in enumerate(fp):
+                if line_no < offset:
+                    continue
+                if len(results) >= limit:
+                    break
+                try:
+                    results.append(json.loads(line))
+                except ValueError:
+                    # 进程崩溃时可能留下写了一半的最后一行
+                    break
+        return results
+
+    def resume(self) -> int:
+        """恢复磁盘上未完成的任务，返回本进程接管的任务数"""
+        if not self.store_dir.is_dir():
+            return 0
+        resumed = 0
+        for job_dir in self.store_dir.iterdir():
+            job_id = job_dir.name
+            if not _job_id_re.fullmatch(job_id) or job_id in self._tasks:
+                continue
+            job = self._load_meta(job_id)
+            if job is None or job.status == JobStatus.Done:
+                continue
+            if not self._claim(job_id):
+                # 已被其他工作进程接管
+                continue
+            urls = json.loads((job_dir / "inputs.json").read_text(encoding="utf-8"))
+            self._start(job, urls)
+            resumed += 1
+        return resumed
+
+    async def aclose(self) -> None:
+        """取消本进程执行中的任务，已落盘的结果在下次启动时保留"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _start(self, job: Job, urls: list[str]) -> None:
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job, urls))
+        self._tasks[job.job_id] = task
+        task.add_done_callback(lambda _: self._release(job.job_id))
+
+    async def _run(self, job: Job, urls: list[str]) -> None:
+        results_path = self._job_dir(job.job_id) / "results.jsonl"
+        done = self._load_done(job, results_path)
+        pending = iter([i for i in range(job.total) if i not in done])
+
+        job.status = JobStatus.Running
+        self._save_meta(job)
+        last_flush = time.monotonic()
+
+        # 同一视频的不同链接只解析一次：解析中的视频记录等待结果的其他下标，
+        # 最近完成的视频直接复用结果
+        flights: dict[str, asyncio.Future] = {}
+        waiting: dict[str, list[int]] = {}
+        waiting_count = 0
+        finished: OrderedDict[str, dict] = OrderedDict()
+
+        with results_path.open("a", encoding="utf-8") as fp:
+
+            def write(index: int, record: dict) -> None:
+                nonlocal last_flush
+                record = {**record, "url": urls[index], "index": index}
+                fp.write(json.dumps(record, ensure_ascii=False) + "\n")
+                fp.flush()
+                job.completed += 1
+                if record["code"] == 200:
+                    job.succeeded += 1
+                else:
+                    job.failed += 1
+                if time.monotonic() - last_flush >= _META_FLUSH_INTERVAL:
+                    self._save_meta(job)
+                    last_flush = time.monotonic()
+
+            async def worker():
+                nonlocal waiting_count
+                # 所有 worker 共享同一个迭代器，next() 为同步调用，不会重复取到同一条
+                for index in pending:
+                    key = dedup_key(urls[index])
+                    if key in finished:
+                        finished.move_to_end(key)
+                        write(index, finished[key])
+                        continue
+                    if key in flights:
+                        if waiting_count < _DEDUP_WAITING_SIZE:
+                            # 不占用 worker 等待，由解析该视频的 worker 一并写入
+                            waiting[key].append(index)
+                            waiting_count += 1
+                        else:
+                            write(index, await asyncio.shield(flights[key]))
+                        continue
+                    flights[key] = asyncio.get_running_loop().create_future()
+                    waiting[key] = []
+                    record = await _parse_item(urls[index], job.timeout)
+                    finished[key] = record
+                    if len(finished) > _DEDUP_CACHE_SIZE:
+                        finished.popitem(last=False)
+                    flights.pop(key).set_result(record)
+                    followers = waiting.pop(key)
+                    waiting_count -= len(followers)
+                    for i in [index, *followers]:
+                        write(i, record)
+
+            remaining = job.total - len(done)
+            workers = min(job.concurrency, remaining)
+            await asyncio.gather(*(worker() for _ in range(workers)))
+
+        job.status = JobStatus.Done
+        job.finished_at = time.time()
+        self._save_meta(job)
+
+        if job.webhook_url:
+            job.webhook_delivered = await self._notify(job)
+            self._save_meta(job)
+
+    async def _notify(self, job: Job) -> bool:
+        """任务完成后向 webhook_url 推送任务摘要，失败不影响任务本身"""
+        payload = {
+            "job_id": job.job_id,
+            "status": job.status.value,
+            "total": job.total,
+            "succeeded": job.succeeded,
+            "failed": job.failed,
+        }
+        try:
+            # 回调地址是调用方自己的服务，不走解析用的代理
+            async with httpx.AsyncClient(timeout=self.webhook_timeout) as client:
+                response = await client.post(job.webhook_url, json=payload)
+                response.raise_for_status()
+        except Exception:
+            return False
+        return True
+
+    def _load_done(self, job: Job, results_path: Path) -> set[int]:
+        """读取已完成的下标并重算进度，同时截掉崩溃时写了一半的尾行"""
+        job.completed = job.succeeded = job.failed = 0
+        if not results_path.exists():
+            return set()
+
+        raw = results_path.read_bytes()
+        if raw and not raw.endswith(b"\n"):
+            raw = raw[: raw.rfind(b"\n") + 1]
+            results_path.write_bytes(raw)
+
+        done = set()
+        for line in raw.decode("utf-8").splitlines():
+            record = json.loads(line)
+            if record["index"] in done:
+                continue
+            done.add(record["index"])
+            job.completed += 1
+            if record["code"] == 200:
+                job.succeeded += 1
+            else:
+                job.failed += 1
+        return done
+
+    def _claim(self, job_id: str) -> bool:
+        """尝试获取任务的执行权（非阻塞文件锁，进程退出时自动释放）"""
+        if fcntl is None:
+            return True
+        fp = (self._job_dir(job_id) / "lock").open("a")
+        try:
+            fcntl.flock(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fp.close()
+            return False
+        self._claims[job_id] = fp
+        return True
+
+    def _release(self, job_id: str) -> None:
+        self._tasks.pop(job_id, None)
+        self._jobs.pop(job_id, None)
+        fp = self._claims.pop(job_id, None)
+        if fp is not None:
+            fp.close()
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.store_dir / job_id
+
+    def _save_meta(self, job: Job) -> None:
+        meta_path = self._job_dir(job.job_id) / "meta.json"
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(dataclasses.asdict(job)), encoding="utf-8")
+        # 原子替换，其他进程读取时不会读到半个文件
+        os.replace(tmp_path, meta_path)
+
+    def _load_meta(self, job_id: str) -> Job | None:
+        meta_path = self._job_dir(job_id) / "meta.json"
+        if not meta_path.exists():
+            return None
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta["status"] = JobStatus(meta["status"])
+        return Job(**meta)
@@ -0,0 +1,314 @@
+"""上游流量控制
+
+- 并发：按上游域名的自适应并发限制（AIMD），成功时加性增长，限流/超时/延迟突增时乘性收缩
+- 速率：按平台或域名配置的令牌桶，每个代理各自一个桶
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+import httpx
+
+from .deadline import DeadlineExceeded, remaining_budget
+from .metrics import metrics
+
+# 视为被限流/封禁的状态码
+OVERLOAD_STATUSES = frozenset({403, 429})
+
+# 对突发请求敏感的域名单独收紧上限，其余域名使用默认值
+_HOST_LIMIT_OVERRIDES = {
+    "www.iesdouyin.com": {"initial_limit": 4, "max_limit": 8},
+    "www.douyin.com": {"initial_limit": 4, "max_limit": 8},
+    "v.douyin.com": {"initial_limit": 4, "max_limit": 8},
+    "www.xiaohongshu.com": {"initial_limit": 2, "max_limit": 4},
+    "xhslink.com": {"initial_limit": 2, "max_limit": 4},
+}
+
+# 未单独配置的域名的初始并发和并发上限
+_DEFAULT_INITIAL_LIMIT = 8
+_DEFAULT_MAX_LIMIT = 64
+
+
+class AIMDLimiter:
+    """
+    单个上游域名的并发限制器
+
+    - 请求成功：limit += 1 / limit（大约每轮并发请求全部成功后 +1）
+    - 429/403、超时、延迟超过平均值 latency_spike_ratio 倍：limit *= backoff_ratio，
+      同一冷却期内只收缩一次，避免同一批失败把并发压到最低
+    - 等待中的请求按先来先到获得名额
+    """
+
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = _DEFAULT_INITIAL_LIMIT,
+        min_limit: int = 1,
+        max_limit: int = _DEFAULT_MAX_LIMIT,
+        backoff_ratio: float = 0.5,
+        latency_spike_ratio: float = 3.0,
+        decrease_cooldown: float = 1.0,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.latency_spike_ratio = latency_spike_ratio
+        self.decrease_cooldown = decrease_cooldown
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._latency_avg: float | None = None
+        self._last_decrease = 0.0
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    async def acquire(self) -> None:
+        """获取一个并发名额，名额不足时排队等待"""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # 名额已分配但调用方被取消，归还名额
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def release(self) -> None:
+        """归还名额，不调整限制（如连接失败等与限流无关的结果）"""
+        self._in_flight -= 1
+        self._wake()
+
+    def release_success(self, latency: float) -> None:
+        """归还名额并记录一次成功响应"""
+        spike = (
+            self._latency_avg is not None
+            and latency > self._latency_avg * self.latency_spike_ratio
+        )
+        if self._latency_avg is None:
+            self._latency_avg = latency
+        else:
+            self._latency_avg = self._latency_avg * 0.9 + latency * 0.1
+
+        if spike:
+            self._decrease()
+        else:
+            self._limit = min(float(self.max_limit), self._limit + 1 / self._limit)
+            self._publish()
+        self.release()
+
+    def release_overload(self) -> None:
+        """归还名额并记录一次限流/超时"""
+        self._decrease()
+        self.release()
+
+    def _decrease(self) -> None:
+        now = time.monotonic()
+        if now - self._last_decrease < self.decrease_cooldown:
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * self.backoff_ratio)
+        metrics.inc("host_concurrency_decrease_total", self.name)
+        self._publish()
+
+    def _wake(self) -> None:
+        while self._waiters and self._in_flight < self.limit:
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def _publish(self) -> None:
+        metrics.set_gauge("host_concurrency_limit", self.name, self.limit)
+
+
+class HostLimiterRegistry:
+    """
+    按域名懒创建并发限制器
+    """
+
+    def __init__(self, overrides: dict[str, dict] | None = None, **limiter_kwargs):
+        self._overrides = _HOST_LIMIT_OVERRIDES if overrides is None else overrides
+        self._limiter_kwargs = limiter_kwargs
+        self._limiters: dict[str, AIMDLimiter] = {}
+        self._processes = 1
+        self._lock = threading.Lock()
+
+    def set_processes(self, processes: int) -> None:
+        """
+        多个进程各持有一份限制器时，每个进程的并发上限按进程数分摊（至少为 1），
+        只影响之后创建的限制器
+        """
+        with self._lock:
+            self._processes = max(1, processes)
+            self._limiters.clear()
+
+    def get(self, host: str) -> AIMDLimiter:
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                kwargs = {
+                    "initial_limit": _DEFAULT_INITIAL_LIMIT,
+                    "max_limit": _DEFAULT_MAX_LIMIT,
+                    **self._limiter_kwargs,
+                    **self._overrides.get(host, {}),
+                }
+                for name in ("initial_limit", "max_limit"):
+                    kwargs[name] = max(1, kwargs[name] // self._processes)
+                limiter = AIMDLimiter(host, **kwargs)
+                self._limiters[host] = limiter
+            return limiter
+
+
+host_limiters = HostLimiterRegistry()
+
+
+class TokenBucket:
+    """
+    令牌桶（GCRA 实现）：每个请求按到达顺序预约发送时间，先到先发，
+    不会出现后来的请求抢先拿到令牌的情况
+
+    - rate：每秒允许的请求数
+    - burst：允许的突发请求数，默认 1 即严格匀速
+    - 需要等待的时间超过剩余截止时间时直接抛出 DeadlineExceeded，不占用预约
+    """
+
+    def __init__(self, name: str, rate: float, burst: int = 1):
+        self.name = name
+        self.rate = rate
+        self.interval = 1 / rate
+        self._tolerance = (burst - 1) * self.interval
+        # 下一个请求的理论发送时间
+        self._tat = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        wait = tat - self._tolerance - now
+        budget = remaining_budget()
+        if wait > 0 and budget is not None and wait >= budget:
+            raise DeadlineExceeded()
+
+        reserved = tat + self.interval
+        self._tat = reserved
+        if wait <= 0:
+            return
+
+        metrics.inc("rate_limited_total", self.name)
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            if self._tat == reserved:
+                # 排在最后的预约被取消，退回时间片
+                self._tat = tat
+            raise
+
+
+def parse_rate(text: str) -> float:
+    """解析速率配置，如 5/s、30/m、1200/h，省略单位时按每秒计"""
+    value, _, unit = text.strip().partition("/")
+    seconds = {"": 1, "s": 1, "m": 60, "h": 3600}.get(unit.strip().lower())
+    try:
+        rate = float(value) / seconds
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的速率配置: {text}")
+    if rate <= 0:
+        raise ValueError(f"无效的速率配置: {text}")
+    return rate
+
+
+def proxy_label(proxy: str | None) -> str:
+    """代理的展示名（host:port），不包含认证信息"""
+    if not proxy:
+        return ""
+    url = httpx.URL(proxy)
+    return f"{url.host}:{url.port}" if url.port else url.host
+
+
+class RateLimiterRegistry:
+    """
+    速率限制规则与令牌桶
+
+    规则以平台取值（如 douyin）或上游域名为键，可以限定某个代理单独配置；
+    令牌桶按 (规则键, 代理) 创建，因此每个代理各自按规则速率发送，
+    代理数量增加时总吞吐线性增长
+    """
+
+    def __init__(self):
+        # (平台或域名, 代理) -> 每秒请求数，代理为空表示所有代理
+        self._rules: dict[tuple[str, str], float] = {}
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, key: str, rate: float, proxy: str = "") -> None:
+        """设置平台或域名的速率，proxy 为代理展示名（host:port）"""
+        with self._lock:
+            self._rules[(key, proxy)] = rate
+            for bucket_key in [k for k in self._buckets if k[0] == key]:
+                del self._buckets[bucket_key]
+
+    def load(self, spec: str, processes: int = 1) -> None:
+        """
+        从配置字符串加载规则，多条规则以逗号分隔，例如：
+        douyin=5/s,www.xiaohongshu.com=30/m,douyin@10.0.0.1:8080=10/s
+        processes 为共用这份配置的进程数，每个进程的速率按进程数分摊
+        """
+        for item in spec.split(","):
+            if not item.strip():
+                continue
+            target, sep, rate = item.rpartition("=")
+            if not sep or not target.strip():
+                raise ValueError(f"无效的速率配置: {item}")
+            key, _, proxy = target.strip().partition("@")
+            self.configure(key, parse_rate(rate) / processes, proxy)
+
+    def get(self, source: str, host: str, proxy: str = "") -> TokenBucket | None:
+        """返回本次请求适用的令牌桶，平台规则优先于域名规则，未配置时返回 None"""
+        with self._lock:
+            for key in (source, host):
+                rate = self._rules.get((key, proxy)) or self._rules.get((key, ""))
+                if rate is None:
+                    continue
+                bucket = self._buckets.get((key, proxy))
+                if bucket is None:
+                    name = f"{key}@{proxy}" if proxy else key
+                    bucket = TokenBucket(name, rate)
+                    self._buckets[(key, proxy)] = bucket
+                return bucket
+            return None
+
+
+rate_limiters = RateLimiterRegistry()
+rate_limiters.load(os.getenv("PARSE_VIDEO_RATE_LIMITS", ""))
+
+
+def share_between_processes(processes: int) -> None:
+    """
+    serve --workers N 时每个工作进程各有一份令牌桶和并发限制器：
+    环境变量配置的速率与各域名的并发上限按进程数分摊，整体不超过配置值
+    """
+    if processes <= 1:
+        return
+    host_limiters.set_processes(processes)
+    rate_limiters.load(os.getenv("PARSE_VIDEO_RATE_LIMITS", ""), processes)
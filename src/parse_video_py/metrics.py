@@ -0,0 +1,52 @@
+"""进程内运行指标：计数器与瞬时值，由 Web 服务的 /metrics 接口输出"""
+
+import threading
+from collections import defaultdict
+
+
+class Metrics:
+    """
+    简单的进程内指标表，按 (指标名, 标签) 聚合。
+
+    多进程部署（serve --workers N）时每个进程各自统计。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, float]] = defaultdict(
+            lambda: defaultdict(float)
+        )
+        self._gauges: dict[str, dict[str, float]] = defaultdict(dict)
+
+    def inc(self, name: str, label: str = "", value: float = 1) -> None:
+        """计数器累加"""
+        with self._lock:
+            self._counters[name][label] += value
+
+    def set_gauge(self, name: str, label: str, value: float) -> None:
+        """设置瞬时值"""
+        with self._lock:
+            self._gauges[name][label] = value
+
+    def get(self, name: str, label: str = "") -> float:
+        """读取计数器或瞬时值，不存在时返回 0"""
+        with self._lock:
+            if label in self._gauges.get(name, {}):
+                return self._gauges[name][label]
+            return self._counters.get(name, {}).get(label, 0)
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        """导出全部指标：{指标名: {标签: 值}}"""
+        with self._lock:
+            data = {name: dict(values) for name, values in self._counters.items()}
+            for name, values in self._gauges.items():
+                data[name] = dict(values)
+            return data
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = Metrics()
@@ -1,5 +1,14 @@
+import asyncio
+import weakref
+from contextlib import contextmanager
+from typing import Iterator
+
+from ..breaker import circuit_breakers
+from ..context import source_scope
+from ..deadline import deadline_scope, run_with_deadline
+from ..retry import DEFAULT_RETRY_POLICY, NO_RETRY_POLICY, RetryPolicy, retry_scope
 from .acfun import AcFun
-from .base import VideoInfo, VideoSource
+from .base import BaseParser, VideoInfo, VideoSource
 from .bilibili import BiliBili
 from .cctv import CCTV
 from .doupai import DouPai
@@ -26,22 +35,30 @@ from .xinpianchang import XinPianChang
 from .zuiyou import ZuiYou
 
 # 视频来源与解析器的映射关系
+# api_hosts 为解析器请求的接口域名，用于启动时预热连接（见 warmup.py）
+# 可选 retry_policy 为该平台上游请求的重试策略，未配置时使用 DEFAULT_RETRY_POLICY
 video_source_info_mapping = {
     VideoSource.AcFun: {
         "domain_list": ["www.acfun.cn"],
         "parser": AcFun,
+        "api_hosts": ["www.acfun.cn"],
     },
     VideoSource.CCTV: {
         "domain_list": ["tv.cctv.cn", "tv.cctv.com"],
         "parser": CCTV,
+        "api_hosts": ["vdn.apps.cntv.cn"],
     },
     VideoSource.DouPai: {
         "domain_list": ["doupai.cc"],
         "parser": DouPai,
+        "api_hosts": ["v2.doupai.cc"],
     },
     VideoSource.DouYin: {
         "domain_list": ["v.douyin.com", "www.iesdouyin.com", "www.douyin.com"],
         "parser": DouYin,
+        "api_hosts": ["www.iesdouyin.com", "www.douyin.com"],
+        # 抖音对突发请求敏感，且解析器内部已有接口回退，只补一次重试
+        "retry_policy": RetryPolicy(max_attempts=2),
     },
     VideoSource.HaoKan: {
         "domain_list": [
@@ -49,6 +66,7 @@ video_source_info_mapping = {
             "haokan.hao123.com",
         ],
         "parser": HaoKan,
+        "api_hosts": ["haokan.baidu.com"],
     },
     VideoSource.BiliBili: {
         "domain_list": [
@@ -57,70 +75,87 @@ video_source_info_mapping = {
             "m.bilibili.com",
         ],
         "parser": BiliBili,
+        "api_hosts": ["api.bilibili.com", "www.bilibili.com"],
     },
     VideoSource.HuYa: {
         "domain_list": ["v.huya.com"],
         "parser": HuYa,
+        "api_hosts": ["liveapi.huya.com"],
     },
     VideoSource.KuaiShou: {
         "domain_list": ["v.kuaishou.com"],
         "parser": KuaiShou,
+        "api_hosts": ["v.kuaishou.com"],
     },
     VideoSource.LiShiPin: {
         "domain_list": ["www.pearvideo.com"],
         "parser": LiShiPin,
+        "api_hosts": ["www.pearvideo.com"],
     },
     VideoSource.LvZhou: {
         "domain_list": ["weibo.cn"],
         "parser": LvZhou,
+        "api_hosts": ["m.oasis.weibo.cn"],
     },
     VideoSource.MeiPai: {
         "domain_list": ["meipai.com"],
         "parser": MeiPai,
+        "api_hosts": ["www.meipai.com"],
     },
     VideoSource.PiPiGaoXiao: {
         "domain_list": ["h5.pipigx.com"],
         "parser": PiPiGaoXiao,
+        "api_hosts": ["share.ippzone.com"],
     },
     VideoSource.PiPiXia: {
         "domain_list": ["h5.pipix.com"],
         "parser": PiPiXia,
+        "api_hosts": ["api.pipix.com"],
     },
     VideoSource.QuanMin: {
         "domain_list": ["xspshare.baidu.com"],
         "parser": QuanMin,
+        "api_hosts": ["quanmin.hao222.com"],
     },
     VideoSource.QuanMinKGe: {
         "domain_list": ["kg.qq.com"],
         "parser": QuanMinKGe,
+        "api_hosts": ["kg.qq.com"],
     },
     VideoSource.SixRoom: {
         "domain_list": ["6.cn"],
         "parser": SixRoom,
+        "api_hosts": ["v.6.cn"],
     },
     VideoSource.Sohu: {
         "domain_list": ["tv.sohu.com", "my.tv.sohu.com"],
         "parser": Sohu,
+        "api_hosts": ["api.tv.sohu.com"],
     },
     VideoSource.WeiBo: {
         "domain_list": ["weibo.com"],
         "parser": WeiBo,
+        "api_hosts": ["h5.video.weibo.com"],
     },
     VideoSource.WeiShi: {
         "domain_list": ["isee.weishi.qq.com"],
         "parser": WeiShi,
+        "api_hosts": ["h5.weishi.qq.com"],
     },
     VideoSource.XiGua: {
         "domain_list": ["v.ixigua.com", "www.ixigua.com"],
         "parser": XiGua,
+        "api_hosts": ["www.ixigua.com"],
     },
     VideoSource.XinPianChang: {
         "domain_list": ["xinpianchang.com"],
         "parser": XinPianChang,
+        "api_hosts": ["mod-api.xinpianchang.com"],
     },
     VideoSource.ZuiYou: {
         "domain_list": ["share.xiaochuankeji.cn"],
         "parser": ZuiYou,
+        "api_hosts": ["share.xiaochuankeji.cn"],
     },
     VideoSource.RedBook: {
         "domain_list": [
@@ -129,6 +164,9 @@ video_source_info_mapping = {
             "xhslink.cn",
         ],
         "parser": RedBook,
+        "api_hosts": ["www.xiaohongshu.com"],
+        # 小红书重试容易触发风控封禁 IP，不做重试
+        "retry_policy": NO_RETRY_POLICY,
     },
     VideoSource.Twitter: {
         "domain_list": [
@@ -138,29 +176,103 @@ video_source_info_mapping = {
             "mobile.twitter.com",
         ],
         "parser": Twitter,
+        "api_hosts": ["cdn.syndication.twimg.com"],
     },
     VideoSource.QQVideo: {
         "domain_list": ["v.qq.com", "m.v.qq.com"],
         "parser": QQVideo,
+        "api_hosts": ["vv.video.qq.com"],
     },
 }
 
 
-async def parse_video_share_url(share_url: str) -> VideoInfo:
+@contextmanager
+def _parse_scope(source: VideoSource) -> Iterator[None]:
     """
-    解析分享链接, 获取视频信息
-    :param share_url: 视频分享链接
-    :return:
+    经过平台熔断器，标记当前解析的平台，并套用该平台的重试策略；
+    需在 deadline_scope 之内进入，熔断器据此区分调用方截止时间耗尽与上游超时
+    """
+    policy = video_source_info_mapping[source].get("retry_policy", DEFAULT_RETRY_POLICY)
+    breaker = circuit_breakers.get(source.value)
+    with breaker.guard(), source_scope(source), retry_scope(policy):
+        yield
+
+
+class ParserRegistry:
     """
-    source = ""
+    按 (事件循环, 平台) 缓存解析器实例
+
+    - 每个平台首次解析时创建实例并调用一次 startup()，之后的解析并发复用同一实例，
+      Cookie、接口偏好、UA 生成器等状态可以保存在实例上
+    - 实例可能持有与事件循环绑定的连接，因此同 TransportPool 一样每个事件循环各持有一份
+    - startup() 失败时不缓存，下次解析重新创建
+    """
+
+    def __init__(self):
+        self._parsers: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    async def get(self, source: VideoSource) -> BaseParser:
+        parsers = self._parsers.setdefault(asyncio.get_running_loop(), {})
+        starting = parsers.get(source)
+        if starting is None:
+            starting = asyncio.ensure_future(self._create(source))
+            parsers[source] = starting
+        try:
+            # 调用方被取消（如超时）时不影响其他等待同一实例的解析
+            return await asyncio.shield(starting)
+        except Exception:
+            if parsers.get(source) is starting:
+                del parsers[source]
+            raise
+
+    @staticmethod
+    async def _create(source: VideoSource) -> BaseParser:
+        parser = video_source_info_mapping[source]["parser"]()
+        await parser.startup()
+        return parser
+
+    async def aclose_all(self) -> None:
+        """关闭当前事件循环下的所有解析器实例，之后的解析会重新创建"""
+        parsers = self._parsers.pop(asyncio.get_running_loop(), {})
+        started = []
+        for starting in parsers.values():
+            if not starting.done():
+                starting.cancel()
+            elif not starting.cancelled() and starting.exception() is None:
+                started.append(starting.result())
+        await asyncio.gather(
+            *(parser.aclose() for parser in started), return_exceptions=True
+        )
+
+
+parser_registry = ParserRegistry()
+
+
+async def _run_parser(source: VideoSource, method: str, arg: str) -> VideoInfo:
+    """取出该平台的解析器实例并调用 method(arg)"""
+    parser = await parser_registry.get(source)
+    return await getattr(parser, method)(arg)
+
+
+def find_source(share_url: str) -> VideoSource | None:
+    """按域名找到分享链接所属的平台，不支持的链接返回 None"""
     for item_source, item_source_info in video_source_info_mapping.items():
         for item_url_domain in item_source_info["domain_list"]:
             if item_url_domain in share_url:
-                source = item_source
-                break
-        if source:
-            break
+                return item_source
+    return None
 
+
+async def parse_video_share_url(
+    share_url: str, timeout: float | None = None
+) -> VideoInfo:
+    """
+    解析分享链接, 获取视频信息
+    :param share_url: 视频分享链接
+    :param timeout: 整次解析的超时时间（秒），覆盖解析器内的全部上游请求，None 为不限
+    :return:
+    """
+    source = find_source(share_url)
     if not source:
         raise ValueError(f"share url [{share_url}] does not have source config")
 
@@ -168,17 +280,22 @@ async def parse_video_share_url(share_url: str) -> VideoInfo:
     if not url_parser:
         raise ValueError(f"source {source} has no video parser")
 
-    _obj = url_parser()
-    video_info = await _obj.parse_share_url(share_url)
+    with deadline_scope(timeout), _parse_scope(source):
+        video_info = await run_with_deadline(
+            _run_parser(source, "parse_share_url", share_url)
+        )
 
     return video_info
 
 
-async def parse_video_id(source: VideoSource, video_id: str) -> VideoInfo:
+async def parse_video_id(
+    source: VideoSource, video_id: str, timeout: float | None = None
+) -> VideoInfo:
     """
     解析视频ID, 获取视频信息
     :param source: 视频来源
     :param video_id: 视频id
+    :param timeout: 整次解析的超时时间（秒），覆盖解析器内的全部上游请求，None 为不限
     :return:
     """
     if not video_id or not source:
@@ -188,7 +305,9 @@ async def parse_video_id(source: VideoSource, video_id: str) -> VideoInfo:
     if not id_parser:
         raise ValueError(f"source {source} has no video parser")
 
-    _obj = id_parser()
-    video_info = await _obj.parse_video_id(video_id)
+    with deadline_scope(timeout), _parse_scope(source):
+        video_info = await run_with_deadline(
+            _run_parser(source, "parse_video_id", video_id)
+        )
 
     return video_info
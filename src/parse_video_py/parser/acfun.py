@@ -7,6 +7,39 @@ from ..utils import create_async_client
 from .base import BaseParser, VideoAuthor, VideoInfo
 
 
+def _extract_page(html: str) -> tuple[dict, dict, dict]:
+    """从视频页 HTML 中提取视频信息、播放信息和作者信息"""
+    re_video_pattern = r"var videoInfo =\s(.*?);"
+    re_video_result = re.search(re_video_pattern, html)
+    if not re_video_result or len(re_video_result.groups()) < 1:
+        raise Exception("failed to parse video JSON info from HTML")
+
+    video_text = re_video_result.group(1).strip()
+    video_data = json.loads(video_text)
+
+    # 解析视频播放地址
+    re_play_info_pattern = r"var playInfo =\s(.*?);"
+    re_play_info_result = re.search(re_play_info_pattern, html)
+    if not re_play_info_result or len(re_play_info_result.groups()) < 1:
+        raise Exception("failed to parse play info JSON info from HTML")
+
+    play_info_text = re_play_info_result.group(1).strip()
+    play_info_data = json.loads(play_info_text)
+
+    # 解析用户信息
+    sel = Selector(html)
+    author = {
+        "uid": sel.css("div.up-info > a.info-item1::attr(href)")
+        .get(default="")
+        .replace("/upPage/", ""),
+        "name": sel.css("div.up-info span.up-name::text").get(default=""),
+        "avatar": sel.css("div.up-info span.up-avatar > img::attr(src)").get(
+            default=""
+        ),
+    }
+    return video_data, play_info_data, author
+
+
 class AcFun(BaseParser):
     """
     A站：视频地址是m3u8, 可以使用网站 https://tools.thatwind.com/tool/m3u8downloader 下载
@@ -17,41 +50,18 @@ class AcFun(BaseParser):
             response = await client.get(share_url, headers=self.get_default_headers())
             response.raise_for_status()
 
-        re_video_pattern = r"var videoInfo =\s(.*?);"
-        re_video_result = re.search(re_video_pattern, response.text)
-        if not re_video_result or len(re_video_result.groups()) < 1:
-            raise Exception("failed to parse video JSON info from HTML")
-
-        video_text = re_video_result.group(1).strip()
-        video_data = json.loads(video_text)
-
-        # 解析视频播放地址
-        re_play_info_pattern = r"var playInfo =\s(.*?);"
-        re_play_info_result = re.search(re_play_info_pattern, response.text)
-        if not re_play_info_result or len(re_play_info_result.groups()) < 1:
-            raise Exception("failed to parse play info JSON info from HTML")
-
-        play_info_text = re_play_info_result.group(1).strip()
-        play_info_data = json.loads(play_info_text)
-
-        # 解析用户信息
-        sel = Selector(response.text)
-        uid = (
-            sel.css("div.up-info > a.info-item1::attr(href)")
-            .get(default="")
-            .replace("/upPage/", "")
+        video_data, play_info_data, author = await self.extract(
+            _extract_page, response.text
         )
-        name = sel.css("div.up-info span.up-name::text").get(default="")
-        avatar = sel.css("div.up-info span.up-avatar > img::attr(src)").get(default="")
 
         video_info = VideoInfo(
             video_url=play_info_data["streams"][0]["playUrls"][0],
             cover_url=video_data["cover"],
             title=video_data["title"],
             author=VideoAuthor(
-                uid=uid,
-                name=name,
-                avatar=avatar,
+                uid=author["uid"],
+                name=author["name"],
+                avatar=author["avatar"],
             ),
         )
         return video_info
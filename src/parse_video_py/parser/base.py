@@ -1,10 +1,12 @@
 import dataclasses
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Dict, List
+from typing import Any, Callable, Dict, List
 
 import fake_useragent
 
+from ..extract import extraction_executor
+
 
 class VideoSource(Enum):
     """
@@ -93,12 +95,51 @@ class VideoInfo:
 
 
 class BaseParser(ABC):
-    @staticmethod
-    def get_default_headers() -> Dict[str, str]:
+    """
+    解析器基类
+
+    实例由 parser_registry 按平台创建并长期复用（见 parser/__init__.py），
+    同一实例会被多个解析并发调用：单次解析的状态放在局部变量中，
+    实例属性只保存可以跨请求共享的状态（如 UA 生成器、Cookie、接口偏好）
+    """
+
+    # 页面内容超过该长度（字符）时移出事件循环解析，None 表示使用全局配置（见 extract.py）
+    extract_threshold: int | None = None
+
+    def __init__(self):
+        # 按操作系统缓存的 UA 生成器，创建一次需要加载整份 UA 数据
+        self._user_agents: dict[str, fake_useragent.UserAgent] = {}
+
+    async def startup(self) -> None:
+        """首次解析前调用一次，可在此准备跨请求复用的状态或连接"""
+
+    async def aclose(self) -> None:
+        """释放 startup 及解析过程中创建的资源，服务退出时调用"""
+
+    def random_user_agent(self, os: str = "iOS") -> str:
+        """随机生成指定操作系统的 User-Agent"""
+        user_agent = self._user_agents.get(os)
+        if user_agent is None:
+            user_agent = fake_useragent.UserAgent(os=os)
+            self._user_agents[os] = user_agent
+        return user_agent.random
+
+    def get_default_headers(self) -> Dict[str, str]:
         return {
-            "User-Agent": fake_useragent.UserAgent(os="iOS").random,
+            "User-Agent": self.random_user_agent("iOS"),
         }
 
+    async def extract(
+        self, func: Callable[..., Any], payload: str | bytes, *args
+    ) -> Any:
+        """
+        执行 func(payload, *args) 提取页面数据，内容较大时在线程池中执行，
+        避免阻塞事件循环上的其他请求
+        """
+        return await extraction_executor.run(
+            func, payload, *args, threshold=self.extract_threshold
+        )
+
     @abstractmethod
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         """
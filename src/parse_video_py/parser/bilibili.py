@@ -1,8 +1,9 @@
 import json
 from urllib.parse import urlparse
 
-from ..utils import create_async_client
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .. import canonical
+from ..utils import create_async_client, probe_redirect
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class BiliBili(BaseParser):
@@ -94,19 +95,16 @@ class BiliBili(BaseParser):
 
         if "b23.tv" in parsed_url.netloc:
             # 处理短链接
-            async with create_async_client(follow_redirects=False) as client:
-                resp = await client.get(raw_url, headers=self.get_default_headers())
-                location = resp.headers.get("location")
-                if not location:
-                    raise ValueError("无法从b23.tv获取重定向链接")
-                return await self._get_bvid_from_url(location)
+            resp = await probe_redirect(raw_url, headers=self.get_default_headers())
+            location = resp.headers.get("location")
+            if not location:
+                raise ValueError("无法从b23.tv获取重定向链接")
+            return await self._get_bvid_from_url(location)
 
         if "bilibili.com" in parsed_url.netloc:
-            path = parsed_url.path.strip("/")
-            parts = path.split("/")
-            if len(parts) >= 2 and parts[0] == "video":
-                if parts[1].startswith("BV"):
-                    return parts[1]
+            bvid = canonical.extract_video_id(VideoSource.BiliBili, raw_url)
+            if bvid:
+                return bvid
 
         raise ValueError("不是有效的B站视频链接")
 
@@ -2,10 +2,12 @@ import json
 import re
 import secrets
 import string
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import urlparse
 
-from ..utils import create_async_client
-from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
+from .. import canonical
+from ..deadline import DeadlineExceeded
+from ..utils import create_async_client, probe_redirect
+from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo, VideoSource
 
 
 class DouYin(BaseParser):
@@ -54,7 +56,7 @@ class DouYin(BaseParser):
             if not find_res or not find_res.group(1):
                 raise ValueError("parse video json info from html fail")
 
-            json_data = json.loads(find_res.group(1).strip())
+            json_data = await self.extract(json.loads, find_res.group(1).strip())
 
         # 处理不同的数据结构
         data = None
@@ -176,8 +178,7 @@ class DouYin(BaseParser):
         return video_info
 
     async def get_video_redirect_url(self, video_url: str) -> str:
-        async with create_async_client(follow_redirects=False) as client:
-            response = await client.get(video_url, headers=self.get_default_headers())
+        response = await probe_redirect(video_url, headers=self.get_default_headers())
         # 返回重定向后的地址，如果没有重定向则返回原地址(抖音中的西瓜视频,重定向地址为空)
         return response.headers.get("location") or video_url
 
@@ -190,8 +191,7 @@ class DouYin(BaseParser):
 
     async def _parse_app_share_url(self, share_url: str) -> str:
         """解析app分享链接 https://v.douyin.com/xxxxxx"""
-        async with create_async_client(follow_redirects=False) as client:
-            response = await client.get(share_url, headers=self.get_default_headers())
+        response = await probe_redirect(share_url, headers=self.get_default_headers())
 
         location = response.headers.get("location")
         if not location:
@@ -206,31 +206,15 @@ class DouYin(BaseParser):
         return self._parse_video_id_from_path(location)
 
     def _parse_video_id_from_path(self, url_path: str) -> str:
-        """从URL路径中解析视频ID"""
+        """
+        从URL中解析视频ID，规则见 canonical
+        - 网页精选页面: https://www.douyin.com/jingxuan?modal_id=7555093909760789812
+        - https://www.iesdouyin.com/share/video/7424432820954598707/?region=CN
+        - https://www.douyin.com/video/xxxxxx
+        """
         if not url_path:
             return ""
-
-        try:
-            parsed_url = urlparse(url_path)
-
-            # 判断网页精选页面的视频
-            # https://www.douyin.com/jingxuan?modal_id=7555093909760789812
-            query_params = parse_qs(parsed_url.query)
-            if "modal_id" in query_params:
-                return query_params["modal_id"][0]
-
-            # 判断其他页面的视频
-            # https://www.iesdouyin.com/share/video/7424432820954598707/?region=CN&mid=7424432976273869622&u_code=0
-            # https://www.douyin.com/video/xxxxxx
-            path = parsed_url.path.strip("/")
-            if path:
-                path_parts = path.split("/")
-                if len(path_parts) > 0:
-                    return path_parts[-1]
-        except Exception:
-            pass
-
-        return ""
+        return canonical.extract_video_id(VideoSource.DouYin, url_path) or ""
 
     def _get_no_webp_url(self, url_list: list) -> str:
         """优先获取非 .webp 格式的图片 url"""
@@ -296,6 +280,9 @@ class DouYin(BaseParser):
                     )
                     response.raise_for_status()
                     data = response.json()
+                except DeadlineExceeded:
+                    # 预算已耗尽，不再尝试下一个接口和 HTML 回退
+                    raise
                 except Exception:
                     continue
                 if data and data.get("aweme_details"):
@@ -1,9 +1,6 @@
-import re
-
-import fake_useragent
-
+from .. import canonical
 from ..utils import create_async_client
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class HuYa(BaseParser):
@@ -12,20 +9,17 @@ class HuYa(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        re_pattern = r"\/(\d+).html"
-        re_result = re.search(re_pattern, share_url)
-
-        if not re_result:
+        video_id = canonical.extract_video_id(VideoSource.HuYa, share_url)
+        if not video_id:
             raise Exception("parse video_id from share url fail")
 
-        video_id = re_result.group(1)
         return await self.parse_video_id(video_id)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         req_url = f"https://liveapi.huya.com/moment/getMomentContent?videoId={video_id}"
         async with create_async_client() as client:
             headers = {
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": self.random_user_agent("windows"),
                 "Referer": "https://v.huya.com/",
             }
             response = await client.get(req_url, headers=headers)
@@ -1,9 +1,7 @@
 import json
 import re
 
-import fake_useragent
-
-from ..utils import create_async_client
+from ..utils import create_async_client, probe_redirect
 from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
 
 
@@ -13,17 +11,16 @@ class KuaiShou(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        user_agent = fake_useragent.UserAgent(os="iOS").random
+        user_agent = self.random_user_agent("iOS")
 
         # 获取跳转前的信息, 从中获取跳转url, cookie
-        async with create_async_client(follow_redirects=False) as client:
-            share_response = await client.get(
-                share_url,
-                headers={
-                    "User-Agent": user_agent,
-                    "Referer": "https://v.kuaishou.com/",
-                },
-            )
+        share_response = await probe_redirect(
+            share_url,
+            headers={
+                "User-Agent": user_agent,
+                "Referer": "https://v.kuaishou.com/",
+            },
+        )
 
         location_url = share_response.headers.get("location", "")
         if len(location_url) <= 0:
@@ -46,7 +43,7 @@ class KuaiShou(BaseParser):
             raise Exception("failed to parse video JSON info from HTML")
 
         json_text = re_result.group(1).strip()
-        json_data = json.loads(json_text)
+        json_data = await self.extract(json.loads, json_text)
 
         photo_data = {}
         for json_item in json_data.values():
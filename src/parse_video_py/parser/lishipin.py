@@ -1,10 +1,8 @@
 import time
-from urllib.parse import urlparse
-
-import fake_useragent
 
+from .. import canonical
 from ..utils import create_async_client
-from .base import BaseParser, VideoInfo
+from .base import BaseParser, VideoInfo, VideoSource
 
 
 class LiShiPin(BaseParser):
@@ -13,10 +11,8 @@ class LiShiPin(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        url_res = urlparse(share_url)
-
-        video_id = url_res.path.replace("/detail_", "")
-        if len(video_id) == 0:
+        video_id = canonical.extract_video_id(VideoSource.LiShiPin, share_url)
+        if not video_id:
             raise ValueError("parse video_id from share url fail")
 
         return await self.parse_video_id(video_id)
@@ -30,7 +26,7 @@ class LiShiPin(BaseParser):
         async with create_async_client() as client:
             headers = {
                 "Referer": f"https://www.pearvideo.com/detail_{video_id}",
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": self.random_user_agent("windows"),
             }
             response = await client.get(req_url, headers=headers)
 
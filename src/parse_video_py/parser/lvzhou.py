@@ -6,6 +6,34 @@ from ..utils import create_async_client
 from .base import BaseParser, VideoAuthor, VideoInfo
 
 
+def _extract_page(html: str) -> VideoInfo:
+    """从分享页 HTML 中提取视频信息"""
+    sel = Selector(html)
+
+    video_url = sel.css("video::attr(src)").get()
+    author_avatar = sel.css("a.avatar img::attr(src)").get()
+    video_cover_style = sel.css("div.video-cover::attr(style)").get(default="")
+
+    cover_url = ""
+    if video_cover_style:
+        match = re.search(r"background-image:url\((.*)\)", video_cover_style)
+        if match:
+            cover_url = match.group(1)
+
+    title = sel.css("div.status-title::text").get()
+    author_name = sel.css("div.nickname::text").get()
+
+    return VideoInfo(
+        video_url=video_url,
+        cover_url=cover_url,
+        title=title,
+        author=VideoAuthor(
+            name=author_name,
+            avatar=author_avatar,
+        ),
+    )
+
+
 class LvZhou(BaseParser):
     """
     绿洲
@@ -16,30 +44,7 @@ class LvZhou(BaseParser):
             response = await client.get(share_url, headers=self.get_default_headers())
             response.raise_for_status()
 
-        sel = Selector(response.text)
-
-        video_url = sel.css("video::attr(src)").get()
-        author_avatar = sel.css("a.avatar img::attr(src)").get()
-        video_cover_style = sel.css("div.video-cover::attr(style)").get(default="")
-
-        cover_url = ""
-        if video_cover_style:
-            match = re.search(r"background-image:url\((.*)\)", video_cover_style)
-            if match:
-                cover_url = match.group(1)
-
-        title = sel.css("div.status-title::text").get()
-        author_name = sel.css("div.nickname::text").get()
-
-        return VideoInfo(
-            video_url=video_url,
-            cover_url=cover_url,
-            title=title,
-            author=VideoAuthor(
-                name=author_name,
-                avatar=author_avatar,
-            ),
-        )
+        return await self.extract(_extract_page, response.text)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         share_url = f"https://m.oasis.weibo.cn/v1/h5/share?sid={video_id}"
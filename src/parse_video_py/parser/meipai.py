@@ -1,13 +1,25 @@
 import base64
 from typing import Dict, List
 
-import fake_useragent
 from parsel import Selector
 
 from ..utils import create_async_client
 from .base import BaseParser, VideoAuthor, VideoInfo
 
 
+def _extract_page(html: str) -> Dict[str, str]:
+    """从视频页 HTML 中提取所需字段"""
+    sel = Selector(html)
+    return {
+        "video_bs64": sel.css("#shareMediaBtn::attr(data-video)").get(default=""),
+        "cover_url": sel.css("#detailVideo img::attr(src)").get(default=""),
+        "title": sel.css(".detail-cover-title::text").get(default="").strip(),
+        "uid": sel.css(".detail-name a::attr(href)").get(default="").split("/")[-1],
+        "name": sel.css(".detail-avatar::attr(alt)").get(default=""),
+        "avatar": sel.css(".detail-avatar::attr(src)").get(default=""),
+    }
+
+
 class MeiPai(BaseParser):
     """
     美拍
@@ -16,25 +28,22 @@ class MeiPai(BaseParser):
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         async with create_async_client() as client:
             headers = {
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": self.random_user_agent("windows"),
             }
             response = await client.get(share_url, headers=headers)
             response.raise_for_status()
 
-        sel = Selector(response.text)
-        video_bs64 = sel.css("#shareMediaBtn::attr(data-video)").get(default="")
-        video_url = self.parse_video_bs64(video_bs64)
+        page = await self.extract(_extract_page, response.text)
+        video_url = self.parse_video_bs64(page["video_bs64"])
 
         video_info = VideoInfo(
             video_url=video_url,
-            cover_url=sel.css("#detailVideo img::attr(src)").get(default=""),
-            title=sel.css(".detail-cover-title::text").get(default="").strip(),
+            cover_url=page["cover_url"],
+            title=page["title"],
             author=VideoAuthor(
-                uid=sel.css(".detail-name a::attr(href)")
-                .get(default="")
-                .split("/")[-1],
-                name=sel.css(".detail-avatar::attr(alt)").get(default=""),
-                avatar="https:" + sel.css(".detail-avatar::attr(src)").get(default=""),
+                uid=page["uid"],
+                name=page["name"],
+                avatar="https:" + page["avatar"],
             ),
         )
         return video_info
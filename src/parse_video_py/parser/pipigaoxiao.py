@@ -1,9 +1,6 @@
-from urllib.parse import urlparse
-
-import fake_useragent
-
+from .. import canonical
 from ..utils import create_async_client
-from .base import BaseParser, VideoInfo
+from .base import BaseParser, VideoInfo, VideoSource
 
 
 class PiPiGaoXiao(BaseParser):
@@ -12,10 +9,8 @@ class PiPiGaoXiao(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        url_res = urlparse(share_url)
-
-        video_id = url_res.path.replace("/pp/post/", "")
-        if len(video_id) == 0:
+        video_id = canonical.extract_video_id(VideoSource.PiPiGaoXiao, share_url)
+        if not video_id:
             raise ValueError("parse video_id from share url fail")
 
         return await self.parse_video_id(video_id)
@@ -26,7 +21,7 @@ class PiPiGaoXiao(BaseParser):
             headers = {
                 "Referer": req_url,
                 "Content-Type": "text/plain;charset=UTF-8",
-                "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+                "User-Agent": self.random_user_agent("windows"),
             }
             # pid需要是数字，这里直接拼接json字符串，不用json.dumps
             post_content = '{"pid":' + video_id + ',"type":"post","mid":null}'
@@ -1,5 +1,6 @@
-from ..utils import create_async_client
-from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
+from .. import canonical
+from ..utils import create_async_client, probe_redirect
+from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo, VideoSource
 
 
 class PiPiXia(BaseParser):
@@ -8,8 +9,12 @@ class PiPiXia(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        async with create_async_client(follow_redirects=False) as client:
-            response = await client.get(share_url, headers=self.get_default_headers())
+        # h5.pipix.com/item/{id} 可以直接拿到视频ID，分享短链需要跟随一次重定向
+        video_id = canonical.extract_video_id(VideoSource.PiPiXia, share_url)
+        if video_id:
+            return await self.parse_video_id(video_id)
+
+        response = await probe_redirect(share_url, headers=self.get_default_headers())
         location_url = response.headers.get("location", "")
         if len(location_url) <= 0:
             raise Exception("failed to get location url from share url")
@@ -1,12 +1,8 @@
 import json
-import re
-from urllib.parse import parse_qs, urlparse
 
+from .. import canonical
 from ..utils import create_async_client
-from .base import BaseParser, VideoInfo
-
-# 匹配腾讯视频页面路径中的视频 ID
-_qq_vid_path_re = re.compile(r"/x/(?:page|cover)/(?:[^/]+/)?(\w+)\.html")
+from .base import BaseParser, VideoInfo, VideoSource
 
 
 class QQVideo(BaseParser):
@@ -78,27 +74,12 @@ class QQVideo(BaseParser):
         )
 
     def _extract_vid(self, raw_url: str) -> str:
-        """从 URL 中提取腾讯视频 ID"""
-        parsed = urlparse(raw_url)
-        host = parsed.hostname or ""
-
-        # 移动端播放页: m.v.qq.com/x/m/play?vid={vid}
-        if "m.v.qq.com" in host:
-            query_params = parse_qs(parsed.query)
-            vid = query_params.get("vid", [""])[0]
-            if vid:
-                return vid
-            raise ValueError("移动端链接中未找到vid参数")
-
-        # PC端页面
-        if "v.qq.com" in host:
-            return self._extract_vid_from_path(parsed.path)
-
-        raise ValueError(f"不支持的腾讯视频域名: {host}")
-
-    def _extract_vid_from_path(self, path: str) -> str:
-        """从 URL 路径中提取视频 ID"""
-        match = _qq_vid_path_re.search(path)
-        if match and match.group(1):
-            return match.group(1)
-        raise ValueError(f"无法从路径 {path} 中提取视频ID")
+        """
+        从 URL 中提取腾讯视频 ID，规则见 canonical
+        - PC端页面: v.qq.com/x/page/{vid}.html、v.qq.com/x/cover/{cid}/{vid}.html
+        - 移动端播放页: m.v.qq.com/x/m/play?vid={vid}
+        """
+        vid = canonical.extract_video_id(VideoSource.QQVideo, raw_url)
+        if not vid:
+            raise ValueError(f"无法从链接 {raw_url} 中提取视频ID")
+        return vid
@@ -1,6 +1,7 @@
-from parse_video_py.utils import create_async_client, get_val_from_url_by_query_key
+from parse_video_py import canonical
+from parse_video_py.utils import create_async_client
 
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class QuanMin(BaseParser):
@@ -9,7 +10,7 @@ class QuanMin(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        video_id = get_val_from_url_by_query_key(share_url, "vid")
+        video_id = canonical.require_video_id(VideoSource.QuanMin, share_url)
         return await self.parse_video_id(video_id)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
@@ -1,11 +1,10 @@
 import json
 import re
 
-import fake_useragent
+from parse_video_py import canonical
+from parse_video_py.utils import create_async_client
 
-from parse_video_py.utils import create_async_client, get_val_from_url_by_query_key
-
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class QuanMinKGe(BaseParser):
@@ -14,14 +13,14 @@ class QuanMinKGe(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        video_id = get_val_from_url_by_query_key(share_url, "s")
+        video_id = canonical.require_video_id(VideoSource.QuanMinKGe, share_url)
         return await self.parse_video_id(video_id)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
         req_url = f"https://kg.qq.com/node/play?s={video_id}"
         async with create_async_client() as client:
             headers = {
-                "User-Agent": fake_useragent.UserAgent(os="windows").random,
+                "User-Agent": self.random_user_agent("windows"),
             }
             response = await client.get(req_url, headers=headers)
             response.raise_for_status()
@@ -1,6 +1,5 @@
 import re
 
-import fake_useragent
 import yaml
 
 from ..utils import create_async_client
@@ -12,9 +11,12 @@ class RedBook(BaseParser):
     小红书
     """
 
+    # yaml 为纯 Python 解析，同样长度的页面比 json 慢得多，较小的页面也移出事件循环
+    extract_threshold = 16384
+
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+            "User-Agent": self.random_user_agent("windows"),
         }
         async with create_async_client(follow_redirects=True) as client:
             response = await client.get(share_url, headers=headers)
@@ -29,7 +31,7 @@ class RedBook(BaseParser):
         if not find_res or not find_res.group(1):
             raise ValueError("parse video json info from html fail")
 
-        json_data = yaml.safe_load(find_res.group(1))
+        json_data = await self.extract(yaml.safe_load, find_res.group(1))
 
         note_id = json_data["note"]["currentNoteId"]
         # 验证返回：小红书的分享链接有有效期，过期后会返回 undefined
@@ -1,7 +1,6 @@
-import fake_useragent
-
-from ..utils import create_async_client, get_val_from_url_by_query_key
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .. import canonical
+from ..utils import create_async_client
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class SixRoom(BaseParser):
@@ -10,14 +9,8 @@ class SixRoom(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        if "watchMini.php?vid=" in share_url:
-            video_id = get_val_from_url_by_query_key(share_url, "vid")
-        else:
-            video_id = share_url.split("?")[0].strip("/").split("/")[-1]
-
-        if len(video_id) == 0:
-            raise Exception("parse video id from share url failed")
-
+        # watchMini.php?vid={id} 或路径最后一段
+        video_id = canonical.require_video_id(VideoSource.SixRoom, share_url)
         return await self.parse_video_id(video_id)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
@@ -28,7 +21,7 @@ class SixRoom(BaseParser):
         )
         headers = {
             "Referer": f"https://m.6.cn/v/{video_id}",
-            "User-Agent": fake_useragent.UserAgent(os="iOS").random,
+            "User-Agent": self.random_user_agent("iOS"),
         }
         async with create_async_client(follow_redirects=True) as client:
             response = await client.get(req_url, headers=headers)
@@ -1,14 +1,6 @@
-import base64
-import re
-
+from .. import canonical
 from ..utils import create_async_client
-from .base import BaseParser, VideoAuthor, VideoInfo
-
-# 匹配 tv.sohu.com/v/{base64}.html 格式的路径
-_sohu_base64_vid_re = re.compile(r"/v/([A-Za-z0-9+/=]+)\.html")
-
-# 匹配 us/{uid}/{vid}.shtml 格式的路径
-_sohu_user_vid_re = re.compile(r"/?us/\d+/(\d+)\.shtml")
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class Sohu(BaseParser):
@@ -77,22 +69,19 @@ class Sohu(BaseParser):
         )
 
     def _extract_vid(self, raw_url: str) -> str:
-        """从 URL 中提取搜狐视频 ID"""
-        # 匹配 tv.sohu.com/v/{base64}.html 格式
-        match = _sohu_base64_vid_re.search(raw_url)
-        if match:
-            decoded = base64.b64decode(match.group(1)).decode("utf-8")
-            return self._extract_vid_from_path(decoded)
-
-        # 匹配 my.tv.sohu.com/us/{uid}/{vid}.shtml 格式
-        if "my.tv.sohu.com" in raw_url or "tv.sohu.com/us/" in raw_url:
-            return self._extract_vid_from_path(raw_url)
-
-        raise ValueError("不是有效的搜狐视频链接")
+        """
+        从 URL 中提取搜狐视频 ID，规则见 canonical
+        - tv.sohu.com/v/{base64}.html，base64 解码后为 us/{uid}/{vid}.shtml
+        - my.tv.sohu.com/us/{uid}/{vid}.shtml
+        """
+        vid = canonical.extract_video_id(VideoSource.Sohu, raw_url)
+        if not vid:
+            raise ValueError("不是有效的搜狐视频链接")
+        return vid
 
     def _extract_vid_from_path(self, path: str) -> str:
         """从路径中提取视频 ID"""
-        match = _sohu_user_vid_re.search(path)
-        if match and match.group(1):
-            return match.group(1)
-        raise ValueError(f"无法从路径 {path} 中提取视频ID")
+        vid = canonical.sohu_id_from_path(path)
+        if not vid:
+            raise ValueError(f"无法从路径 {path} 中提取视频ID")
+        return vid
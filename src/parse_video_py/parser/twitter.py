@@ -1,8 +1,8 @@
 import math
-import re
 
+from .. import canonical
 from ..utils import create_async_client
-from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
+from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo, VideoSource
 
 
 class Twitter(BaseParser):
@@ -160,11 +160,10 @@ class Twitter(BaseParser):
         - https://twitter.com/user/status/1234567890
         - https://mobile.twitter.com/user/status/1234567890
         """
-        pattern = r"(?:twitter\.com|x\.com)/[^/]+/status(?:es)?/(\d+)"
-        match = re.search(pattern, share_url)
-        if not match:
+        tweet_id = canonical.extract_video_id(VideoSource.Twitter, share_url)
+        if not tweet_id:
             raise ValueError(f"无法从 URL 中提取推文 ID: {share_url}")
-        return match.group(1)
+        return tweet_id
 
     def _get_token(self, tweet_id: str) -> str:
         """
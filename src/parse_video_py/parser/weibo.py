@@ -1,10 +1,10 @@
 import re
 from urllib.parse import urlparse
 
-import fake_useragent
-
-from ..utils import create_async_client, get_val_from_url_by_query_key
-from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo
+from .. import canonical
+from ..deadline import DeadlineExceeded
+from ..utils import create_async_client
+from .base import BaseParser, ImgInfo, VideoAuthor, VideoInfo, VideoSource
 
 
 class WeiBo(BaseParser):
@@ -14,12 +14,9 @@ class WeiBo(BaseParser):
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         # Handle video URLs
-        if "show?fid=" in share_url:
-            video_id = get_val_from_url_by_query_key(share_url, "fid")
-            return await self.parse_video_id(video_id)
-        elif "/tv/show/" in share_url:
-            url_info = urlparse(share_url)
-            video_id = url_info.path.replace("/tv/show/", "")
+        # show?fid={id} 或 /tv/show/{id}
+        video_id = canonical.extract_video_id(VideoSource.WeiBo, share_url)
+        if video_id:
             return await self.parse_video_id(video_id)
         else:
             # Handle regular post URLs (potential image albums)
@@ -37,7 +34,7 @@ class WeiBo(BaseParser):
         headers = {
             "Referer": f"https://h5.video.weibo.com/show/{video_id}",
             "Content-Type": "application/x-www-form-urlencoded",
-            "User-Agent": fake_useragent.UserAgent(os="iOS").random,
+            "User-Agent": self.random_user_agent("iOS"),
         }
         post_content = 'data={"Component_Play_Playinfo":{"oid":"' + video_id + '"}}'
         async with create_async_client(follow_redirects=True) as client:
@@ -72,7 +69,7 @@ class WeiBo(BaseParser):
         # Try mobile API first
         req_url = f"https://m.weibo.cn/statuses/show?id={post_id}"
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os="iOS").random,
+            "User-Agent": self.random_user_agent("iOS"),
             "Referer": "https://m.weibo.cn/",
             "Content-Type": "application/json;charset=UTF-8",
             "X-Requested-With": "XMLHttpRequest",
@@ -86,12 +83,15 @@ class WeiBo(BaseParser):
             json_data = response.json()
             if "data" in json_data:
                 return await self._parse_mobile_api_data(json_data["data"])
+        except DeadlineExceeded:
+            # 预算已耗尽，不再回退到网页解析
+            raise
         except Exception:
             pass
 
         # Fallback to desktop page parsing using the original URL
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os="iOS").random,
+            "User-Agent": self.random_user_agent("iOS"),
         }
 
         async with create_async_client(follow_redirects=True) as client:
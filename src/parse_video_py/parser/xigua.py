@@ -1,10 +1,9 @@
 import json
 import re
 
-import fake_useragent
-
-from ..utils import create_async_client
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .. import canonical
+from ..utils import create_async_client, probe_redirect
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class XiGua(BaseParser):
@@ -14,15 +13,14 @@ class XiGua(BaseParser):
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["android"]).random,
+            "User-Agent": self.random_user_agent("android"),
         }
-        if share_url.startswith("https://www.ixigua.com/"):
-            # 支持电脑网页版链接 https://www.ixigua.com/xxxxxx
-            video_id = share_url.strip("/").split("/")[-1]
+        # 支持电脑网页版链接 https://www.ixigua.com/xxxxxx
+        video_id = canonical.extract_video_id(VideoSource.XiGua, share_url)
+        if video_id:
             return await self.parse_video_id(video_id)
 
-        async with create_async_client(follow_redirects=False) as client:
-            response = await client.get(share_url, headers=headers)
+        response = await probe_redirect(share_url, headers=headers)
 
         location_url = response.headers.get("location", "")
         video_id = location_url.split("?")[0].strip("/").split("/")[-1]
@@ -52,7 +50,7 @@ class XiGua(BaseParser):
         if not find_res or not find_res.group(1):
             raise ValueError("parse video json info from html fail")
 
-        json_data = json.loads(find_res.group(1).strip())
+        json_data = await self.extract(json.loads, find_res.group(1).strip())
         original_video_info = json_data["loaderData"]["video_(id)/page"]["videoInfoRes"]
 
         # 如果没有视频信息，获取并抛出异常
@@ -1,12 +1,19 @@
 import json
 
-import fake_useragent
 from parsel import Selector
 
 from ..utils import create_async_client
 from .base import BaseParser, VideoAuthor, VideoInfo
 
 
+def _extract_detail(html: str) -> dict:
+    """从页面的 __NEXT_DATA__ 中提取作品详情"""
+    sel = Selector(html)
+    json_text = sel.css("script#__NEXT_DATA__::text").get()
+    json_data = json.loads(json_text)
+    return json_data["props"]["pageProps"]["detail"]
+
+
 class XinPianChang(BaseParser):
     """
     新片场
@@ -14,7 +21,7 @@ class XinPianChang(BaseParser):
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
         headers = {
-            "User-Agent": fake_useragent.UserAgent(os=["windows"]).random,
+            "User-Agent": self.random_user_agent("windows"),
             "Upgrade-Insecure-Requests": "1",
             "Referer": "https://www.xinpianchang.com/",
         }
@@ -22,10 +29,7 @@ class XinPianChang(BaseParser):
             response = await client.get(share_url, headers=headers)
             response.raise_for_status()
 
-        sel = Selector(response.text)
-        json_text = sel.css("script#__NEXT_DATA__::text").get()
-        json_data = json.loads(json_text)
-        data = json_data["props"]["pageProps"]["detail"]
+        data = await self.extract(_extract_detail, response.text)
 
         # 获取 appKey 和 media_id， 另外调用接口获取mp4视频地址
         app_key = data["video"]["appKey"]
@@ -1,5 +1,6 @@
-from ..utils import create_async_client, get_val_from_url_by_query_key
-from .base import BaseParser, VideoAuthor, VideoInfo
+from .. import canonical
+from ..utils import create_async_client
+from .base import BaseParser, VideoAuthor, VideoInfo, VideoSource
 
 
 class ZuiYou(BaseParser):
@@ -8,7 +9,7 @@ class ZuiYou(BaseParser):
     """
 
     async def parse_share_url(self, share_url: str) -> VideoInfo:
-        video_id = get_val_from_url_by_query_key(share_url, "pid")
+        video_id = canonical.require_video_id(VideoSource.ZuiYou, share_url)
         return await self.parse_video_id(video_id)
 
     async def parse_video_id(self, video_id: str) -> VideoInfo:
@@ -0,0 +1,161 @@
+"""代理池：多代理轮换出口，按近期成功率与延迟加权选择，连续失败自动隔离"""
+
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+from .limiter import proxy_label
+from .metrics import metrics
+from .transport import SharedTransport, shared_transports
+
+
+class ProxyEndpoint:
+    """
+    代理池中的一个代理及其健康状态
+
+    - 成功率与延迟取指数加权平均，权重 = 成功率 / 延迟
+    - 连续失败 quarantine_after 次后隔离 quarantine_seconds 秒
+    """
+
+    # 加权平均的平滑系数
+    _ALPHA = 0.2
+
+    def __init__(
+        self,
+        url: str,
+        platforms: frozenset[str] = frozenset(),
+        quarantine_after: int = 3,
+        quarantine_seconds: float = 60,
+    ):
+        self.url = url
+        self.label = proxy_label(url)
+        self.platforms = platforms
+        self.quarantine_after = quarantine_after
+        self.quarantine_seconds = quarantine_seconds
+        self.success_rate = 1.0
+        self.latency = 1.0
+        self.consecutive_failures = 0
+        self.quarantined_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def quarantined(self) -> bool:
+        return time.monotonic() < self.quarantined_until
+
+    @property
+    def weight(self) -> float:
+        return max(self.success_rate, 0.05) / max(self.latency, 0.05)
+
+    def transport(self) -> SharedTransport:
+        """返回当前事件循环下该代理的共享连接池"""
+        return shared_transports.get(self.url)
+
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            self.success_rate += (1 - self.success_rate) * self._ALPHA
+            self.latency += (latency - self.latency) * self._ALPHA
+            self.consecutive_failures = 0
+        self._publish()
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.success_rate -= self.success_rate * self._ALPHA
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.quarantine_after:
+                self.consecutive_failures = 0
+                self.quarantined_until = time.monotonic() + self.quarantine_seconds
+                metrics.inc("proxy_quarantined_total", self.label)
+        metrics.inc("proxy_failures_total", self.label)
+        self._publish()
+
+    def snapshot(self) -> dict:
+        return {
+            "platforms": sorted(self.platforms),
+            "success_rate": round(self.success_rate, 3),
+            "latency": round(self.latency, 3),
+            "weight": round(self.weight, 3),
+            "quarantined": self.quarantined,
+        }
+
+    async def aclose(self) -> None:
+        """关闭当前事件循环下的连接池"""
+        await shared_transports.aclose(self.url)
+
+    def _publish(self) -> None:
+        metrics.set_gauge("proxy_weight", self.label, round(self.weight, 3))
+
+
+class ProxyPool:
+    """
+    代理池
+
+    指定了平台的代理只服务这些平台；没有指定代理的平台使用未指定平台的代理。
+    所有可用代理都被隔离时，选择最早解除隔离的代理，而不是直接失败
+    """
+
+    def __init__(self, endpoints: list[ProxyEndpoint] | None = None):
+        self.endpoints = endpoints or []
+
+    def __bool__(self) -> bool:
+        return bool(self.endpoints)
+
+    @classmethod
+    def from_env(cls) -> "ProxyPool":
+        """
+        从环境变量加载代理池：
+        - PARSE_VIDEO_PROXY_FILE：代理列表文件，每行一个代理，
+          可在代理地址后用空格跟逗号分隔的平台列表，# 开头为注释
+        - PARSE_VIDEO_PROXY_LIST：逗号分隔的代理地址列表
+        """
+        endpoints = []
+        proxy_file = os.getenv("PARSE_VIDEO_PROXY_FILE")
+        if proxy_file:
+            endpoints += parse_proxy_lines(
+                Path(proxy_file).read_text(encoding="utf-8").splitlines()
+            )
+        proxy_list = os.getenv("PARSE_VIDEO_PROXY_LIST")
+        if proxy_list:
+            endpoints += parse_proxy_lines(proxy_list.split(","))
+        return cls(endpoints)
+
+    def choose(self, platform: str) -> ProxyEndpoint | None:
+        """为指定平台选择一个代理，代理池为空时返回 None"""
+        candidates = [e for e in self.endpoints if platform in e.platforms]
+        if not candidates:
+            candidates = [e for e in self.endpoints if not e.platforms]
+        if not candidates:
+            return None
+
+        healthy = [e for e in candidates if not e.quarantined]
+        if not healthy:
+            return min(candidates, key=lambda e: e.quarantined_until)
+        return random.choices(healthy, weights=[e.weight for e in healthy])[0]
+
+    def snapshot(self) -> dict[str, dict]:
+        return {endpoint.label: endpoint.snapshot() for endpoint in self.endpoints}
+
+    async def aclose(self) -> None:
+        for endpoint in self.endpoints:
+            await endpoint.aclose()
+
+
+def parse_proxy_lines(lines: list[str]) -> list[ProxyEndpoint]:
+    """解析代理配置行：`代理地址 [平台1,平台2]`"""
+    endpoints = []
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        url, _, platforms = line.partition(" ")
+        endpoints.append(
+            ProxyEndpoint(
+                url,
+                frozenset(p.strip() for p in platforms.split(",") if p.strip()),
+            )
+        )
+    return endpoints
+
+
+proxy_pool = ProxyPool.from_env()
@@ -0,0 +1,191 @@
+"""进程内 DNS 缓存：按域名缓存解析结果，临近过期时后台刷新热点域名，支持静态覆盖"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+import time
+from typing import Iterable
+
+import httpcore
+
+from .metrics import metrics
+
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_overrides(spec: str) -> dict[str, list[str]]:
+    """解析静态覆盖配置，如 api.bilibili.com=1.2.3.4|1.2.3.5,www.douyin.com=5.6.7.8"""
+    overrides = {}
+    for item in spec.split(","):
+        if not item.strip():
+            continue
+        host, sep, addresses = item.partition("=")
+        addresses = [a.strip() for a in addresses.split("|") if a.strip()]
+        if not sep or not host.strip() or not addresses:
+            raise ValueError(f"无效的 DNS 覆盖配置: {item}")
+        overrides[host.strip()] = addresses
+    return overrides
+
+
+class DNSCache:
+    """
+    DNS 缓存
+
+    - 解析结果缓存 ttl 秒，同一域名的并发解析只查询一次
+    - 缓存条目在 ttl * prefetch_ratio 之后被访问，视为热点，后台提前刷新，
+      访问方直接使用旧结果，不等待解析
+    - 刷新或重新解析失败时继续使用已过期的结果，避免解析服务抖动导致请求失败
+    - overrides 中的域名直接返回配置的地址，不查询 DNS
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        prefetch_ratio: float = 0.8,
+        overrides: dict[str, list[str]] | None = None,
+    ):
+        self.ttl = ttl
+        self.prefetch_ratio = prefetch_ratio
+        self.overrides = overrides or {}
+        # 域名 -> (地址列表, 解析时间)
+        self._entries: dict[str, tuple[list[str], float]] = {}
+        self._pending: dict[str, asyncio.Task] = {}
+        self._refreshing: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls) -> "DNSCache":
+        """
+        从环境变量加载配置：
+        - PARSE_VIDEO_DNS_TTL：缓存时间（秒），默认 60，设为 0 关闭缓存
+        - PARSE_VIDEO_DNS_OVERRIDES：静态覆盖，格式见 parse_overrides
+        """
+        return cls(
+            ttl=float(os.getenv("PARSE_VIDEO_DNS_TTL", "60")),
+            overrides=parse_overrides(os.getenv("PARSE_VIDEO_DNS_OVERRIDES", "")),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 or bool(self.overrides)
+
+    async def resolve(self, host: str) -> list[str]:
+        """返回域名对应的地址列表"""
+        if host in self.overrides:
+            return self.overrides[host]
+        if _is_ip(host):
+            return [host]
+
+        entry = self._entries.get(host)
+        if entry is not None:
+            addresses, resolved_at = entry
+            age = time.monotonic() - resolved_at
+            if age < self.ttl:
+                metrics.inc("dns_cache_hits_total")
+                if age >= self.ttl * self.prefetch_ratio:
+                    self._refresh_in_background(host)
+                return addresses
+
+        metrics.inc("dns_cache_misses_total")
+        try:
+            return await asyncio.shield(self._lookup(host))
+        except OSError:
+            if entry is not None:
+                return entry[0]
+            raise
+
+    def prefetch(self, hosts: Iterable[str]) -> None:
+        """后台预先解析一批域名，不等待结果"""
+        for host in hosts:
+            if host not in self.overrides and not _is_ip(host):
+                self._refresh_in_background(host)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _lookup(self, host: str) -> asyncio.Task:
+        """合并同一域名的并发解析"""
+        task = self._pending.get(host)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._query(host))
+            self._pending[host] = task
+            task.add_done_callback(lambda t: self._forget(host, t))
+        return task
+
+    def _forget(self, host: str, task: asyncio.Task) -> None:
+        if self._pending.get(host) is task:
+            del self._pending[host]
+
+    async def _query(self, host: str) -> list[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            host, None, type=socket.SOCK_STREAM
+        )
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if not addresses:
+            raise socket.gaierror(f"未解析到地址: {host}")
+        self._entries[host] = (addresses, time.monotonic())
+        return addresses
+
+    def _refresh_in_background(self, host: str) -> None:
+        if host in self._pending:
+            return
+        task = asyncio.ensure_future(self._refresh(host))
+        self._refreshing.add(task)
+        task.add_done_callback(self._refreshing.discard)
+
+    async def _refresh(self, host: str) -> None:
+        try:
+            await self._lookup(host)
+        except OSError:
+            metrics.inc("dns_refresh_failures_total")
+
+
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    """
+    通过 DNS 缓存建立 TCP 连接的网络后端，依次尝试域名的各个地址。
+    TLS 握手的 SNI 仍使用原始域名（由 httpcore 按请求地址设置）
+    """
+
+    def __init__(self, cache: DNSCache, backend: httpcore.AsyncNetworkBackend):
+        self._cache = cache
+        self._backend = backend
+
+    async def connect_tcp(
+        self,
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options=None,
+    ) -> httpcore.AsyncNetworkStream:
+        try:
+            addresses = await asyncio.wait_for(self._cache.resolve(host), timeout)
+        except asyncio.TimeoutError as err:
+            raise httpcore.ConnectTimeout(f"DNS 解析超时: {host}") from err
+        except OSError as err:
+            raise httpcore.ConnectError(f"DNS 解析失败: {host}: {err}") from err
+
+        error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(
+                    address, port, timeout, local_address, socket_options
+                )
+            except httpcore.ConnectError as err:
+                error = err
+        raise error
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+dns_cache = DNSCache.from_env()
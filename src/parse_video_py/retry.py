@@ -0,0 +1,115 @@
+"""上游请求重试：按平台配置的重试策略（指数退避 + 抖动）与全局重试预算"""
+
+import dataclasses
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+import httpx
+
+
+@dataclasses.dataclass(frozen=True)
+class RetryPolicy:
+    """
+    单个平台的重试策略
+
+    解析器发出的请求都是读取类接口（包括微博、最右等使用 POST 的接口），
+    因此不区分请求方法，命中可重试状态码或异常即可重试。
+    """
+
+    # 最多尝试次数（含首次请求），1 表示不重试
+    max_attempts: int = 3
+
+    # 可重试的响应状态码
+    retry_statuses: frozenset = frozenset({500, 502, 503, 504})
+
+    # 可重试的异常类型（连接阶段失败、连接被重置等瞬时错误）
+    retry_exceptions: tuple = (
+        httpx.ConnectError,
+        httpx.ConnectTimeout,
+        httpx.ReadError,
+        httpx.RemoteProtocolError,
+        httpx.PoolTimeout,
+    )
+
+    # 退避基数与上限（秒）
+    backoff_base: float = 0.2
+    backoff_max: float = 2.0
+
+    def backoff(self, attempt: int) -> float:
+        """第 attempt 次失败后的等待时间，采用 full jitter 避免重试同步"""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        return random.uniform(0, ceiling)
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+# 不重试的策略，用于对突发请求敏感、容易触发风控的平台
+NO_RETRY_POLICY = RetryPolicy(max_attempts=1)
+
+
+class RetryBudget:
+    """
+    全局重试预算：限制重试量占总请求量的比例，避免上游故障时重试放大流量。
+
+    每个首次请求存入 ratio 个令牌，每次重试消耗 1 个令牌；
+    另外每秒固定补充 min_per_second 个令牌，保证低流量时也能少量重试。
+    """
+
+    def __init__(
+        self, ratio: float = 0.2, min_per_second: float = 1, max_tokens: float = 50
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """记录一次首次请求"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        """申请一次重试，预算不足时返回 False"""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(
+            self.max_tokens, self._tokens + elapsed * self.min_per_second
+        )
+
+
+retry_budget = RetryBudget()
+
+_current_policy: ContextVar[RetryPolicy | None] = ContextVar(
+    "parse_video_retry_policy", default=None
+)
+
+
+@contextmanager
+def retry_scope(policy: RetryPolicy) -> Iterator[None]:
+    """在当前上下文中使用指定的重试策略"""
+    token = _current_policy.set(policy)
+    try:
+        yield
+    finally:
+        _current_policy.reset(token)
+
+
+def current_retry_policy() -> RetryPolicy:
+    """返回当前上下文的重试策略，未设置时使用默认策略"""
+    return _current_policy.get() or DEFAULT_RETRY_POLICY
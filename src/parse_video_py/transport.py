@@ -0,0 +1,184 @@
+"""共享连接池：解析器每次解析都会新建短生命周期的客户端，连接池在此长期保持复用"""
+
+import asyncio
+import importlib.util
+import os
+import time
+import weakref
+
+import httpx
+
+from .resolver import CachingNetworkBackend, dns_cache
+
+
+def _env_hosts(name: str) -> frozenset[str]:
+    return frozenset(h.strip() for h in os.getenv(name, "").split(",") if h.strip())
+
+
+# HTTP/2 模式：同一域名的并发请求复用一条连接（需安装 parse-video-py[http2]）
+HTTP2_ENABLED = os.getenv("PARSE_VIDEO_HTTP2", "").lower() in ("1", "true", "yes")
+
+# HTTP/2 下表现异常的域名，强制使用 HTTP/1.1
+HTTP1_ONLY_HOSTS = _env_hosts("PARSE_VIDEO_HTTP1_HOSTS")
+
+# 共享连接池中空闲连接的保留时间（秒）
+KEEPALIVE_EXPIRY = float(os.getenv("PARSE_VIDEO_KEEPALIVE_EXPIRY", "60"))
+
+# 共享连接池的最大连接数，两种后端的空闲连接都全部保留，避免高并发下反复重建连接
+_MAX_CONNECTIONS = 100
+
+# 底层连接池实现：httpx（默认）或 aiohttp，解析器始终通过 httpx 客户端接口发请求
+HTTP_BACKEND = os.getenv("PARSE_VIDEO_HTTP_BACKEND", "httpx").strip().lower()
+
+# 解析器客户端是否使用共享连接池（HTTP/2 模式、aiohttp 后端或启动预热时开启）
+_shared_pool_enabled = HTTP2_ENABLED or HTTP_BACKEND == "aiohttp"
+
+
+def shared_pool_enabled() -> bool:
+    return _shared_pool_enabled
+
+
+def enable_shared_pool() -> None:
+    """让之后创建的解析器客户端都使用共享连接池"""
+    global _shared_pool_enabled
+    _shared_pool_enabled = True
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """
+    包装长期复用的连接池，供短生命周期的客户端使用：
+    客户端退出时不会关闭底层连接池，连接在多次解析之间保持复用。
+    同时记录各域名最近一次请求的时间，供预热的空闲策略判断（见 warmup.py）
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+        self.last_used: dict[str, float] = {}
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.last_used[request.url.host] = time.monotonic()
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class HostRoutingTransport(httpx.AsyncBaseTransport):
+    """
+    按域名分流：http1_hosts 中的域名走 HTTP/1.1 连接池，其余走 HTTP/2 连接池
+    """
+
+    def __init__(
+        self,
+        http2: httpx.AsyncBaseTransport,
+        http1: httpx.AsyncBaseTransport,
+        http1_hosts: frozenset[str],
+    ):
+        self.http2 = http2
+        self.http1 = http1
+        self.http1_hosts = http1_hosts
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.host in self.http1_hosts:
+            return await self.http1.handle_async_request(request)
+        return await self.http2.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.http2.aclose()
+        await self.http1.aclose()
+
+
+def install_dns_cache(transport: httpx.AsyncBaseTransport | None) -> None:
+    """让 httpx 自带的连接池通过 DNS 缓存建立连接（见 resolver.py）"""
+    if not dns_cache.enabled:
+        return
+    if isinstance(transport, HostRoutingTransport):
+        install_dns_cache(transport.http2)
+        install_dns_cache(transport.http1)
+        return
+    pool = getattr(transport, "_pool", None)
+    backend = getattr(pool, "_network_backend", None)
+    if backend is not None and not isinstance(backend, CachingNetworkBackend):
+        pool._network_backend = CachingNetworkBackend(dns_cache, backend)
+
+
+def build_transport(
+    proxy: str | None = None,
+    http2: bool | None = None,
+    http1_hosts: frozenset[str] | None = None,
+    backend: str | None = None,
+) -> httpx.AsyncBaseTransport:
+    """按配置创建底层连接池，http2 / http1_hosts / backend 未指定时取环境变量配置"""
+    http2 = HTTP2_ENABLED if http2 is None else http2
+    http1_hosts = HTTP1_ONLY_HOSTS if http1_hosts is None else http1_hosts
+    backend = HTTP_BACKEND if backend is None else backend
+    if backend not in ("httpx", "aiohttp"):
+        raise ValueError(f"不支持的 HTTP 后端: {backend}，可选 httpx / aiohttp")
+    if backend == "aiohttp":
+        if http2:
+            raise ValueError("aiohttp 后端不支持 HTTP/2，请取消 PARSE_VIDEO_HTTP2")
+        from .aiohttp_transport import AiohttpTransport
+
+        return AiohttpTransport(
+            proxy=proxy,
+            limit=_MAX_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY,
+            dns_cache=dns_cache,
+        )
+
+    limits = httpx.Limits(
+        max_connections=_MAX_CONNECTIONS,
+        max_keepalive_connections=_MAX_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+    if not http2:
+        transport = httpx.AsyncHTTPTransport(proxy=proxy, limits=limits)
+    elif importlib.util.find_spec("h2") is None:
+        raise ImportError(
+            "HTTP/2 模式需要 h2 依赖，请使用 parse-video-py[http2] 安装，"
+            "或取消 PARSE_VIDEO_HTTP2 环境变量"
+        )
+    else:
+        transport = HostRoutingTransport(
+            httpx.AsyncHTTPTransport(proxy=proxy, http2=True, limits=limits),
+            httpx.AsyncHTTPTransport(proxy=proxy, limits=limits),
+            http1_hosts,
+        )
+    install_dns_cache(transport)
+    return transport
+
+
+class TransportPool:
+    """
+    按 (事件循环, 代理) 缓存共享连接池
+
+    连接不能跨事件循环使用（如命令行多次 asyncio.run、测试用例各自的事件循环），
+    因此每个事件循环各持有一份，事件循环被回收时随之释放
+    """
+
+    def __init__(self):
+        self._pools: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def get(self, proxy: str | None = None) -> SharedTransport:
+        pools = self._pools.setdefault(asyncio.get_running_loop(), {})
+        transport = pools.get(proxy)
+        if transport is None:
+            transport = SharedTransport(build_transport(proxy))
+            pools[proxy] = transport
+        return transport
+
+    async def aclose(self, proxy: str | None = None) -> None:
+        """关闭当前事件循环下指定代理的连接池"""
+        pools = self._pools.get(asyncio.get_running_loop(), {})
+        transport = pools.pop(proxy, None)
+        if transport is not None:
+            await transport._transport.aclose()
+
+    async def aclose_all(self) -> None:
+        """关闭当前事件循环下的所有连接池"""
+        pools = self._pools.pop(asyncio.get_running_loop(), {})
+        for transport in pools.values():
+            await transport._transport.aclose()
+
+
+shared_transports = TransportPool()
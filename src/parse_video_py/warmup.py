@@ -0,0 +1,131 @@
+"""启动预热：提前建立到各平台接口域名的长连接，并按空闲策略保持连接可用"""
+
+import asyncio
+import dataclasses
+import os
+import time
+
+import httpx
+
+from .metrics import metrics
+from .parser import video_source_info_mapping
+from .proxy import proxy_pool
+from .transport import SharedTransport, enable_shared_pool, shared_transports
+
+
+@dataclasses.dataclass(frozen=True)
+class IdlePolicy:
+    """
+    预热连接的空闲策略
+    """
+
+    # 两次保温之间的间隔（秒），应小于共享连接池的 keepalive_expiry
+    refresh_interval: float = 45
+
+    # 域名超过该时间（秒）没有真实请求时停止保温，连接随后自然过期
+    idle_timeout: float = 600
+
+    # 单次预热请求的超时（秒）
+    request_timeout: float = 5
+
+    @classmethod
+    def from_env(cls) -> "IdlePolicy":
+        """从 PARSE_VIDEO_WARMUP_INTERVAL / PARSE_VIDEO_WARMUP_IDLE_TIMEOUT 读取配置"""
+        return cls(
+            refresh_interval=float(os.getenv("PARSE_VIDEO_WARMUP_INTERVAL", "45")),
+            idle_timeout=float(os.getenv("PARSE_VIDEO_WARMUP_IDLE_TIMEOUT", "600")),
+        )
+
+
+def warmup_enabled() -> bool:
+    return os.getenv("PARSE_VIDEO_WARMUP", "").lower() in ("1", "true", "yes")
+
+
+def registry_hosts() -> list[str]:
+    """从解析器注册表汇总各平台的接口域名（去重，保持注册顺序）"""
+    hosts = []
+    for source_info in video_source_info_mapping.values():
+        hosts.extend(source_info.get("api_hosts", []))
+    return list(dict.fromkeys(hosts))
+
+
+class ConnectionWarmer:
+    """
+    连接预热器
+
+    start() 只创建后台任务，不阻塞服务启动，健康检查可以立即通过。
+    后台任务先对所有域名发一次 HEAD 请求建立连接，之后每隔 refresh_interval
+    对仍在使用的域名再请求一次，使连接不会因空闲而被关闭
+    """
+
+    def __init__(self, hosts: list[str], policy: IdlePolicy | None = None):
+        self.hosts = hosts
+        self.policy = policy or IdlePolicy()
+        self._task: asyncio.Task | None = None
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        enable_shared_pool()
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def warm(self, hosts: list[str]) -> int:
+        """对每个共享连接池预热指定域名，返回成功建立连接的次数"""
+        transports = self._transports()
+        results = await asyncio.gather(
+            *(self._warm_host(t, host) for t in transports for host in hosts)
+        )
+        return sum(results)
+
+    def active_hosts(self) -> list[str]:
+        """空闲时间未超过 idle_timeout 的域名，启动后尚未使用的域名从启动时刻算起"""
+        now = time.monotonic()
+        transports = self._transports()
+        active = []
+        for host in self.hosts:
+            last_used = max(
+                [t.last_used.get(host, self._started_at) for t in transports]
+            )
+            if now - last_used < self.policy.idle_timeout:
+                active.append(host)
+        return active
+
+    def _transports(self) -> list[SharedTransport]:
+        # 配置了代理池时解析请求都经代理发出，只需预热各代理的连接池
+        if proxy_pool:
+            return [endpoint.transport() for endpoint in proxy_pool.endpoints]
+        return [shared_transports.get(os.getenv("PARSE_VIDEO_PROXY") or None)]
+
+    async def _run(self) -> None:
+        await self.warm(self.hosts)
+        while True:
+            await asyncio.sleep(self.policy.refresh_interval)
+            await self.warm(self.active_hosts())
+
+    async def _warm_host(self, transport: SharedTransport, host: str) -> bool:
+        # 直接使用底层连接池，预热请求不计入域名的最近使用时间
+        request = httpx.Request(
+            "HEAD",
+            f"https://{host}/",
+            extensions={
+                "timeout": httpx.Timeout(self.policy.request_timeout).as_dict()
+            },
+        )
+        try:
+            response = await transport._transport.handle_async_request(request)
+            await response.aclose()
+        except httpx.HTTPError:
+            metrics.inc("warmup_failures_total", host)
+            return False
+        metrics.inc("warmup_connections_total", host)
+        return True
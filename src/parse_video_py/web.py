@@ -1,16 +1,35 @@
+import asyncio
 import dataclasses
 import os
 import secrets
+from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, HTTPException, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, status
 from fastapi.responses import HTMLResponse
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from fastapi.templating import Jinja2Templates
 from fastapi_mcp import FastApiMCP
+from pydantic import BaseModel, Field
 
 from parse_video_py import VideoSource, parse_video_id, parse_video_share_url
-from parse_video_py.utils import extract_url
+from parse_video_py.breaker import CircuitOpenError, circuit_breakers
+from parse_video_py.canonical import canonical_key, extract_urls
+from parse_video_py.deadline import DeadlineExceeded
+from parse_video_py.extract import LoopLagMonitor, extraction_executor
+from parse_video_py.jobs import JobManager
+from parse_video_py.limiter import share_between_processes
+from parse_video_py.metrics import metrics
+from parse_video_py.parser import parser_registry
+from parse_video_py.proxy import proxy_pool
+from parse_video_py.transport import shared_transports
+from parse_video_py.utils import SingleFlight, extract_url
+from parse_video_py.warmup import (
+    ConnectionWarmer,
+    IdlePolicy,
+    registry_hosts,
+    warmup_enabled,
+)
 
 
 def _get_templates_dir() -> str:
@@ -21,7 +40,36 @@ def _get_templates_dir() -> str:
     raise FileNotFoundError("templates 目录未找到")
 
 
-app = FastAPI()
+# 批量任务结果落盘目录，多个工作进程共享同一目录即可互相查询任务进度
+job_manager = JobManager(os.getenv("PARSE_VIDEO_JOB_DIR", ".parse_video_jobs"))
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # 多进程时各进程分摊速率与并发上限，整体与单进程配置一致
+    share_between_processes(int(os.getenv("PARSE_VIDEO_WORKERS") or 1))
+    # 启动时接管上次未完成的任务，退出时取消执行中的任务（已完成部分已落盘）
+    job_manager.resume()
+    # 预热在后台进行，不阻塞启动，健康检查可以立即通过
+    warmer = None
+    if warmup_enabled():
+        warmer = ConnectionWarmer(registry_hosts(), IdlePolicy.from_env())
+        warmer.start()
+    # 事件循环延迟由 /metrics 输出，用于观察同步解析对其他请求的影响
+    lag_monitor = LoopLagMonitor()
+    lag_monitor.start()
+    yield
+    await lag_monitor.aclose()
+    if warmer is not None:
+        await warmer.aclose()
+    await job_manager.aclose()
+    # 解析器实例可能持有连接，先于共享连接池关闭
+    await parser_registry.aclose_all()
+    await shared_transports.aclose_all()
+    extraction_executor.shutdown()
+
+
+app = FastAPI(lifespan=lifespan)
 
 mcp = FastApiMCP(app)
 mcp.mount_http()
@@ -61,6 +109,44 @@ def _build_auth_dependency() -> list[Depends]:
 _auth_dependency = _build_auth_dependency()
 
 
+# 相同链接的并发解析合并为一次上游调用；分享链接按 canonical_key 合并，
+# 同一视频带不同追踪参数、不同写法的链接也只解析一次
+_parse_flight = SingleFlight()
+
+_CLIENT_DISCONNECTED = {
+    "code": 499,
+    "msg": "客户端已断开连接",
+}
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    """阻塞直到客户端断开连接"""
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def _parse_unless_disconnected(request: Request, key: str, func):
+    """执行解析，客户端中途断开时放弃等待。
+
+    返回 (结果, 是否已断开)。断开后是否真正取消上游解析由 SingleFlight 决定：
+    仍有其他请求在等待同一结果时，解析会继续进行。
+    """
+    parse_task = asyncio.ensure_future(_parse_flight.do(key, func))
+    watcher = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({parse_task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+
+    if not parse_task.done():
+        parse_task.cancel()
+        await asyncio.gather(parse_task, return_exceptions=True)
+        return None, True
+    return parse_task.result(), False
+
+
 @app.get("/", response_class=HTMLResponse, dependencies=_auth_dependency)
 async def read_item(request: Request):
     return templates.TemplateResponse(
@@ -73,7 +159,11 @@ async def read_item(request: Request):
 
 
 @app.get("/video/share/url/parse", dependencies=_auth_dependency)
-async def share_url_parse(url: str):
+async def share_url_parse(
+    request: Request,
+    url: str,
+    timeout: float | None = Query(None, gt=0, le=120, description="解析超时（秒）"),
+):
     video_share_url = extract_url(url)
     if video_share_url is None:
         return {
@@ -82,12 +172,28 @@ async def share_url_parse(url: str):
         }
 
     try:
-        video_info = await parse_video_share_url(video_share_url)
+        video_info, disconnected = await _parse_unless_disconnected(
+            request,
+            f"share:{canonical_key(video_share_url)}:{timeout}",
+            lambda: parse_video_share_url(video_share_url, timeout=timeout),
+        )
+        if disconnected:
+            return _CLIENT_DISCONNECTED
         return {
             "code": 200,
             "msg": "解析成功",
             "data": dataclasses.asdict(video_info),
         }
+    except DeadlineExceeded as err:
+        return {
+            "code": 504,
+            "msg": str(err),
+        }
+    except CircuitOpenError as err:
+        return {
+            "code": 503,
+            "msg": str(err),
+        }
     except Exception as err:
         return {
             "code": 500,
@@ -96,14 +202,35 @@ async def share_url_parse(url: str):
 
 
 @app.get("/video/id/parse", dependencies=_auth_dependency)
-async def video_id_parse(source: VideoSource, video_id: str):
+async def video_id_parse(
+    request: Request,
+    source: VideoSource,
+    video_id: str,
+    timeout: float | None = Query(None, gt=0, le=120, description="解析超时（秒）"),
+):
     try:
-        video_info = await parse_video_id(source, video_id)
+        video_info, disconnected = await _parse_unless_disconnected(
+            request,
+            f"id:{source.value}:{video_id}:{timeout}",
+            lambda: parse_video_id(source, video_id, timeout=timeout),
+        )
+        if disconnected:
+            return _CLIENT_DISCONNECTED
         return {
             "code": 200,
             "msg": "解析成功",
             "data": dataclasses.asdict(video_info),
         }
+    except DeadlineExceeded as err:
+        return {
+            "code": 504,
+            "msg": str(err),
+        }
+    except CircuitOpenError as err:
+        return {
+            "code": 503,
+            "msg": str(err),
+        }
     except Exception as err:
         return {
             "code": 500,
@@ -111,4 +238,88 @@ async def video_id_parse(source: VideoSource, video_id: str):
         }
 
 
+class JobCreateRequest(BaseModel):
+    urls: list[str] = Field(default_factory=list)
+    # 整段文本（如聊天记录），从中提取全部支持平台的分享链接，排在 urls 之后
+    text: str | None = None
+    concurrency: int = Field(10, ge=1, le=50)
+    webhook_url: str | None = None
+    timeout: float | None = Field(None, gt=0, le=120)
+
+
+@app.post("/jobs", dependencies=_auth_dependency)
+async def job_create(req: JobCreateRequest):
+    if not req.urls and not req.text:
+        return {
+            "code": 400,
+            "msg": "urls 不能为空",
+        }
+
+    urls = req.urls + extract_urls(req.text) if req.text else req.urls
+    if not urls:
+        return {
+            "code": 400,
+            "msg": "未检测到有效的分享链接",
+        }
+
+    job = await job_manager.submit(urls, req.concurrency, req.webhook_url, req.timeout)
+    return {
+        "code": 200,
+        "msg": "任务已提交",
+        "data": {"job_id": job.job_id, "total": job.total},
+    }
+
+
+@app.get("/jobs/{job_id}", dependencies=_auth_dependency)
+async def job_detail(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    job = job_manager.get(job_id)
+    if job is None:
+        return {
+            "code": 404,
+            "msg": "任务不存在",
+        }
+
+    return {
+        "code": 200,
+        "msg": "查询成功",
+        "data": {
+            **dataclasses.asdict(job),
+            "offset": offset,
+            "limit": limit,
+            "results": job_manager.read_results(job_id, offset, limit),
+        },
+    }
+
+
+@app.get("/metrics", dependencies=_auth_dependency)
+async def metrics_snapshot():
+    return {
+        "code": 200,
+        "msg": "查询成功",
+        "data": metrics.snapshot(),
+    }
+
+
+@app.get("/admin/breakers", dependencies=_auth_dependency)
+async def breaker_states():
+    return {
+        "code": 200,
+        "msg": "查询成功",
+        "data": circuit_breakers.snapshot(),
+    }
+
+
+@app.get("/admin/proxies", dependencies=_auth_dependency)
+async def proxy_states():
+    return {
+        "code": 200,
+        "msg": "查询成功",
+        "data": proxy_pool.snapshot(),
+    }
+
+
 mcp.setup_server()
@@ -0,0 +1,158 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from parse_video_py import transport, utils
+from parse_video_py.aiohttp_transport import AiohttpTransport
+from parse_video_py.cli import _parse
+from parse_video_py.resolver import DNSCache
+from parse_video_py.transport import TransportPool, build_transport
+from parse_video_py.utils import create_async_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/redirect":
+            self._reply(302, headers=[("Location", "/final")])
+        elif self.path == "/cookie":
+            self._reply(200, b"set", headers=[("Set-Cookie", "sid=abc; Path=/")])
+        elif self.path == "/echo-cookie":
+            self._reply(200, (self.headers.get("Cookie") or "").encode())
+        else:
+            body = f"{self.path}|{self.headers.get('User-Agent')}".encode()
+            self._reply(200, body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self._reply(200, self.rfile.read(length))
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def client():
+    backend = AiohttpTransport()
+    async with httpx.AsyncClient(transport=backend) as client:
+        yield client
+    await backend.aclose()
+
+
+class TestBuildBackend:
+    """测试按配置选择底层连接池"""
+
+    def test_aiohttp_backend(self):
+        assert isinstance(build_transport(backend="aiohttp"), AiohttpTransport)
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="HTTP 后端"):
+            build_transport(backend="requests")
+
+    def test_aiohttp_rejects_http2(self):
+        with pytest.raises(ValueError, match="HTTP/2"):
+            build_transport(http2=True, backend="aiohttp")
+
+
+class TestAiohttpTransport:
+    """测试 aiohttp 后端对 httpx 客户端接口的兼容"""
+
+    async def test_get_with_client_headers(self, client, upstream):
+        response = await client.get(
+            f"{upstream}/api?id=1", headers={"User-Agent": "parse-video"}
+        )
+        assert response.status_code == 200
+        assert response.text == "/api?id=1|parse-video"
+
+    async def test_post_body(self, client, upstream):
+        response = await client.post(f"{upstream}/api", json={"a": 1})
+        assert response.json() == {"a": 1}
+
+    async def test_redirect_handled_by_client(self, client, upstream):
+        response = await client.get(f"{upstream}/redirect")
+        assert response.status_code == 302
+        assert response.headers["location"] == "/final"
+        followed = await client.get(f"{upstream}/redirect", follow_redirects=True)
+        assert followed.url.path == "/final"
+
+    async def test_cookies_kept_by_client(self, client, upstream):
+        await client.get(f"{upstream}/cookie")
+        assert client.cookies["sid"] == "abc"
+        assert (await client.get(f"{upstream}/echo-cookie")).text == "sid=abc"
+
+    async def test_stream(self, client, upstream):
+        async with client.stream("GET", f"{upstream}/stream") as response:
+            body = b"".join([chunk async for chunk in response.aiter_bytes()])
+        assert body.startswith(b"/stream|")
+
+    async def test_connect_error_mapped(self, client):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        with pytest.raises(httpx.ConnectError):
+            await client.get(f"http://127.0.0.1:{port}/")
+
+    async def test_dns_cache_override(self, upstream):
+        port = upstream.rsplit(":", 1)[1]
+        cache = DNSCache(overrides={"upstream.test": ["127.0.0.1"]})
+        backend = AiohttpTransport(dns_cache=cache)
+        async with httpx.AsyncClient(transport=backend) as client:
+            response = await client.get(f"http://upstream.test:{port}/x")
+        await backend.aclose()
+        assert response.text.startswith("/x|")
+
+
+class TestAiohttpClient:
+    """测试统一客户端切换到 aiohttp 后端"""
+
+    async def test_create_async_client(self, monkeypatch, upstream):
+        pool = TransportPool()
+        monkeypatch.setattr(transport, "HTTP_BACKEND", "aiohttp")
+        monkeypatch.setattr(transport, "HTTP2_ENABLED", False)
+        monkeypatch.setattr(utils, "shared_pool_enabled", lambda: True)
+        monkeypatch.setattr(utils, "shared_transports", pool)
+        monkeypatch.delenv("PARSE_VIDEO_PROXY", raising=False)
+        async with create_async_client() as client:
+            response = await client.get(f"{upstream}/api")
+        assert isinstance(client._transport._transport, AiohttpTransport)
+        assert response.text.startswith("/api|")
+        await pool.aclose_all()
+
+    async def test_cli_closes_session(self, monkeypatch, upstream):
+        """命令行运行结束时关闭 aiohttp 会话，不留下未关闭的连接"""
+        pool = TransportPool()
+        monkeypatch.setattr(transport, "HTTP_BACKEND", "aiohttp")
+        monkeypatch.setattr(transport, "HTTP2_ENABLED", False)
+        monkeypatch.setattr(utils, "shared_pool_enabled", lambda: True)
+        monkeypatch.setattr(utils, "shared_transports", pool)
+        monkeypatch.setattr(_parse, "shared_transports", pool)
+        monkeypatch.delenv("PARSE_VIDEO_PROXY", raising=False)
+
+        async def fetch():
+            async with create_async_client() as client:
+                await client.get(f"{upstream}/api")
+            return client._transport._transport._session
+
+        session = await _parse._closing_parsers(fetch())
+        assert session.closed
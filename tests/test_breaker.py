@@ -0,0 +1,195 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from parse_video_py import breaker as breaker_module
+from parse_video_py import parse_video_share_url
+from parse_video_py.breaker import (
+    CircuitBreaker,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+    is_upstream_failure,
+)
+from parse_video_py.deadline import DeadlineExceeded, deadline_scope
+from parse_video_py.parser.kuaishou import KuaiShou
+
+
+def _fail(breaker: CircuitBreaker, err: Exception):
+    with pytest.raises(type(err)):
+        with breaker.guard():
+            raise err
+
+
+def _succeed(breaker: CircuitBreaker):
+    with breaker.guard():
+        pass
+
+
+def _status_error(status: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://example.com/")
+    response = httpx.Response(status, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class TestUpstreamFailure:
+    """测试哪些异常计入熔断失败"""
+
+    def test_transport_errors_are_failures(self):
+        assert is_upstream_failure(httpx.ConnectError("down"))
+        assert is_upstream_failure(TimeoutError())
+
+    def test_server_and_blocking_statuses_are_failures(self):
+        assert is_upstream_failure(_status_error(503))
+        assert is_upstream_failure(_status_error(429))
+        assert is_upstream_failure(_status_error(403))
+
+    def test_content_errors_are_not_failures(self):
+        assert not is_upstream_failure(_status_error(404))
+        assert not is_upstream_failure(ValueError("bad url"))
+        assert not is_upstream_failure(KeyError("data"))
+
+    def test_caller_deadline_is_not_failure(self):
+        assert not is_upstream_failure(DeadlineExceeded())
+        with deadline_scope(0):
+            assert not is_upstream_failure(httpx.ReadTimeout("slow"))
+            assert not is_upstream_failure(TimeoutError())
+        with deadline_scope(10):
+            assert is_upstream_failure(httpx.ReadTimeout("slow"))
+
+
+class TestCircuitBreaker:
+    """测试熔断状态机"""
+
+    def test_opens_after_failure_rate_threshold(self):
+        breaker = CircuitBreaker("t", min_calls=4, failure_rate_threshold=0.5)
+        _succeed(breaker)
+        _succeed(breaker)
+        _fail(breaker, httpx.ConnectError("down"))
+        assert breaker.state == CircuitState.Closed
+        _fail(breaker, httpx.ConnectError("down"))
+        assert breaker.state == CircuitState.Open
+
+        with pytest.raises(CircuitOpenError):
+            _succeed(breaker)
+
+    def test_content_errors_do_not_open(self):
+        breaker = CircuitBreaker("t", min_calls=2)
+        for _ in range(5):
+            _fail(breaker, ValueError("bad"))
+        assert breaker.state == CircuitState.Closed
+
+    def test_half_open_probe_success_closes(self):
+        breaker = CircuitBreaker("t", min_calls=1, open_seconds=0)
+        _fail(breaker, httpx.ConnectError("down"))
+        assert breaker.state == CircuitState.HalfOpen
+        _succeed(breaker)
+        assert breaker.state == CircuitState.Closed
+
+    def test_half_open_probe_failure_reopens(self):
+        breaker = CircuitBreaker("t", min_calls=1, open_seconds=0.05)
+        _fail(breaker, httpx.ConnectError("down"))
+        assert breaker.state == CircuitState.Open
+        breaker._opened_at -= 1
+        assert breaker.state == CircuitState.HalfOpen
+        _fail(breaker, httpx.ConnectError("down"))
+        assert breaker.state == CircuitState.Open
+
+    def test_half_open_limits_concurrent_probes(self):
+        breaker = CircuitBreaker("t", min_calls=1, open_seconds=0)
+        _fail(breaker, httpx.ConnectError("down"))
+        with breaker.guard():
+            with pytest.raises(CircuitOpenError):
+                with breaker.guard():
+                    pass
+
+    def test_cancelled_probe_releases_slot(self):
+        breaker = CircuitBreaker("t", min_calls=1, open_seconds=0)
+        _fail(breaker, httpx.ConnectError("down"))
+        with pytest.raises(asyncio.CancelledError):
+            with breaker.guard():
+                raise asyncio.CancelledError()
+        assert breaker.state == CircuitState.HalfOpen
+        _succeed(breaker)
+        assert breaker.state == CircuitState.Closed
+
+    def test_caller_deadline_releases_probe(self):
+        breaker = CircuitBreaker("t", min_calls=1, open_seconds=0)
+        _fail(breaker, httpx.ConnectError("down"))
+        _fail(breaker, DeadlineExceeded())
+        assert breaker.state == CircuitState.HalfOpen
+        _succeed(breaker)
+        assert breaker.state == CircuitState.Closed
+
+    def test_registry_snapshot(self):
+        registry = CircuitBreakerRegistry(min_calls=1)
+        _fail(registry.get("weibo"), httpx.ConnectError("down"))
+        snapshot = registry.snapshot()
+        assert snapshot["weibo"]["state"] == "open"
+        assert snapshot["weibo"]["failures"] == 1
+
+
+class TestParserIntegration:
+    """测试解析入口经过平台熔断器"""
+
+    async def test_open_breaker_fails_fast(self, monkeypatch):
+        registry = CircuitBreakerRegistry(min_calls=2)
+        monkeypatch.setattr("parse_video_py.parser.circuit_breakers", registry)
+        calls = 0
+
+        async def down(self, share_url):
+            nonlocal calls
+            calls += 1
+            raise httpx.ConnectError("down")
+
+        monkeypatch.setattr(KuaiShou, "parse_share_url", down)
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await parse_video_share_url("https://v.kuaishou.com/abc")
+
+        with pytest.raises(CircuitOpenError):
+            await parse_video_share_url("https://v.kuaishou.com/abc")
+        assert calls == 2
+        assert registry.get("kuaishou").state == CircuitState.Open
+
+    async def test_short_caller_deadlines_do_not_open(self, monkeypatch):
+        """调用方给的超时过短导致的失败不计入熔断，不影响其他调用方"""
+        registry = CircuitBreakerRegistry(min_calls=2)
+        monkeypatch.setattr("parse_video_py.parser.circuit_breakers", registry)
+
+        async def slow(self, share_url):
+            await asyncio.sleep(1)
+
+        monkeypatch.setattr(KuaiShou, "parse_share_url", slow)
+        for _ in range(10):
+            with pytest.raises(DeadlineExceeded):
+                await parse_video_share_url("https://v.kuaishou.com/abc", timeout=0.01)
+
+        breaker = registry.get("kuaishou")
+        assert breaker.state == CircuitState.Closed
+        assert breaker.snapshot()["failures"] == 0
+
+    def test_web_returns_503_when_open(self, monkeypatch):
+        from parse_video_py import web
+
+        registry = CircuitBreakerRegistry(min_calls=1)
+        _fail(registry.get("kuaishou"), httpx.ConnectError("down"))
+        monkeypatch.setattr("parse_video_py.parser.circuit_breakers", registry)
+        monkeypatch.setattr(web, "circuit_breakers", registry)
+
+        client = TestClient(web.app)
+        response = client.get(
+            "/video/share/url/parse", params={"url": "https://v.kuaishou.com/abc"}
+        )
+        assert response.json()["code"] == 503
+
+        states = client.get("/admin/breakers").json()["data"]
+        assert states["kuaishou"]["state"] == "open"
+
+
+def test_state_published_to_metrics():
+    breaker = CircuitBreaker("metrics-test", min_calls=1)
+    _fail(breaker, httpx.ConnectError("down"))
+    assert breaker_module.metrics.get("circuit_state", "metrics-test") == 2
@@ -0,0 +1,303 @@
+import base64
+
+import pytest
+
+from parse_video_py.canonical import (
+    Canonical,
+    canonical_key,
+    canonicalize,
+    dedup_key,
+    extract_urls,
+    extract_video_id,
+    require_video_id,
+    strip_tracking_params,
+)
+from parse_video_py.parser import video_source_info_mapping
+from parse_video_py.parser.base import VideoSource
+from parse_video_py.parser.xigua import XiGua
+
+_sohu_path = base64.b64encode(b"us/9999/123456.shtml").decode()
+
+
+class TestCanonicalize:
+    """测试不访问网络规范化分享链接"""
+
+    @pytest.mark.parametrize(
+        "url, source, video_id",
+        [
+            (
+                "https://www.douyin.com/video/7424432820954598707?previous_page=x",
+                VideoSource.DouYin,
+                "7424432820954598707",
+            ),
+            (
+                "https://www.iesdouyin.com/share/video/7424432820954598707/?mid=1",
+                VideoSource.DouYin,
+                "7424432820954598707",
+            ),
+            (
+                "https://www.douyin.com/jingxuan?modal_id=7555093909760789812",
+                VideoSource.DouYin,
+                "7555093909760789812",
+            ),
+            (
+                "https://www.bilibili.com/video/BV1xx411c7mD/?spm_id_from=333",
+                VideoSource.BiliBili,
+                "BV1xx411c7mD",
+            ),
+            (
+                "https://m.bilibili.com/video/BV1xx411c7mD",
+                VideoSource.BiliBili,
+                "BV1xx411c7mD",
+            ),
+            (
+                "https://v.qq.com/x/cover/mzc00200abc/x0012abcd.html",
+                VideoSource.QQVideo,
+                "x0012abcd",
+            ),
+            (
+                "https://m.v.qq.com/x/m/play?vid=x0012abcd&cid=1",
+                VideoSource.QQVideo,
+                "x0012abcd",
+            ),
+            (
+                f"https://tv.sohu.com/v/{_sohu_path}.html",
+                VideoSource.Sohu,
+                "123456",
+            ),
+            (
+                "https://my.tv.sohu.com/us/9999/123456.shtml",
+                VideoSource.Sohu,
+                "123456",
+            ),
+            (
+                "https://x.com/someone/status/1234567890?s=20",
+                VideoSource.Twitter,
+                "1234567890",
+            ),
+            (
+                "https://mobile.twitter.com/someone/status/1234567890",
+                VideoSource.Twitter,
+                "1234567890",
+            ),
+            ("https://v.huya.com/play/987654.html", VideoSource.HuYa, "987654"),
+            ("https://www.acfun.cn/v/ac12345", VideoSource.AcFun, "ac12345"),
+            ("https://doupai.cc/share?id=abc", VideoSource.DouPai, "abc"),
+            ("https://haokan.baidu.com/v?vid=123&pd=1", VideoSource.HaoKan, "123"),
+            (
+                "https://www.pearvideo.com/detail_1700000",
+                VideoSource.LiShiPin,
+                "1700000",
+            ),
+            ("https://m.oasis.weibo.cn/v1/h5/share?sid=45", VideoSource.LvZhou, "45"),
+            ("https://www.meipai.com/media/678", VideoSource.MeiPai, "678"),
+            ("https://h5.pipigx.com/pp/post/111", VideoSource.PiPiGaoXiao, "111"),
+            ("https://h5.pipix.com/item/222?app_id=1", VideoSource.PiPiXia, "222"),
+            ("https://xspshare.baidu.com/s?vid=333", VideoSource.QuanMin, "333"),
+            ("https://kg.qq.com/node/play?s=AbC_1", VideoSource.QuanMinKGe, "AbC_1"),
+            ("https://v.6.cn/minivideo/444", VideoSource.SixRoom, "444"),
+            ("https://m.6.cn/v/watchMini.php?vid=555", VideoSource.SixRoom, "555"),
+            (
+                "https://video.weibo.com/show?fid=1034%3A666",
+                VideoSource.WeiBo,
+                "1034:666",
+            ),
+            ("https://weibo.com/tv/show/1034:777", VideoSource.WeiBo, "1034:777"),
+            (
+                "https://isee.weishi.qq.com/ws/app-pages?id=888",
+                VideoSource.WeiShi,
+                "888",
+            ),
+            ("https://www.ixigua.com/999?logTag=x", VideoSource.XiGua, "999"),
+            ("https://www.ixigua.com/video/999", VideoSource.XiGua, "999"),
+            ("https://www.xinpianchang.com/a1234", VideoSource.XinPianChang, "a1234"),
+            (
+                "https://share.xiaochuankeji.cn/hybrid/share/post?pid=1010",
+                VideoSource.ZuiYou,
+                "1010",
+            ),
+            (
+                "https://www.xiaohongshu.com/explore/64b7a1e2000000001f00abcd",
+                VideoSource.RedBook,
+                "64b7a1e2000000001f00abcd",
+            ),
+            (
+                "https://tv.cctv.com/2024/01/01/VIDEabcDEF123.shtml",
+                VideoSource.CCTV,
+                "VIDEabcDEF123",
+            ),
+        ],
+    )
+    def test_video_id(self, url, source, video_id):
+        assert canonicalize(url) == Canonical(source, video_id, False)
+
+    @pytest.mark.parametrize(
+        "url, source",
+        [
+            ("https://v.douyin.com/iRNBho5m/", VideoSource.DouYin),
+            ("https://b23.tv/abc123", VideoSource.BiliBili),
+            ("https://v.kuaishou.com/abc", VideoSource.KuaiShou),
+            ("https://h5.pipix.com/s/abc/", VideoSource.PiPiXia),
+            ("https://v.ixigua.com/abc/", VideoSource.XiGua),
+            ("http://xhslink.com/a/abc", VideoSource.RedBook),
+            ("https://t.co/abc", VideoSource.Twitter),
+        ],
+    )
+    def test_short_link_needs_resolution(self, url, source):
+        assert canonicalize(url) == Canonical(source, None, True)
+
+    def test_without_video_id(self):
+        """链接中没有视频ID、也不是短链（需要请求页面）"""
+        assert canonicalize("https://www.bilibili.com/read/cv1") == Canonical(
+            VideoSource.BiliBili, None, False
+        )
+        assert canonicalize("https://tv.sohu.com/v/!!!.html") == Canonical(
+            VideoSource.Sohu, None, False
+        )
+
+    def test_unsupported(self):
+        with pytest.raises(ValueError):
+            canonicalize("https://example.com/video/1")
+
+    def test_every_source_has_rule(self):
+        """每个已注册的平台都有提取规则，域名都能路由到对应平台"""
+        for source, info in video_source_info_mapping.items():
+            for domain in info["domain_list"]:
+                assert canonicalize(f"https://{domain}/").source == source
+
+    @pytest.mark.parametrize(
+        "url",
+        [
+            "https://www.reddit.com/r/x",
+            "https://www.dropbox.com/s/abc",
+            "https://evil-douyin.com.example/video/1",
+            "https://example.com/?next=https://www.douyin.com/video/1",
+        ],
+    )
+    def test_lookalike_host_unsupported(self, url):
+        """域名以外的位置出现平台域名不算该平台"""
+        with pytest.raises(ValueError):
+            canonicalize(url)
+
+    def test_host_case_insensitive(self):
+        assert canonicalize("https://WWW.Douyin.com/video/1").video_id == "1"
+
+
+class TestExtractVideoId:
+    """测试解析器共用的视频ID提取"""
+
+    def test_extract(self):
+        url = "https://www.pearvideo.com/detail_1700000"
+        assert extract_video_id(VideoSource.LiShiPin, url) == "1700000"
+        assert extract_video_id(VideoSource.LiShiPin, "https://x/other") is None
+
+    def test_require(self):
+        assert require_video_id(VideoSource.DouPai, "https://doupai.cc/?id=1") == "1"
+        with pytest.raises(ValueError):
+            require_video_id(VideoSource.DouPai, "https://doupai.cc/?id=")
+
+    async def test_xigua_web_video_link(self, monkeypatch):
+        """网页版 /video/{id} 链接直接取ID，不请求跳转"""
+        parsed = []
+
+        async def fake_parse_video_id(self, video_id):
+            parsed.append(video_id)
+
+        monkeypatch.setattr(XiGua, "parse_video_id", fake_parse_video_id)
+        await XiGua().parse_share_url("https://www.ixigua.com/video/7123456789/")
+        assert parsed == ["7123456789"]
+
+
+class TestCanonicalKey:
+    """测试合并解析与去重用的键"""
+
+    def test_same_video_same_key(self):
+        keys = {
+            canonical_key("https://www.douyin.com/video/7424432820954598707"),
+            canonical_key(
+                "https://www.iesdouyin.com/share/video/7424432820954598707/"
+                "?region=CN&mid=1&u_code=0"
+            ),
+            canonical_key(
+                "https://www.douyin.com/jingxuan?modal_id=7424432820954598707"
+            ),
+        }
+        assert keys == {"douyin:7424432820954598707"}
+
+    def test_strip_tracking_params(self):
+        assert (
+            strip_tracking_params(
+                "https://V.Douyin.com/abc/?utm_source=x&b=2&a=1&share_token=t#top"
+            )
+            == "v.douyin.com/abc?a=1&b=2"
+        )
+
+    def test_short_link_key(self):
+        assert (
+            canonical_key("https://v.douyin.com/abc/?utm_source=copy")
+            == canonical_key("http://v.douyin.com/abc")
+            == "douyin:v.douyin.com/abc"
+        )
+
+    def test_unsupported_key(self):
+        assert canonical_key("https://example.com/a/?spm=1") == "example.com/a"
+
+    def test_lookalike_host_key(self):
+        """不支持的域名不带平台前缀，按去掉追踪参数后的链接生成键"""
+        assert canonical_key("https://www.reddit.com/r/x/?utm_source=share") == (
+            "www.reddit.com/r/x"
+        )
+        assert canonical_key("https://evil-douyin.com.example/video/1") == (
+            "evil-douyin.com.example/video/1"
+        )
+
+
+class TestDedupKey:
+    """测试批量解析的去重键"""
+
+    def test_same_video_same_key(self):
+        keys = {
+            dedup_key("看看这个 https://www.douyin.com/video/7424432820954598707 复制"),
+            dedup_key("https://www.douyin.com/jingxuan?modal_id=7424432820954598707"),
+        }
+        assert keys == {"douyin:7424432820954598707"}
+
+    def test_fallback_to_link(self):
+        assert (
+            dedup_key("看 https://v.douyin.com/abc/ 复制") == "douyin:v.douyin.com/abc"
+        )
+        assert dedup_key("不是链接") == "不是链接"
+
+
+class TestExtractUrls:
+    """测试从整段文本中提取全部分享链接"""
+
+    def test_all_supported_links_in_order(self):
+        text = (
+            "1 https://v.douyin.com/abc/ 复制此链接，"
+            "看看 https://www.bilibili.com/video/BV1xx411c7mD?p=1，"
+            "还有https://b23.tv/xyz"
+        )
+        assert extract_urls(text) == [
+            "https://v.douyin.com/abc/",
+            "https://www.bilibili.com/video/BV1xx411c7mD?p=1",
+            "https://b23.tv/xyz",
+        ]
+
+    def test_ignores_unsupported_hosts(self):
+        text = "官网 https://example.com/a 视频 https://x.com/u/status/1"
+        assert extract_urls(text) == ["https://x.com/u/status/1"]
+
+    def test_ignores_lookalike_hosts(self):
+        """只按域名匹配平台，路径、参数或域名片段中出现平台域名的链接被忽略"""
+        text = (
+            "看 https://www.reddit.com/r/x 和 https://www.dropbox.com/s/abc "
+            "https://evil-douyin.com.example/video/1 "
+            "https://example.com/?next=https://www.douyin.com/video/1 "
+            "以及 https://www.douyin.com/video/2"
+        )
+        assert extract_urls(text) == ["https://www.douyin.com/video/2"]
+
+    def test_no_links(self):
+        assert extract_urls("") == []
+        assert extract_urls("没有链接") == []
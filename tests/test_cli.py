@@ -1,10 +1,23 @@
 """CLI 模块单元测试"""
 
+import asyncio
+import io
+import json
+import os
 import re
+from unittest.mock import patch
 
+import httpx
+import pytest
 from typer.testing import CliRunner
 
-from parse_video_py.cli import app
+from parse_video_py.breaker import CircuitOpenError
+from parse_video_py.cli import _parse, _shard, app, output
+from parse_video_py.cli.checkpoint import Checkpoint
+from parse_video_py.cli.output import JsonlWriter
+from parse_video_py.deadline import DeadlineExceeded
+from parse_video_py.limiter import RateLimiterRegistry
+from parse_video_py.parser.base import VideoInfo
 
 runner = CliRunner()
 
@@ -54,3 +67,655 @@ class TestHelpOutput:
         output = _strip_ansi(result.output)
         assert "--host" in output
         assert "--port" in output
+        assert "--workers" in output
+        assert "--graceful-timeout" in output
+
+
+class TestServeCommand:
+    """测试 serve 子命令参数透传"""
+
+    @pytest.fixture(autouse=True)
+    def restore_env(self, monkeypatch):
+        # serve 通过环境变量把配置传给工作进程，测试结束后恢复
+        monkeypatch.setenv("PARSE_VIDEO_WORKERS", "1")
+
+    def test_serve_defaults_single_worker(self):
+        with patch("uvicorn.run") as mock_run:
+            result = runner.invoke(app, ["serve"], env={})
+        assert result.exit_code == 0
+        kwargs = mock_run.call_args.kwargs
+        assert kwargs["workers"] == 1
+        assert kwargs["timeout_graceful_shutdown"] == 30
+
+    def test_serve_workers_option(self):
+        with patch("uvicorn.run") as mock_run:
+            result = runner.invoke(
+                app, ["serve", "--workers", "4", "--graceful-timeout", "10"]
+            )
+        assert result.exit_code == 0
+        mock_run.assert_called_once()
+        assert mock_run.call_args.args == ("parse_video_py.web:app",)
+        assert mock_run.call_args.kwargs["workers"] == 4
+        assert mock_run.call_args.kwargs["timeout_graceful_shutdown"] == 10
+        # 工作进程据此分摊速率与并发上限
+        assert os.environ["PARSE_VIDEO_WORKERS"] == "4"
+
+    def test_serve_workers_from_env(self):
+        with patch("uvicorn.run") as mock_run:
+            result = runner.invoke(app, ["serve"], env={"PARSE_VIDEO_WORKERS": "3"})
+        assert result.exit_code == 0
+        assert mock_run.call_args.kwargs["workers"] == 3
+
+    def test_serve_rejects_zero_workers(self):
+        with patch("uvicorn.run") as mock_run:
+            result = runner.invoke(app, ["serve", "--workers", "0"])
+        assert result.exit_code != 0
+        mock_run.assert_not_called()
+
+
+@pytest.fixture
+def fake_parse(monkeypatch):
+    """mock 单条解析：链接形如 https://t.test/<延迟毫秒>，以 fail 结尾的链接解析失败"""
+    state = {"in_flight": 0, "max_in_flight": 0}
+
+    async def parse_single(url, timeout=None):
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        try:
+            await asyncio.sleep(int(url.rsplit("/", 1)[1].rstrip("fail")) / 1000)
+        finally:
+            state["in_flight"] -= 1
+        if url.endswith("fail"):
+            return None, RuntimeError("boom")
+        return VideoInfo(video_url="", cover_url="", title=url), None
+
+    monkeypatch.setattr(_parse, "_parse_single", parse_single)
+    return state
+
+
+async def _collect(urls, **kwargs):
+    return [url async for _, url, _, _ in _parse._iter_batch(urls, **kwargs)]
+
+
+class TestBatchStreaming:
+    """测试批量解析按完成顺序流式输出"""
+
+    async def test_completion_order(self, fake_parse):
+        urls = ["https://t.test/30", "https://t.test/1", "https://t.test/10"]
+        assert await _collect(urls) == [urls[1], urls[2], urls[0]]
+
+    async def test_ordered(self, fake_parse):
+        urls = ["https://t.test/30", "https://t.test/1", "https://t.test/10"]
+        assert await _collect(urls, ordered=True) == urls
+
+    async def test_in_flight_bounded(self, fake_parse):
+        urls = [f"https://t.test/{i % 5}" for i in range(50)]
+        assert len(await _collect(urls, concurrency=4, dedup=False)) == 50
+        assert fake_parse["max_in_flight"] == 4
+
+    async def test_ordered_window_bounded(self, fake_parse):
+        """最早一条很慢时，只会领先它有限条开始解析"""
+        started = []
+
+        def inputs():
+            yield "https://t.test/100"
+            for i in range(100):
+                started.append(i)
+                yield "https://t.test/0"
+
+        batch = _parse._iter_batch(inputs(), concurrency=2, ordered=True)
+        first = await batch.__anext__()
+        assert first[1] == "https://t.test/100"
+        assert len(started) <= 2 * _parse._REORDER_WINDOW_FACTOR + 1
+        await batch.aclose()
+
+    def test_cli_streams_and_reports_failures(self, fake_parse):
+        result = runner.invoke(
+            app,
+            ["parse", "https://t.test/20", "https://t.test/1fail", "--format", "json"],
+        )
+        assert result.exit_code == 0
+        assert "https://t.test/20" in result.stdout
+        assert "[失败] https://t.test/1fail" in result.stderr
+
+    def test_cli_all_failed(self, fake_parse):
+        result = runner.invoke(
+            app, ["parse", "https://t.test/1fail", "https://t.test/2fail"]
+        )
+        assert result.exit_code == 1
+
+
+class _CountingStream(io.StringIO):
+    """记录 readline 调用次数的输入流"""
+
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def readline(self, *args):
+        self.reads += 1
+        return super().readline(*args)
+
+
+class TestStreamingInput:
+    """测试逐行读取输入"""
+
+    async def test_skips_blank_lines(self):
+        stream = io.StringIO("a\n\n  b  \n\nc")
+        assert [line async for line in _parse._read_lines(stream)] == ["a", "b", "c"]
+
+    async def test_reader_bounded(self):
+        stream = _CountingStream("https://t.test/1\n" * 10000)
+        lines = _parse._read_lines(stream, buffer_size=5)
+        await lines.__anext__()
+        await asyncio.sleep(0.05)
+        assert stream.reads <= 8
+        await lines.aclose()
+
+    def test_buffer_size_follows_concurrency(self):
+        assert _parse._input_buffer_size(50) == 50 * _parse._INPUT_BUFFER_FACTOR
+        # 多进程时为各进程分到的并发数之和：50 // 4 * 4
+        assert _parse._input_buffer_size(50, 4) == 48 * _parse._INPUT_BUFFER_FACTOR
+        assert _parse._input_buffer_size(2, 4) == 4 * _parse._INPUT_BUFFER_FACTOR
+
+    def test_cli_passes_buffer_size(self, fake_parse, tmp_path):
+        path = tmp_path / "urls.txt"
+        path.write_text("https://t.test/1\n")
+        read_lines = _parse._read_lines
+        sizes = []
+
+        def spy(stream, **kwargs):
+            sizes.append(kwargs["buffer_size"])
+            return read_lines(stream, **kwargs)
+
+        with patch.object(_parse, "_read_lines", spy):
+            result = runner.invoke(app, ["parse", "-f", str(path), "-c", "30"])
+        assert result.exit_code == 0
+        assert sizes == [30 * _parse._INPUT_BUFFER_FACTOR]
+
+    async def test_follow_picks_up_appended_lines(self, tmp_path):
+        path = tmp_path / "urls.txt"
+        path.write_text("a\n")
+        with open(path, encoding="utf-8") as stream:
+            lines = _parse._read_lines(stream, follow=True, poll_interval=0.01)
+            assert await lines.__anext__() == "a"
+            with open(path, "a", encoding="utf-8") as writer:
+                writer.write("b")
+                writer.flush()
+                await asyncio.sleep(0.05)
+                writer.write("c\n")
+            assert await asyncio.wait_for(lines.__anext__(), 1) == "bc"
+            await lines.aclose()
+
+    async def test_results_emitted_while_input_stalls(self, fake_parse):
+        release = asyncio.Event()
+
+        async def inputs():
+            yield "https://t.test/1"
+            await release.wait()
+            yield "https://t.test/2"
+
+        batch = _parse._iter_batch(inputs())
+        first = await asyncio.wait_for(batch.__anext__(), 1)
+        assert first[1] == "https://t.test/1"
+        release.set()
+        assert [r[1] async for r in batch] == ["https://t.test/2"]
+
+    def test_cli_file_input(self, fake_parse, tmp_path):
+        path = tmp_path / "urls.txt"
+        path.write_text("https://t.test/5\n\nhttps://t.test/1\n")
+        result = runner.invoke(app, ["parse", "-f", str(path), "--ordered"])
+        assert result.exit_code == 0
+        assert result.stdout.index("t.test/5") < result.stdout.index("t.test/1")
+
+    def test_cli_missing_file(self, tmp_path):
+        result = runner.invoke(app, ["parse", "-f", str(tmp_path / "none.txt")])
+        assert result.exit_code == 1
+        assert "无法读取文件" in result.output
+
+    def test_cli_follow_requires_file(self):
+        result = runner.invoke(app, ["parse", "https://t.test/1", "--follow"])
+        assert result.exit_code == 1
+
+
+class TestAllLinks:
+    """测试 --all-links 从整段文本中提取全部分享链接"""
+
+    _TEXT = (
+        "第一条 https://www.douyin.com/video/2 复制，"
+        "第二条 https://x.com/u/status/1 打开，无关 https://example.com/3"
+    )
+
+    def test_cli_args_text(self, fake_parse):
+        result = runner.invoke(app, ["parse", self._TEXT, "--all-links", "--ordered"])
+        assert result.exit_code == 0
+        assert result.stdout.index("douyin.com/video/2") < result.stdout.index(
+            "x.com/u/status/1"
+        )
+        assert "example.com" not in result.stdout
+
+    def test_cli_file_text(self, fake_parse, tmp_path):
+        path = tmp_path / "chat.txt"
+        path.write_text(f"{self._TEXT}\n没有链接的一行\n")
+        result = runner.invoke(
+            app, ["parse", "-f", str(path), "--all-links", "--format", "jsonl"]
+        )
+        assert result.exit_code == 0
+        urls = [json.loads(line)["url"] for line in result.stdout.splitlines()]
+        assert sorted(urls) == [
+            "https://www.douyin.com/video/2",
+            "https://x.com/u/status/1",
+        ]
+
+    def test_cli_no_links(self):
+        result = runner.invoke(app, ["parse", "没有链接", "--all-links"])
+        assert result.exit_code == 1
+        assert "未检测到有效的分享链接" in result.output
+
+
+class TestJsonlOutput:
+    """测试 JSONL 输出"""
+
+    def test_records_one_line_each(self, fake_parse):
+        result = runner.invoke(
+            app,
+            [
+                "parse",
+                "https://t.test/5",
+                "https://t.test/1fail",
+                "--format",
+                "jsonl",
+                "--ordered",
+            ],
+        )
+        assert result.exit_code == 0
+        lines = result.stdout.splitlines()
+        assert len(lines) == 2
+        records = [json.loads(line) for line in lines]
+        assert records[0]["code"] == 200
+        assert records[0]["data"]["title"] == "https://t.test/5"
+        assert records[1] == {
+            "index": 1,
+            "url": "https://t.test/1fail",
+            "code": 500,
+            "msg": "boom",
+            "error_type": "RuntimeError",
+        }
+
+    def test_single_failure(self, fake_parse):
+        result = runner.invoke(
+            app, ["parse", "https://t.test/1fail", "--format", "jsonl"]
+        )
+        assert result.exit_code == 1
+        assert json.loads(result.stdout)["error_type"] == "RuntimeError"
+
+    def test_error_codes(self):
+        record = output.build_jsonl_record(0, "u", None, DeadlineExceeded())
+        assert (record["code"], record["error_type"]) == (504, "DeadlineExceeded")
+
+    async def test_missing_url_record(self):
+        _, err = await _parse._parse_single("not a url")
+        record = output.build_jsonl_record(0, "not a url", None, err)
+        assert (record["code"], record["error_type"]) == (400, "ValueError")
+
+    def test_stdlib_fallback_matches(self, monkeypatch):
+        data = {"title": "标题", "n": 1, "images": []}
+        fast = output.dumps_compact(data)
+        monkeypatch.setattr(output, "orjson", None)
+        assert output.dumps_compact(data) == fast
+
+    async def test_buffered_until_interval(self):
+        stream = io.BytesIO()
+        writer = JsonlWriter(stream, flush_interval=0.02)
+        writer.write(0, "u", VideoInfo(video_url="", cover_url=""))
+        assert stream.getvalue() == b""
+        await asyncio.sleep(0.05)
+        assert stream.getvalue().count(b"\n") == 1
+
+    async def test_flush_when_buffer_full(self):
+        stream = io.BytesIO()
+        writer = JsonlWriter(stream, buffer_size=10, flush_interval=10)
+        writer.write(0, "u", VideoInfo(video_url="", cover_url=""))
+        assert stream.getvalue().endswith(b"\n")
+
+
+class TestBatchScheduler:
+    """测试批量解析的总并发与单平台并发"""
+
+    @pytest.fixture
+    def per_platform(self, monkeypatch):
+        state = {"in_flight": {}, "max_in_flight": {}}
+
+        async def parse_single(url, timeout=None):
+            host = url.split("/")[2]
+            current = state["in_flight"].get(host, 0) + 1
+            state["in_flight"][host] = current
+            state["max_in_flight"][host] = max(
+                state["max_in_flight"].get(host, 0), current
+            )
+            try:
+                await asyncio.sleep(0.005)
+            finally:
+                state["in_flight"][host] -= 1
+            return VideoInfo(video_url="", cover_url="", title=url), None
+
+        monkeypatch.setattr(_parse, "_parse_single", parse_single)
+        return state["max_in_flight"]
+
+    async def test_platform_limits(self, per_platform):
+        urls = []
+        for i in range(30):
+            urls += [
+                f"https://v.douyin.com/{i}",
+                f"https://tv.sohu.com/v/{i}",
+                f"http://xhslink.com/{i}",
+            ]
+        limits = {"douyin": 2, "sohu": 1}
+        results = await _collect(urls, concurrency=8, platform_limits=limits)
+        assert len(results) == 90
+        assert per_platform["v.douyin.com"] == 2
+        assert per_platform["tv.sohu.com"] == 1
+        # 未单独限制的平台可以用满剩余的总并发
+        assert per_platform["xhslink.com"] > 2
+
+    async def test_total_concurrency_with_platform_limits(self, fake_parse):
+        urls = [f"https://t.test/{i % 3}" for i in range(40)]
+        results = await _collect(
+            urls, concurrency=3, platform_limits={"douyin": 1}, dedup=False
+        )
+        assert len(results) == 40
+        assert fake_parse["max_in_flight"] == 3
+
+    def test_parse_platform_limits(self):
+        assert _parse._parse_platform_limits(["DouYin=3", "sohu=1"]) == {
+            "douyin": 3,
+            "sohu": 1,
+        }
+        for spec in ("youku=3", "douyin", "douyin=0", "douyin=x"):
+            with pytest.raises(ValueError):
+                _parse._parse_platform_limits([spec])
+
+    def test_cli_invalid_platform_spec(self):
+        result = runner.invoke(
+            app, ["parse", "https://t.test/1", "--per-platform-concurrency", "x=1"]
+        )
+        assert result.exit_code == 1
+        assert "无效的平台并发配置" in result.output
+
+    def test_cli_rate_configures_limiter(self, fake_parse, monkeypatch):
+        registry = RateLimiterRegistry()
+        monkeypatch.setattr(_parse, "rate_limiters", registry)
+        result = runner.invoke(
+            app,
+            ["parse", "https://t.test/1", "https://t.test/2", "--rate", "sohu=5/s"],
+        )
+        assert result.exit_code == 0
+        assert registry.get("sohu", "tv.sohu.com").rate == 5
+
+    def test_cli_invalid_rate(self):
+        result = runner.invoke(app, ["parse", "https://t.test/1", "--rate", "sohu=x"])
+        assert result.exit_code == 1
+        assert "无效的速率配置" in result.output
+
+
+class TestCheckpoint:
+    """测试可恢复的检查点"""
+
+    def _records(self, path):
+        return [json.loads(line) for line in path.read_text().splitlines()]
+
+    def test_load_done_and_retry_failures(self, tmp_path):
+        path = tmp_path / "ckpt.jsonl"
+        path.write_text(
+            '{"index":0,"url":"a","code":200}\n'
+            '{"index":1,"url":"b","code":504}\n'
+            '{"index":2,"url":"c","code":400}\n'
+            '{"index":3,"url":"d","co'
+        )
+        checkpoint = Checkpoint(str(path))
+        assert checkpoint.load() == 2
+        assert checkpoint.is_done(0, "a") and checkpoint.is_done(2, "c")
+        assert not checkpoint.is_done(1, "b")
+        # 输入改动过的条目重新解析
+        assert not checkpoint.is_done(0, "changed")
+
+    def test_append_after_truncated_line(self, tmp_path):
+        path = tmp_path / "ckpt.jsonl"
+        path.write_text('{"index":0,"url":"a","code":200}\n{"ind')
+        checkpoint = Checkpoint(str(path))
+        checkpoint.open()
+        checkpoint.record(1, "b", None, RuntimeError("boom"))
+        checkpoint.close()
+        assert path.read_text().splitlines()[-1].startswith('{"index":1,')
+
+    def test_resume_skips_completed(self, fake_parse, tmp_path):
+        urls = tmp_path / "urls.txt"
+        urls.write_text("https://t.test/1\nhttps://t.test/2fail\n\nhttps://t.test/3\n")
+        ckpt = tmp_path / "ckpt.jsonl"
+        args = ["parse", "-f", str(urls), "--checkpoint", str(ckpt), "--ordered"]
+
+        first = runner.invoke(app, args + ["--format", "jsonl"])
+        assert first.exit_code == 0
+        assert [r["index"] for r in self._records(ckpt)] == [0, 1, 2]
+
+        second = runner.invoke(app, args + ["--format", "jsonl"])
+        assert second.exit_code == 1
+        assert "已完成 2 条" in second.stderr
+        # 只重新解析上次失败的一条，序号仍是它在输入中的位置
+        assert [json.loads(line)["index"] for line in second.stdout.splitlines()] == [1]
+        assert len(self._records(ckpt)) == 4
+
+    def test_interrupt_keeps_progress(self, monkeypatch, tmp_path):
+        async def parse_single(url, timeout=None):
+            if url.endswith("stop"):
+                await asyncio.sleep(0.05)
+                raise KeyboardInterrupt
+            return VideoInfo(video_url="", cover_url="", title=url), None
+
+        monkeypatch.setattr(_parse, "_parse_single", parse_single)
+        urls = tmp_path / "urls.txt"
+        urls.write_text("https://t.test/a\nhttps://t.test/stop\nhttps://t.test/b\n")
+        ckpt = tmp_path / "ckpt.jsonl"
+        result = runner.invoke(
+            app, ["parse", "-f", str(urls), "--checkpoint", str(ckpt)]
+        )
+        assert result.exit_code == 130
+        assert "进度已保存" in result.stderr
+        done = {r["url"] for r in self._records(ckpt)}
+        assert done == {"https://t.test/a", "https://t.test/b"}
+
+    def test_requires_file(self, tmp_path):
+        result = runner.invoke(
+            app,
+            ["parse", "https://t.test/1", "--checkpoint", str(tmp_path / "c")],
+        )
+        assert result.exit_code == 1
+
+
+async def _fake_parse_in_worker(url, timeout=None):
+    await asyncio.sleep(int(url.rsplit("/", 1)[1].rstrip("fail")) / 1000)
+    if url.endswith("fail"):
+        return None, RuntimeError("boom")
+    return VideoInfo(video_url="", cover_url="", title=url), None
+
+
+def _install_fake_parse():
+    """工作进程初始化：替换单条解析，不访问网络"""
+    _parse._parse_single = _fake_parse_in_worker
+
+
+async def _fake_error_parse(url, timeout=None):
+    if url.endswith("open"):
+        return None, CircuitOpenError("douyin", 30)
+    if url.endswith("slow"):
+        return None, DeadlineExceeded()
+    return None, httpx.HTTPStatusError(
+        "server error",
+        request=httpx.Request("GET", url),
+        response=httpx.Response(502),
+    )
+
+
+def _install_fake_error_parse():
+    """工作进程初始化：按链接返回熔断、超时或 HTTP 错误"""
+    _parse._parse_single = _fake_error_parse
+
+
+class TestShardedBatch:
+    """测试多进程分片批量解析"""
+
+    async def _collect(self, urls, **kwargs):
+        results = _shard.iter_sharded(
+            urls, 2, concurrency=4, initializer=_install_fake_parse, **kwargs
+        )
+        return [result async for result in results]
+
+    async def test_ordered_merge(self):
+        urls = [f"https://t.test/{(i * 7) % 20}" for i in range(30)]
+        urls[3] += "fail"
+        results = await self._collect(urls, ordered=True)
+        assert [index for index, *_ in results] == list(range(30))
+        assert all(info.title == url for _, url, info, err in results if not err)
+        assert str(results[3][3]) == "boom"
+
+    async def test_ordered_window_bounds_reorder(self):
+        """第一条很慢时，分发量受重排窗口限制，不会读完整个输入"""
+        read = 0
+
+        def inputs():
+            nonlocal read
+            yield "https://t.test/slow/500"
+            for i in range(200):
+                read += 1
+                yield f"https://t.test/{i}/0"
+
+        results = _shard.iter_sharded(
+            inputs(), 2, concurrency=4, ordered=True, initializer=_install_fake_parse
+        )
+        first = await anext(results)
+        read_before_first = read
+        rest = [result async for result in results]
+        assert first[0] == 0
+        # 每个进程并发 2，窗口为 2 * 2 * _REORDER_WINDOW_FACTOR
+        assert read_before_first <= 4 * _parse._REORDER_WINDOW_FACTOR
+        assert [index for index, *_ in rest] == list(range(1, 201))
+
+    async def test_unordered_with_skip(self):
+        urls = [f"https://t.test/{i % 5}" for i in range(20)]
+        results = await self._collect(urls, skip=lambda index, url: index % 2 == 0)
+        assert sorted(index for index, *_ in results) == list(range(1, 20, 2))
+        assert all(urls[index] == url for index, url, _, _ in results)
+
+    def test_duplicates_same_shard(self):
+        link = "https://v.douyin.com/abc/"
+        assert _shard.shard_of(f"看看 {link} 复制此链接", 8) == _shard.shard_of(link, 8)
+
+    def test_split_limits(self):
+        assert _shard.split_limits(4, 10, {"douyin": 3}, [("sohu", 2.0)]) == (
+            2,
+            {"douyin": 1},
+            [("sohu", 0.5)],
+        )
+
+    async def test_errors_match_single_process(self, monkeypatch):
+        """多进程与单进程输出的失败记录相同（状态码、消息、错误类型）"""
+        urls = ["https://t.test/open", "https://t.test/slow", "https://t.test/bad"]
+        monkeypatch.setattr(_parse, "_parse_single", _fake_error_parse)
+        single = [
+            output.build_jsonl_record(*result)
+            async for result in _parse._iter_batch(urls, ordered=True)
+        ]
+        sharded = [
+            output.build_jsonl_record(*result)
+            async for result in _shard.iter_sharded(
+                urls, 2, ordered=True, initializer=_install_fake_error_parse
+            )
+        ]
+        assert sharded == single
+        assert [(r["code"], r["error_type"]) for r in sharded] == [
+            (503, "CircuitOpenError"),
+            (504, "DeadlineExceeded"),
+            (500, "HTTPStatusError"),
+        ]
+
+    def test_cli_workers(self, tmp_path):
+        urls = tmp_path / "urls.txt"
+        urls.write_text("not a url\nhttps://example.com/x\n")
+        result = runner.invoke(
+            app, ["parse", "-f", str(urls), "-w", "2", "--format", "jsonl", "--ordered"]
+        )
+        assert result.exit_code == 1
+        records = [json.loads(line) for line in result.stdout.splitlines()]
+        assert [(r["index"], r["code"]) for r in records] == [(0, 400), (1, 500)]
+
+
+class TestDedup:
+    """测试批量解析按视频去重"""
+
+    @pytest.fixture
+    def counting(self, monkeypatch):
+        calls = []
+
+        async def parse_single(url, timeout=None):
+            calls.append(url)
+            await asyncio.sleep(0.01)
+            return VideoInfo(video_url="", cover_url="", title=url), None
+
+        monkeypatch.setattr(_parse, "_parse_single", parse_single)
+        return calls
+
+    _urls = [
+        "https://www.douyin.com/video/7424432820954598707",
+        "https://www.bilibili.com/video/BV1xx411c7mD",
+        "分享 https://www.douyin.com/jingxuan?modal_id=7424432820954598707",
+        "https://www.iesdouyin.com/share/video/7424432820954598707/",
+    ]
+
+    @pytest.mark.parametrize("ordered", [False, True])
+    async def test_parse_once_fan_out(self, counting, ordered):
+        results = [
+            result async for result in _parse._iter_batch(self._urls, ordered=ordered)
+        ]
+        assert len(counting) == 2
+        assert sorted((index, url) for index, url, _, _ in results) == list(
+            enumerate(self._urls)
+        )
+        if ordered:
+            assert [index for index, *_ in results] == [0, 1, 2, 3]
+
+    async def test_duplicates_of_slow_link_bounded(self, monkeypatch):
+        """慢链接的大量重复条目不会让读取越过上限、把整个输入读进内存"""
+        read = 0
+        read_when_parsed = []
+
+        async def parse_single(url, timeout=None):
+            await asyncio.sleep(0.1)
+            read_when_parsed.append(read)
+            return VideoInfo(video_url="", cover_url="", title=url), None
+
+        def inputs():
+            nonlocal read
+            for _ in range(10000):
+                read += 1
+                yield self._urls[0]
+
+        monkeypatch.setattr(_parse, "_parse_single", parse_single)
+        results = [result async for result in _parse._iter_batch(inputs())]
+        assert len(results) == 10000
+        limit = _parse._CONCURRENCY_LIMIT * _parse._REORDER_WINDOW_FACTOR
+        assert read_when_parsed[0] <= limit + 2
+
+    async def test_cached_after_completion(self, counting):
+        """前一条已完成后才出现的重复链接直接复用结果"""
+
+        async def slow_inputs():
+            yield self._urls[0]
+            await asyncio.sleep(0.05)
+            yield self._urls[2]
+
+        results = [result async for result in _parse._iter_batch(slow_inputs())]
+        assert len(counting) == 1 and len(results) == 2
+
+    async def test_disabled(self, counting):
+        results = [r async for r in _parse._iter_batch(self._urls, dedup=False)]
+        assert len(counting) == len(results) == 4
@@ -0,0 +1,137 @@
+import asyncio
+
+import httpx
+import pytest
+
+from parse_video_py import parse_video_share_url
+from parse_video_py.deadline import (
+    DeadlineExceeded,
+    check_deadline,
+    deadline_scope,
+    remaining_budget,
+    run_with_deadline,
+)
+from parse_video_py.parser.douyin import DouYin
+from parse_video_py.utils import create_async_client
+
+
+class TestDeadlineScope:
+    """测试截止时间上下文"""
+
+    def test_no_deadline_by_default(self):
+        assert remaining_budget() is None
+        assert check_deadline() is None
+
+    def test_scope_sets_and_resets(self):
+        with deadline_scope(5):
+            budget = remaining_budget()
+            assert 4.9 < budget <= 5
+        assert remaining_budget() is None
+
+    def test_none_timeout_keeps_outer_deadline(self):
+        with deadline_scope(5):
+            with deadline_scope(None):
+                assert remaining_budget() is not None
+
+    def test_nested_scope_cannot_extend_budget(self):
+        with deadline_scope(1):
+            with deadline_scope(100):
+                assert remaining_budget() <= 1
+
+    def test_check_deadline_raises_when_exhausted(self):
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                check_deadline()
+
+    async def test_run_with_deadline_times_out(self):
+        with deadline_scope(0.01):
+            with pytest.raises(DeadlineExceeded):
+                await run_with_deadline(asyncio.sleep(1))
+
+    async def test_run_with_deadline_passes_result(self):
+        async def work():
+            return "ok"
+
+        with deadline_scope(1):
+            assert await run_with_deadline(work()) == "ok"
+
+    async def test_deadline_propagates_into_tasks(self):
+        async def read_budget():
+            return remaining_budget()
+
+        with deadline_scope(3):
+            budget = await asyncio.create_task(read_budget())
+        assert budget is not None and budget <= 3
+
+
+class TestParseClientDeadline:
+    """测试统一客户端按剩余预算收紧超时"""
+
+    async def test_fail_fast_when_budget_exhausted(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200)
+
+        async with create_async_client(
+            transport=httpx.MockTransport(handler)
+        ) as client:
+            with deadline_scope(0):
+                with pytest.raises(DeadlineExceeded):
+                    await client.get("https://example.com/")
+        assert requests == []
+
+    async def test_request_timeout_clamped_to_budget(self):
+        seen = {}
+
+        def handler(request):
+            seen.update(request.extensions["timeout"])
+            return httpx.Response(200)
+
+        async with create_async_client(
+            transport=httpx.MockTransport(handler), timeout=30
+        ) as client:
+            with deadline_scope(2):
+                await client.get("https://example.com/")
+        assert all(0 < value <= 2 for value in seen.values())
+
+    async def test_no_deadline_keeps_client_timeout(self):
+        seen = {}
+
+        def handler(request):
+            seen.update(request.extensions["timeout"])
+            return httpx.Response(200)
+
+        async with create_async_client(
+            transport=httpx.MockTransport(handler), timeout=30
+        ) as client:
+            await client.get("https://example.com/")
+        assert seen["read"] == 30
+
+
+class TestParseTimeout:
+    """测试整次解析的超时"""
+
+    async def test_parse_share_url_timeout(self, monkeypatch):
+        async def slow_parse(self, share_url):
+            await asyncio.sleep(1)
+
+        monkeypatch.setattr(DouYin, "parse_share_url", slow_parse)
+        with pytest.raises(DeadlineExceeded):
+            await parse_video_share_url("https://v.douyin.com/abc", timeout=0.01)
+
+    async def test_multi_step_parser_shares_one_budget(self, monkeypatch):
+        """多步请求共享同一预算：第二步开始前预算已耗尽则直接失败"""
+        steps = []
+
+        async def two_step_parse(self, share_url):
+            steps.append(remaining_budget())
+            await asyncio.sleep(0.05)
+            steps.append(remaining_budget())
+            check_deadline()
+
+        monkeypatch.setattr(DouYin, "parse_share_url", two_step_parse)
+        with pytest.raises(DeadlineExceeded):
+            await parse_video_share_url("https://v.douyin.com/abc", timeout=0.02)
+        assert steps[0] <= 0.02
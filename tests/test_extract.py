@@ -0,0 +1,134 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from parse_video_py import extract
+from parse_video_py.extract import ExtractionExecutor, LoopLagMonitor
+from parse_video_py.metrics import metrics
+from parse_video_py.parser.lvzhou import LvZhou
+from parse_video_py.parser.lvzhou import _extract_page as lvzhou_extract_page
+from parse_video_py.parser.redbook import RedBook
+
+
+def _thread_name(payload: str) -> str:
+    return threading.current_thread().name
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+class TestExtractionExecutor:
+    """测试提取执行器"""
+
+    async def test_small_payload_inline(self):
+        executor = ExtractionExecutor(threshold=100)
+        assert await executor.run(_thread_name, "x") == threading.current_thread().name
+        assert metrics.get("extraction_inline_total", "unknown") == 1
+        executor.shutdown()
+
+    async def test_large_payload_offloaded(self):
+        executor = ExtractionExecutor(threshold=100)
+        name = await executor.run(_thread_name, "x" * 100)
+        assert name.startswith("parse-video-extract")
+        assert metrics.get("extraction_offloaded_total", "unknown") == 1
+        executor.shutdown()
+
+    async def test_threshold_override(self):
+        executor = ExtractionExecutor(threshold=100)
+        name = await executor.run(_thread_name, "x", threshold=0)
+        assert name.startswith("parse-video-extract")
+        executor.shutdown()
+
+    async def test_exception_propagates(self):
+        executor = ExtractionExecutor(threshold=0)
+        with pytest.raises(json.JSONDecodeError):
+            await executor.run(json.loads, "{bad")
+        executor.shutdown()
+
+    async def test_process_pool(self):
+        executor = ExtractionExecutor(threshold=0, max_workers=1, kind="process")
+        assert await executor.run(json.loads, '{"a": 1}') == {"a": 1}
+        executor.shutdown()
+
+    def test_invalid_kind(self):
+        with pytest.raises(ValueError):
+            ExtractionExecutor(kind="fiber")
+
+    async def test_offload_keeps_loop_responsive(self):
+        """大内容在线程池中解析时，事件循环上的其他任务可以继续执行"""
+        executor = ExtractionExecutor(threshold=0)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+
+        def slow_parse(payload):
+            time.sleep(0.2)
+            return payload
+
+        await asyncio.gather(executor.run(slow_parse, "x"), ticker())
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.15
+        executor.shutdown()
+
+
+class TestParserExtract:
+    """测试解析器使用提取执行器"""
+
+    async def test_per_parser_threshold(self, monkeypatch):
+        executor = ExtractionExecutor(threshold=10**9)
+        monkeypatch.setattr("parse_video_py.parser.base.extraction_executor", executor)
+        assert RedBook.extract_threshold < executor.threshold
+        name = await RedBook().extract(_thread_name, "x" * RedBook.extract_threshold)
+        assert name.startswith("parse-video-extract")
+        assert await LvZhou().extract(_thread_name, "x" * 1000) == (
+            threading.current_thread().name
+        )
+        executor.shutdown()
+
+    def test_lvzhou_extract_page(self):
+        html = (
+            '<video src="https://v.test/1.mp4"></video>'
+            '<div class="video-cover" '
+            'style="background-image:url(https://c.test/1.jpg)">'
+            '</div><div class="status-title">标题</div><div class="nickname">作者</div>'
+        )
+        info = lvzhou_extract_page(html)
+        assert info.video_url == "https://v.test/1.mp4"
+        assert info.cover_url == "https://c.test/1.jpg"
+        assert (info.title, info.author.name) == ("标题", "作者")
+
+
+class TestLoopLagMonitor:
+    """测试事件循环延迟监控"""
+
+    def test_record(self):
+        monitor = LoopLagMonitor(slow_threshold=0.1)
+        monitor.record(0.05)
+        monitor.record(0.2)
+        monitor.record(-0.001)
+        assert metrics.get("event_loop_lag_seconds") == 0
+        assert metrics.get("event_loop_lag_max_seconds") == 0.2
+        assert metrics.get("event_loop_lag_samples_total") == 3
+        assert metrics.get("event_loop_lag_slow_total") == 1
+
+    async def test_detects_blocking(self):
+        monitor = LoopLagMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.02)
+        time.sleep(0.15)
+        await asyncio.sleep(0.02)
+        await monitor.aclose()
+        assert monitor.max_lag >= 0.1
+
+
+def test_global_executor_from_env():
+    assert extract.extraction_executor.kind in ("thread", "process")
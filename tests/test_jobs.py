@@ -0,0 +1,265 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+
+from parse_video_py import jobs, web
+from parse_video_py.jobs import JobManager, JobStatus
+from parse_video_py.parser.base import VideoInfo
+
+
+@pytest.fixture
+def mock_parse(monkeypatch):
+    """mock 解析函数：链接中带 fail 的解析失败，其余返回标题为链接的结果"""
+    calls = []
+
+    async def fake_parse(share_url, timeout=None):
+        calls.append(share_url)
+        await asyncio.sleep(0)
+        if "fail" in share_url:
+            raise Exception("mock parse error")
+        return VideoInfo(video_url=share_url, cover_url="", title=share_url)
+
+    monkeypatch.setattr(jobs, "parse_video_share_url", fake_parse)
+    return calls
+
+
+async def _wait_done(manager: JobManager, job_id: str):
+    for _ in range(200):
+        job = manager.get(job_id)
+        if job.status == JobStatus.Done and job_id not in manager._tasks:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job not finished")
+
+
+class TestJobManager:
+    """测试任务管理器"""
+
+    async def test_submit_and_finish(self, tmp_path, mock_parse):
+        manager = JobManager(tmp_path)
+        urls = [f"https://v.douyin.com/{i}" for i in range(5)] + [
+            "https://v.douyin.com/fail",
+            "不是链接",
+        ]
+        job = await manager.submit(urls, concurrency=3)
+        job = await _wait_done(manager, job.job_id)
+
+        assert job.total == 7
+        assert job.completed == 7
+        assert job.succeeded == 5
+        assert job.failed == 2
+
+        results = manager.read_results(job.job_id, 0, 100)
+        assert sorted(r["index"] for r in results) == list(range(7))
+        codes = {r["url"]: r["code"] for r in results}
+        assert codes["https://v.douyin.com/fail"] == 500
+        assert codes["不是链接"] == 400
+
+    async def test_duplicates_parsed_once(self, tmp_path, mock_parse):
+        """同一视频的不同链接只解析一次，结果按各自的下标和链接写入"""
+        manager = JobManager(tmp_path)
+        urls = [
+            "https://www.douyin.com/video/7424432820954598707",
+            "https://www.iesdouyin.com/share/video/7424432820954598707/?region=CN",
+            "https://www.douyin.com/jingxuan?modal_id=7424432820954598707",
+            "https://www.douyin.com/video/7424432820954598707",
+        ]
+        job = await manager.submit(urls, concurrency=4)
+        job = await _wait_done(manager, job.job_id)
+
+        assert len(mock_parse) == 1
+        assert (job.completed, job.succeeded) == (4, 4)
+        results = manager.read_results(job.job_id, 0, 100)
+        assert sorted((r["index"], r["url"]) for r in results) == list(enumerate(urls))
+        assert len({r["data"]["title"] for r in results}) == 1
+
+    async def test_dedup_cache_bounded(self, tmp_path, mock_parse, monkeypatch):
+        """结果缓存有上限，被淘汰的视频再次出现时重新解析"""
+        monkeypatch.setattr(jobs, "_DEDUP_CACHE_SIZE", 1)
+        manager = JobManager(tmp_path)
+        a = "https://www.douyin.com/video/1"
+        b = "https://www.douyin.com/video/2"
+        job = await manager.submit([a, a, b, a], concurrency=1)
+        job = await _wait_done(manager, job.job_id)
+
+        assert mock_parse == [a, b, a]
+        assert (job.completed, job.succeeded) == (4, 4)
+
+    async def test_dedup_waiting_bounded(self, tmp_path, mock_parse, monkeypatch):
+        """等待下标超过上限时 worker 自己等待解析中的结果，仍只解析一次"""
+        monkeypatch.setattr(jobs, "_DEDUP_WAITING_SIZE", 1)
+        manager = JobManager(tmp_path)
+        urls = ["https://www.douyin.com/video/1"] * 5
+        job = await manager.submit(urls, concurrency=2)
+        job = await _wait_done(manager, job.job_id)
+
+        assert len(mock_parse) == 1
+        assert (job.completed, job.succeeded) == (5, 5)
+        results = manager.read_results(job.job_id, 0, 100)
+        assert sorted(r["index"] for r in results) == list(range(5))
+
+    async def test_read_results_paging(self, tmp_path, mock_parse):
+        manager = JobManager(tmp_path)
+        urls = [f"https://v.douyin.com/{i}" for i in range(10)]
+        job = await manager.submit(urls, concurrency=2)
+        await _wait_done(manager, job.job_id)
+
+        page1 = manager.read_results(job.job_id, 0, 4)
+        page2 = manager.read_results(job.job_id, 4, 4)
+        page3 = manager.read_results(job.job_id, 8, 4)
+        assert len(page1) == 4 and len(page2) == 4 and len(page3) == 2
+        indices = [r["index"] for r in page1 + page2 + page3]
+        assert sorted(indices) == list(range(10))
+
+    async def test_get_from_disk_by_other_manager(self, tmp_path, mock_parse):
+        """其他进程（另一个管理器实例）可以通过磁盘查询任务"""
+        manager = JobManager(tmp_path)
+        job = await manager.submit(["https://v.douyin.com/1"])
+        await _wait_done(manager, job.job_id)
+
+        other = JobManager(tmp_path)
+        loaded = other.get(job.job_id)
+        assert loaded.status == JobStatus.Done
+        assert loaded.succeeded == 1
+
+    async def test_get_rejects_invalid_job_id(self, tmp_path):
+        manager = JobManager(tmp_path)
+        assert manager.get("../etc") is None
+        assert manager.get("0" * 32) is None
+
+    async def test_resume_skips_finished_items(self, tmp_path, mock_parse):
+        """重启后只解析未完成的条目，并修复写了一半的尾行"""
+        manager = JobManager(tmp_path)
+        urls = [f"https://v.douyin.com/{i}" for i in range(4)]
+        job = await manager.submit(urls)
+        await _wait_done(manager, job.job_id)
+
+        # 模拟崩溃：只保留前两条结果、尾部残留半行，状态停在 running
+        job_dir = tmp_path / job.job_id
+        lines = (job_dir / "results.jsonl").read_text(encoding="utf-8").splitlines()
+        kept = lines[:2]
+        (job_dir / "results.jsonl").write_text(
+            "\n".join(kept) + '\n{"index": 9', encoding="utf-8"
+        )
+        meta = json.loads((job_dir / "meta.json").read_text(encoding="utf-8"))
+        meta["status"] = "running"
+        (job_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        mock_parse.clear()
+
+        restarted = JobManager(tmp_path)
+        assert restarted.resume() == 1
+        job = await _wait_done(restarted, job.job_id)
+
+        kept_indices = {json.loads(line)["index"] for line in kept}
+        assert len(mock_parse) == 2
+        assert {urls.index(u) for u in mock_parse}.isdisjoint(kept_indices)
+        assert job.completed == 4
+        results = restarted.read_results(job.job_id, 0, 100)
+        assert sorted(r["index"] for r in results) == [0, 1, 2, 3]
+
+    async def test_resume_ignores_done_jobs(self, tmp_path, mock_parse):
+        manager = JobManager(tmp_path)
+        job = await manager.submit(["https://v.douyin.com/1"])
+        await _wait_done(manager, job.job_id)
+
+        assert JobManager(tmp_path).resume() == 0
+
+    async def test_webhook_called_on_completion(self, tmp_path, mock_parse):
+        """任务完成后回调本地 HTTP 服务"""
+        received = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers["Content-Length"])
+                received.append(json.loads(self.rfile.read(length)))
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            webhook_url = f"http://127.0.0.1:{server.server_port}/hook"
+            manager = JobManager(tmp_path)
+            job = await manager.submit(
+                ["https://v.douyin.com/1", "https://v.douyin.com/fail"],
+                webhook_url=webhook_url,
+            )
+            job = await _wait_done(manager, job.job_id)
+        finally:
+            server.shutdown()
+
+        assert job.webhook_delivered is True
+        assert received == [
+            {
+                "job_id": job.job_id,
+                "status": "done",
+                "total": 2,
+                "succeeded": 1,
+                "failed": 1,
+            }
+        ]
+
+    async def test_webhook_failure_does_not_fail_job(self, tmp_path, mock_parse):
+        manager = JobManager(tmp_path, webhook_timeout=1)
+        job = await manager.submit(
+            ["https://v.douyin.com/1"], webhook_url="http://127.0.0.1:1/hook"
+        )
+        job = await _wait_done(manager, job.job_id)
+
+        assert job.status == JobStatus.Done
+        assert job.webhook_delivered is False
+
+
+class TestJobRoutes:
+    """测试任务相关接口"""
+
+    def test_create_and_query_job(self, tmp_path, mock_parse, monkeypatch):
+        monkeypatch.setattr(web, "job_manager", JobManager(tmp_path))
+        with TestClient(web.app) as client:
+            response = client.post(
+                "/jobs", json={"urls": ["https://v.douyin.com/1"], "concurrency": 2}
+            )
+            body = response.json()
+            assert body["code"] == 200
+            job_id = body["data"]["job_id"]
+
+            for _ in range(100):
+                detail = client.get(f"/jobs/{job_id}").json()
+                if detail["data"]["status"] == "done":
+                    break
+            assert detail["data"]["completed"] == 1
+            assert detail["data"]["results"][0]["code"] == 200
+
+    def test_create_job_rejects_empty_urls(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(web, "job_manager", JobManager(tmp_path))
+        with TestClient(web.app) as client:
+            response = client.post("/jobs", json={"urls": []})
+        assert response.json() == {"code": 400, "msg": "urls 不能为空"}
+
+    def test_create_job_from_text(self, tmp_path, mock_parse, monkeypatch):
+        manager = JobManager(tmp_path)
+        monkeypatch.setattr(web, "job_manager", manager)
+        text = (
+            "第一条 https://v.douyin.com/1/ 复制，第二条 https://v.douyin.com/2/ 打开"
+        )
+        with TestClient(web.app) as client:
+            body = client.post("/jobs", json={"text": text}).json()
+            assert body["code"] == 200
+            assert body["data"]["total"] == 2
+
+            empty = client.post("/jobs", json={"text": "没有链接"}).json()
+        assert empty == {"code": 400, "msg": "未检测到有效的分享链接"}
+
+    def test_query_unknown_job(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(web, "job_manager", JobManager(tmp_path))
+        with TestClient(web.app) as client:
+            response = client.get(f"/jobs/{'0' * 32}")
+        assert response.json() == {"code": 404, "msg": "任务不存在"}
@@ -1,5 +1,9 @@
+import asyncio
+
 from fastapi.testclient import TestClient
 
+from parse_video_py import web
+from parse_video_py.parser.base import VideoInfo
 from parse_video_py.web import app
 
 client = TestClient(app)
@@ -32,3 +36,92 @@ def test_share_url_parse_returns_422_when_url_param_missing():
     response = client.get("/video/share/url/parse")
 
     assert response.status_code == 422
+
+
+class _FakeRequest:
+    """模拟 ASGI 请求：disconnect_after 秒后收到 http.disconnect"""
+
+    def __init__(self, disconnect_after: float | None):
+        self.disconnect_after = disconnect_after
+        self._sent_body = False
+
+    async def receive(self):
+        if not self._sent_body:
+            self._sent_body = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        if self.disconnect_after is None:
+            await asyncio.Event().wait()
+        await asyncio.sleep(self.disconnect_after)
+        return {"type": "http.disconnect"}
+
+
+async def test_disconnect_cancels_upstream_parse(monkeypatch):
+    cancelled = asyncio.Event()
+
+    async def slow_parse(share_url, timeout=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    monkeypatch.setattr(web, "parse_video_share_url", slow_parse)
+
+    result = await web.share_url_parse(
+        _FakeRequest(disconnect_after=0.01), "https://v.douyin.com/abc"
+    )
+
+    assert result == {"code": 499, "msg": "客户端已断开连接"}
+    await asyncio.wait_for(cancelled.wait(), 1)
+
+
+async def test_disconnect_keeps_parse_for_other_waiters(monkeypatch):
+    calls = 0
+
+    async def slow_parse(share_url, timeout=None):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return VideoInfo(video_url="https://video", cover_url="")
+
+    monkeypatch.setattr(web, "parse_video_share_url", slow_parse)
+
+    gone, stay = await asyncio.gather(
+        web.share_url_parse(
+            _FakeRequest(disconnect_after=0.01), "https://v.douyin.com/abc"
+        ),
+        web.share_url_parse(
+            _FakeRequest(disconnect_after=None), "https://v.douyin.com/abc"
+        ),
+    )
+
+    assert gone["code"] == 499
+    assert stay["code"] == 200
+    assert stay["data"]["video_url"] == "https://video"
+    assert calls == 1
+
+
+async def test_same_video_links_share_one_parse(monkeypatch):
+    """同一视频的不同写法（追踪参数、网页链接）合并为一次解析"""
+    calls = []
+
+    async def slow_parse(share_url, timeout=None):
+        calls.append(share_url)
+        await asyncio.sleep(0.05)
+        return VideoInfo(video_url="https://video", cover_url="")
+
+    monkeypatch.setattr(web, "parse_video_share_url", slow_parse)
+
+    results = await asyncio.gather(
+        web.share_url_parse(
+            _FakeRequest(disconnect_after=None),
+            "https://www.douyin.com/video/7424432820954598707",
+        ),
+        web.share_url_parse(
+            _FakeRequest(disconnect_after=None),
+            "https://www.iesdouyin.com/share/video/7424432820954598707/?mid=1",
+        ),
+    )
+
+    assert [result["code"] for result in results] == [200, 200]
+    assert len(calls) == 1
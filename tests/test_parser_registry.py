@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+from parse_video_py.parser import (
+    ParserRegistry,
+    parse_video_id,
+    parser_registry,
+    video_source_info_mapping,
+)
+from parse_video_py.parser.base import BaseParser, VideoInfo, VideoSource
+
+
+class FakeParser(BaseParser):
+    """记录生命周期调用的解析器"""
+
+    created = 0
+    fail_startup = 0
+
+    def __init__(self):
+        super().__init__()
+        FakeParser.created += 1
+        self.started = 0
+        self.closed = 0
+
+    async def startup(self) -> None:
+        await asyncio.sleep(0.01)
+        if FakeParser.fail_startup:
+            FakeParser.fail_startup -= 1
+            raise RuntimeError("startup failed")
+        self.started += 1
+
+    async def aclose(self) -> None:
+        self.closed += 1
+
+    async def parse_share_url(self, share_url: str) -> VideoInfo:
+        return await self.parse_video_id(share_url)
+
+    async def parse_video_id(self, video_id: str) -> VideoInfo:
+        return VideoInfo(video_url="", cover_url="", title=str(id(self)))
+
+
+@pytest.fixture
+def fake_parser(monkeypatch):
+    FakeParser.created = 0
+    FakeParser.fail_startup = 0
+    monkeypatch.setitem(
+        video_source_info_mapping[VideoSource.DouYin], "parser", FakeParser
+    )
+    return FakeParser
+
+
+class TestParserRegistry:
+    """测试解析器实例的复用与生命周期"""
+
+    async def test_parse_reuses_instance(self, fake_parser):
+        try:
+            first = await parse_video_id(VideoSource.DouYin, "1")
+            second = await parse_video_id(VideoSource.DouYin, "2")
+        finally:
+            await parser_registry.aclose_all()
+        assert first.title == second.title
+        assert fake_parser.created == 1
+
+    async def test_concurrent_first_use_starts_once(self, fake_parser):
+        registry = ParserRegistry()
+        parsers = await asyncio.gather(
+            *(registry.get(VideoSource.DouYin) for _ in range(5))
+        )
+        assert len({id(parser) for parser in parsers}) == 1
+        assert parsers[0].started == 1
+
+    async def test_failed_startup_not_cached(self, fake_parser):
+        registry = ParserRegistry()
+        fake_parser.fail_startup = 1
+        with pytest.raises(RuntimeError, match="startup failed"):
+            await registry.get(VideoSource.DouYin)
+        parser = await registry.get(VideoSource.DouYin)
+        assert parser.started == 1
+        assert fake_parser.created == 2
+
+    async def test_cancelled_caller_does_not_cancel_startup(self, fake_parser):
+        registry = ParserRegistry()
+        waiter = asyncio.ensure_future(registry.get(VideoSource.DouYin))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        parser = await registry.get(VideoSource.DouYin)
+        assert parser.started == 1
+        assert fake_parser.created == 1
+
+    async def test_aclose_all(self, fake_parser):
+        registry = ParserRegistry()
+        parser = await registry.get(VideoSource.DouYin)
+        await registry.aclose_all()
+        assert parser.closed == 1
+        assert await registry.get(VideoSource.DouYin) is not parser
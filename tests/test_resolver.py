@@ -0,0 +1,174 @@
+import asyncio
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpcore
+import pytest
+
+from parse_video_py import transport
+from parse_video_py.resolver import CachingNetworkBackend, DNSCache, parse_overrides
+from parse_video_py.utils import create_async_client
+
+
+@pytest.fixture
+def lookups(monkeypatch):
+    """mock 系统解析：记录查询的域名，按 answers 返回地址"""
+    calls = []
+    answers = {}
+
+    async def fake_getaddrinfo(self, host, port, type=0):
+        calls.append(host)
+        await asyncio.sleep(0)
+        if host not in answers:
+            raise socket.gaierror("not found")
+        return [(socket.AF_INET, type, 6, "", (ip, 0)) for ip in answers[host]]
+
+    monkeypatch.setattr(asyncio.BaseEventLoop, "getaddrinfo", fake_getaddrinfo)
+    return calls, answers
+
+
+class TestParseOverrides:
+    """测试静态覆盖配置"""
+
+    def test_parse(self):
+        assert parse_overrides("a.com=1.1.1.1|2.2.2.2, b.com=3.3.3.3") == {
+            "a.com": ["1.1.1.1", "2.2.2.2"],
+            "b.com": ["3.3.3.3"],
+        }
+        assert parse_overrides("") == {}
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            parse_overrides("a.com")
+
+
+class TestDNSCache:
+    """测试 DNS 缓存"""
+
+    async def test_cache_hit(self, lookups):
+        calls, answers = lookups
+        answers["a.com"] = ["1.1.1.1"]
+        cache = DNSCache(ttl=60)
+        assert await cache.resolve("a.com") == ["1.1.1.1"]
+        assert await cache.resolve("a.com") == ["1.1.1.1"]
+        assert calls == ["a.com"]
+
+    async def test_concurrent_lookups_coalesced(self, lookups):
+        calls, answers = lookups
+        answers["a.com"] = ["1.1.1.1"]
+        cache = DNSCache(ttl=60)
+        results = await asyncio.gather(*(cache.resolve("a.com") for _ in range(5)))
+        assert results == [["1.1.1.1"]] * 5
+        assert calls == ["a.com"]
+
+    async def test_expired_entry_resolved_again(self, lookups):
+        calls, answers = lookups
+        answers["a.com"] = ["1.1.1.1"]
+        cache = DNSCache(ttl=0.01)
+        await cache.resolve("a.com")
+        await asyncio.sleep(0.02)
+        answers["a.com"] = ["2.2.2.2"]
+        assert await cache.resolve("a.com") == ["2.2.2.2"]
+        assert calls == ["a.com", "a.com"]
+
+    async def test_hot_entry_refreshed_in_background(self, lookups):
+        calls, answers = lookups
+        answers["a.com"] = ["1.1.1.1"]
+        cache = DNSCache(ttl=0.2, prefetch_ratio=0.1)
+        await cache.resolve("a.com")
+        await asyncio.sleep(0.05)
+        answers["a.com"] = ["2.2.2.2"]
+        # 临近过期：立即返回旧结果，同时后台刷新
+        assert await cache.resolve("a.com") == ["1.1.1.1"]
+        await asyncio.sleep(0.01)
+        assert calls == ["a.com", "a.com"]
+        assert await cache.resolve("a.com") == ["2.2.2.2"]
+
+    async def test_stale_entry_used_when_lookup_fails(self, lookups):
+        calls, answers = lookups
+        answers["a.com"] = ["1.1.1.1"]
+        cache = DNSCache(ttl=0.01)
+        await cache.resolve("a.com")
+        await asyncio.sleep(0.02)
+        del answers["a.com"]
+        assert await cache.resolve("a.com") == ["1.1.1.1"]
+
+    async def test_overrides_and_ip_skip_lookup(self, lookups):
+        calls, _ = lookups
+        cache = DNSCache(overrides={"a.com": ["9.9.9.9"]})
+        assert await cache.resolve("a.com") == ["9.9.9.9"]
+        assert await cache.resolve("10.0.0.1") == ["10.0.0.1"]
+        assert calls == []
+
+    async def test_prefetch(self, lookups):
+        calls, answers = lookups
+        answers["a.com"] = ["1.1.1.1"]
+        cache = DNSCache()
+        cache.prefetch(["a.com", "127.0.0.1"])
+        await asyncio.sleep(0.01)
+        assert calls == ["a.com"]
+        assert await cache.resolve("a.com") == ["1.1.1.1"]
+        assert calls == ["a.com"]
+
+
+class _FakeBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, reachable):
+        self.reachable = reachable
+        self.attempts = []
+
+    async def connect_tcp(self, host, port, *args):
+        self.attempts.append(host)
+        if host not in self.reachable:
+            raise httpcore.ConnectError("refused")
+        return host
+
+
+class TestCachingNetworkBackend:
+    """测试通过缓存建立连接"""
+
+    async def test_tries_addresses_in_order(self):
+        cache = DNSCache(overrides={"a.com": ["1.1.1.1", "2.2.2.2"]})
+        backend = _FakeBackend({"2.2.2.2"})
+        stream = await CachingNetworkBackend(cache, backend).connect_tcp("a.com", 443)
+        assert stream == "2.2.2.2"
+        assert backend.attempts == ["1.1.1.1", "2.2.2.2"]
+
+    async def test_resolution_failure_is_connect_error(self, lookups):
+        backend = CachingNetworkBackend(DNSCache(), _FakeBackend(set()))
+        with pytest.raises(httpcore.ConnectError, match="DNS"):
+            await backend.connect_tcp("missing.test", 443)
+
+
+class TestClientIntegration:
+    """测试统一客户端使用 DNS 缓存"""
+
+    async def test_request_uses_override(self, monkeypatch):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        cache = DNSCache(overrides={"upstream.test": ["127.0.0.1"]})
+        monkeypatch.setattr(transport, "dns_cache", cache)
+        monkeypatch.delenv("PARSE_VIDEO_PROXY", raising=False)
+        try:
+            async with create_async_client() as client:
+                response = await client.get(
+                    f"http://upstream.test:{server.server_port}/"
+                )
+        finally:
+            server.shutdown()
+        assert response.text == "ok"
+
+    def test_disabled_cache_keeps_default_backend(self, monkeypatch):
+        monkeypatch.setattr(transport, "dns_cache", DNSCache(ttl=0))
+        built = transport.build_transport(http2=False)
+        assert not isinstance(built._pool._network_backend, CachingNetworkBackend)
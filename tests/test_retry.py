@@ -0,0 +1,162 @@
+import httpx
+import pytest
+
+from parse_video_py import retry
+from parse_video_py.context import source_scope
+from parse_video_py.deadline import deadline_scope
+from parse_video_py.metrics import metrics
+from parse_video_py.parser import video_source_info_mapping
+from parse_video_py.parser.base import VideoSource
+from parse_video_py.retry import (
+    NO_RETRY_POLICY,
+    RetryBudget,
+    RetryPolicy,
+    current_retry_policy,
+    retry_scope,
+)
+from parse_video_py.utils import create_async_client
+
+# 测试中不真正等待退避时间
+_FAST_POLICY = RetryPolicy(max_attempts=3, backoff_base=0, backoff_max=0)
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch):
+    metrics.reset()
+    monkeypatch.setattr(retry, "retry_budget", RetryBudget())
+    monkeypatch.setattr("parse_video_py.utils.retry_budget", retry.retry_budget)
+
+
+def _flaky_transport(responses):
+    """依次返回 responses 中的状态码或抛出其中的异常"""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        item = responses[min(len(calls), len(responses)) - 1]
+        if isinstance(item, Exception):
+            raise item
+        return httpx.Response(item)
+
+    return httpx.MockTransport(handler), calls
+
+
+class TestRetryPolicy:
+    """测试重试策略"""
+
+    def test_backoff_is_bounded(self):
+        policy = RetryPolicy(backoff_base=0.1, backoff_max=0.5)
+        for attempt in range(1, 10):
+            assert 0 <= policy.backoff(attempt) <= 0.5
+
+    def test_default_policy_outside_scope(self):
+        assert current_retry_policy() is retry.DEFAULT_RETRY_POLICY
+
+    def test_scope_overrides_policy(self):
+        with retry_scope(NO_RETRY_POLICY):
+            assert current_retry_policy() is NO_RETRY_POLICY
+
+    def test_per_source_policy_configured(self):
+        info = video_source_info_mapping[VideoSource.RedBook]
+        assert info["retry_policy"].max_attempts == 1
+
+
+class TestRetryBudget:
+    """测试全局重试预算"""
+
+    def test_budget_limits_retries(self):
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2)
+        assert budget.try_acquire()
+        assert budget.try_acquire()
+        assert not budget.try_acquire()
+
+        budget.deposit()
+        assert not budget.try_acquire()
+        budget.deposit()
+        assert budget.try_acquire()
+
+
+class TestClientRetry:
+    """测试统一客户端的重试行为"""
+
+    async def test_retry_on_5xx_then_success(self):
+        transport, calls = _flaky_transport([503, 502, 200])
+        with retry_scope(_FAST_POLICY), source_scope(VideoSource.Sohu):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://api.tv.sohu.com/")
+        assert response.status_code == 200
+        assert len(calls) == 3
+        assert metrics.get("upstream_retries_total", "sohu") == 2
+
+    async def test_retry_on_connection_error(self):
+        transport, calls = _flaky_transport([httpx.ConnectError("reset"), 200])
+        with retry_scope(_FAST_POLICY):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://example.com/")
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+    async def test_gives_up_after_max_attempts(self):
+        transport, calls = _flaky_transport([500])
+        with retry_scope(_FAST_POLICY):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://example.com/")
+        assert response.status_code == 500
+        assert len(calls) == 3
+
+    async def test_non_retryable_status_returned_immediately(self):
+        transport, calls = _flaky_transport([404])
+        with retry_scope(_FAST_POLICY):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://example.com/")
+        assert response.status_code == 404
+        assert len(calls) == 1
+
+    async def test_exception_raised_after_max_attempts(self):
+        transport, calls = _flaky_transport([httpx.ConnectError("down")])
+        with retry_scope(_FAST_POLICY):
+            async with create_async_client(transport=transport) as client:
+                with pytest.raises(httpx.ConnectError):
+                    await client.get("https://example.com/")
+        assert len(calls) == 3
+
+    async def test_no_retry_policy(self):
+        transport, calls = _flaky_transport([503, 200])
+        with retry_scope(NO_RETRY_POLICY):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://example.com/")
+        assert response.status_code == 503
+        assert len(calls) == 1
+
+    async def test_retry_budget_caps_amplification(self, monkeypatch):
+        empty = RetryBudget(ratio=0, min_per_second=0, max_tokens=0)
+        monkeypatch.setattr("parse_video_py.utils.retry_budget", empty)
+        transport, calls = _flaky_transport([503, 200])
+        with retry_scope(_FAST_POLICY), source_scope(VideoSource.WeiBo):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://example.com/")
+        assert response.status_code == 503
+        assert len(calls) == 1
+        assert metrics.get("retry_budget_exhausted_total", "weibo") == 1
+
+    async def test_no_retry_when_backoff_exceeds_deadline(self, monkeypatch):
+        monkeypatch.setattr(retry.random, "uniform", lambda low, high: high)
+        slow_policy = RetryPolicy(backoff_base=10, backoff_max=10)
+        transport, calls = _flaky_transport([503, 200])
+        with retry_scope(slow_policy), deadline_scope(0.5):
+            async with create_async_client(transport=transport) as client:
+                response = await client.get("https://example.com/")
+        assert response.status_code == 503
+        assert len(calls) == 1
+
+
+def test_metrics_endpoint():
+    from fastapi.testclient import TestClient
+
+    from parse_video_py.web import app
+
+    metrics.inc("upstream_retries_total", "douyin", 2)
+    response = TestClient(app).get("/metrics")
+    body = response.json()
+    assert body["code"] == 200
+    assert body["data"]["upstream_retries_total"] == {"douyin": 2}
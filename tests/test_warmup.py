@@ -0,0 +1,153 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from parse_video_py import transport, utils, warmup, web
+from parse_video_py.cli import app as cli_app
+from parse_video_py.parser import video_source_info_mapping
+from parse_video_py.transport import SharedTransport
+from parse_video_py.warmup import ConnectionWarmer, IdlePolicy, registry_hosts
+
+
+@pytest.fixture(autouse=True)
+def restore_shared_pool(monkeypatch):
+    monkeypatch.setattr(transport, "_shared_pool_enabled", False)
+
+
+def _warmer(hosts, handler, policy=None) -> tuple[ConnectionWarmer, SharedTransport]:
+    shared = SharedTransport(httpx.MockTransport(handler))
+    warmer = ConnectionWarmer(hosts, policy)
+    warmer._transports = lambda: [shared]
+    return warmer, shared
+
+
+class TestRegistryHosts:
+    """测试从注册表汇总接口域名"""
+
+    def test_every_source_has_api_hosts(self):
+        for source, source_info in video_source_info_mapping.items():
+            assert source_info.get("api_hosts"), source
+
+    def test_hosts_deduplicated(self):
+        hosts = registry_hosts()
+        assert "api.bilibili.com" in hosts
+        assert "www.iesdouyin.com" in hosts
+        assert len(hosts) == len(set(hosts))
+
+
+class TestConnectionWarmer:
+    """测试连接预热"""
+
+    async def test_warm_sends_head_to_each_host(self):
+        seen = []
+
+        def handler(request):
+            seen.append((request.method, str(request.url)))
+            return httpx.Response(200)
+
+        warmer, shared = _warmer(["a.com", "b.com"], handler)
+        assert await warmer.warm(warmer.hosts) == 2
+        assert sorted(seen) == [("HEAD", "https://a.com/"), ("HEAD", "https://b.com/")]
+        # 预热请求不计入最近使用时间
+        assert shared.last_used == {}
+
+    async def test_warm_failures_ignored(self):
+        def handler(request):
+            raise httpx.ConnectError("down")
+
+        warmer, _ = _warmer(["a.com"], handler)
+        assert await warmer.warm(warmer.hosts) == 0
+
+    async def test_idle_hosts_not_refreshed(self):
+        warmer, shared = _warmer(
+            ["used.com", "idle.com"],
+            lambda request: httpx.Response(200),
+            IdlePolicy(idle_timeout=60),
+        )
+        warmer._started_at = time.monotonic() - 120
+        shared.last_used["used.com"] = time.monotonic()
+        assert warmer.active_hosts() == ["used.com"]
+
+    async def test_start_is_non_blocking(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_warm(hosts):
+            started.set()
+            await release.wait()
+            return 0
+
+        warmer = ConnectionWarmer(["a.com"], IdlePolicy(refresh_interval=0.01))
+        warmer.warm = slow_warm
+        warmer.start()
+        assert transport.shared_pool_enabled()
+        assert not started.is_set()
+        await asyncio.wait_for(started.wait(), 1)
+        await warmer.aclose()
+        assert warmer._task is None
+
+    async def test_refresh_loop(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.host)
+            return httpx.Response(200)
+
+        warmer, _ = _warmer(["a.com"], handler, IdlePolicy(refresh_interval=0.01))
+        warmer.start()
+        await asyncio.sleep(0.05)
+        await warmer.aclose()
+        assert len(calls) >= 2
+
+    async def test_clients_use_shared_pool_after_start(self, monkeypatch):
+        monkeypatch.delenv("PARSE_VIDEO_PROXY", raising=False)
+        warmer, _ = _warmer(["a.com"], lambda request: httpx.Response(200))
+        warmer.start()
+        async with utils.create_async_client() as client:
+            assert isinstance(client._transport, SharedTransport)
+        await warmer.aclose()
+
+
+class TestWarmupStartup:
+    """测试服务启动时预热"""
+
+    def test_lifespan_starts_warmer(self, monkeypatch):
+        events = []
+
+        class FakeWarmer:
+            def __init__(self, hosts, policy):
+                events.append(("init", len(hosts)))
+
+            def start(self):
+                events.append("start")
+
+            async def aclose(self):
+                events.append("close")
+
+        monkeypatch.setenv("PARSE_VIDEO_WARMUP", "1")
+        monkeypatch.setattr(web, "ConnectionWarmer", FakeWarmer)
+        with TestClient(web.app):
+            assert events == [("init", len(registry_hosts())), "start"]
+        assert events[-1] == "close"
+
+    def test_lifespan_without_warmup(self, monkeypatch):
+        monkeypatch.delenv("PARSE_VIDEO_WARMUP", raising=False)
+        assert not warmup.warmup_enabled()
+        with patch.object(web, "ConnectionWarmer") as fake:
+            with TestClient(web.app):
+                pass
+        fake.assert_not_called()
+
+    def test_serve_warmup_flag(self, monkeypatch):
+        # 先登记环境变量，用例结束后恢复 serve 写入的值
+        monkeypatch.setenv("PARSE_VIDEO_WARMUP", "0")
+        with patch("uvicorn.run") as mock_run:
+            result = CliRunner().invoke(cli_app, ["serve", "--warmup"])
+            assert result.exit_code == 0
+            mock_run.assert_called_once()
+            assert warmup.warmup_enabled()